@@ -0,0 +1,111 @@
+"""
+Memoized rule-based analysis of one resume against one job
+Streamlit reruns the whole script on every widget interaction and chat message;
+gaps, selection probability, suggestions and the honest review are pure functions of
+(resume data, job description, job requirements), so they are computed once per
+fingerprint and shared by the summary column and the chatbot of every session.
+The fingerprint covers only the sections the analysis reads, so a new resume version
+that changes nothing else reuses its predecessor's analysis (see resume_manager.reuse_analysis).
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+from config import ANALYSIS_CACHE_CONFIG
+from resume_analysis import (
+    analyze_resume_gaps, calculate_selection_probability,
+    generate_honest_review, generate_improvement_suggestions
+)
+
+# The resume sections the rule-based analysis reads; name and contact details never affect it
+ANALYSIS_SECTIONS = ('skills', 'experience', 'education', 'projects', 'certifications')
+
+def analysis_fingerprint(resume_data, job_description, job_requirements):
+    """SHA-256 of the analysis inputs; equal fingerprints give equal analyses"""
+    sections = {section: resume_data.get(section) for section in ANALYSIS_SECTIONS}
+    payload = json.dumps([sections, job_description, job_requirements], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+class ResumeAnalysis:
+    """Analysis results for one fingerprint; shared between sessions, so treat as read-only"""
+    def __init__(self, fingerprint, resume_data, job_description, job_requirements):
+        self.fingerprint = fingerprint
+        self.resume_data = resume_data
+        self.job_description = job_description
+        self.job_requirements = job_requirements
+        self.gaps = analyze_resume_gaps(resume_data, job_description, job_requirements)
+        self.selection_probability = calculate_selection_probability(resume_data, job_requirements, self.gaps)
+        self._suggestions = None
+        self._honest_review = None
+    
+    @property
+    def suggestions(self):
+        # Only the chatbot needs these, so they are built on first use
+        if self._suggestions is None:
+            self._suggestions = generate_improvement_suggestions(self.resume_data, self.job_description, self.gaps)
+        return self._suggestions
+    
+    @property
+    def honest_review(self):
+        if self._honest_review is None:
+            self._honest_review = generate_honest_review(self.resume_data, self.job_requirements, self.gaps, self.selection_probability)
+        return self._honest_review
+
+class AnalysisCache:
+    """Bounded in-process LRU of ResumeAnalysis objects by fingerprint"""
+    def __init__(self, max_entries=512):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+    
+    def get(self, resume_data, job_description, job_requirements):
+        """Return the ResumeAnalysis for these inputs, computing it on a miss"""
+        fingerprint = analysis_fingerprint(resume_data, job_description, job_requirements)
+        with self._lock:
+            analysis = self._entries.get(fingerprint)
+            if analysis is not None:
+                self._entries.move_to_end(fingerprint)
+                self._stats['hits'] += 1
+                return analysis
+            self._stats['misses'] += 1
+        
+        analysis = ResumeAnalysis(fingerprint, resume_data, job_description, job_requirements)
+        with self._lock:
+            # Another session may have stored it meanwhile; keep the first so callers share one object
+            analysis = self._entries.setdefault(fingerprint, analysis)
+            self._entries.move_to_end(fingerprint)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+        return analysis
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+    
+    def stats(self):
+        """Snapshot of hit/miss counters"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        return stats
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_analysis_cache():
+    """Get the process-wide analysis cache, creating it on first use"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = AnalysisCache(**ANALYSIS_CACHE_CONFIG)
+    return _cache
+
+def get_resume_analysis(resume_data, job_description, job_requirements):
+    """Cached ResumeAnalysis for a resume against a job"""
+    return get_analysis_cache().get(resume_data, job_description, job_requirements)
@@ -0,0 +1,566 @@
+"""
+Headless HTTP API for the resume analysis pipeline
+A plain ASGI application; serve it with any ASGI server, for example:
+    uvicorn api:app --host 0.0.0.0 --port 8000
+
+Log in with POST /auth/login and send "Authorization: Bearer <session_token>" on
+every other request. The event loop never blocks: database calls run on a thread
+pool sized to the connection pool, resume parsing runs on a process pool and
+rule-based analysis runs on the loop's default thread pool.
+
+Routes:
+    GET   /health
+    GET   /metrics                    request latency, DB pool and cache counters (session or API_METRICS_TOKEN)
+    POST  /auth/login                 {"email", "password"}
+    POST  /auth/logout
+    POST  /parse?filename=cv.pdf      raw PDF/DOCX body -> extracted resume data
+    POST  /resumes?filename=cv.pdf    raw PDF/DOCX body -> parsed and saved resume; &resume_id= (or
+                                      an existing filename) saves it as that resume's next version
+    GET   /resumes
+    GET   /resumes/{id}/versions      versions with their section-level diffs, newest first
+    GET   /resumes/{id}/analyses
+    GET   /analyses?limit=100&cursor=  every resume's analysis summaries, grouped by resume, newest first
+    POST  /analyze                    {"resume_id" or "resume_data", "job_title", "job_description", "job_requirements", "save"}
+    POST  /chat                       /analyze fields plus {"message", "enable_ai"}
+    GET   /jobs/{id}                  background analysis job status
+    GET   /applications?status=Applied&company=Acme&from=2024-01-01&to=&limit=50&cursor=
+    POST  /applications               {"company_name", "job_title", "application_date", ...}
+    POST  /applications/import?format=csv  raw CSV, JSON or JSON Lines body -> import report
+    PATCH /applications/{id}          {"status", "notes"}
+    GET   /applications/stats
+"""
+import asyncio
+import hmac
+import io
+import json
+import multiprocessing
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import date, datetime
+from decimal import Decimal
+from functools import partial
+from urllib.parse import parse_qs
+
+from config import API_CONFIG
+
+SUPPORTED_EXTENSIONS = ('.pdf', '.docx')
+RESUME_LIST_FIELDS = ('education', 'skills', 'experience', 'projects', 'certifications')
+RESUME_TEXT_FIELDS = ('name', 'email', 'phone')
+ANALYSIS_JSON_FIELDS = ('missing_skills', 'strengths', 'weaknesses', 'suggestions')
+
+class HTTPError(Exception):
+    """Error returned to the client as {"error": message} with the given status"""
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+class Request:
+    """The parts of an ASGI HTTP request the handlers need"""
+    def __init__(self, scope, body):
+        self.method = scope['method']
+        self.path = scope['path']
+        self.query = {key: values[-1] for key, values in parse_qs(scope.get('query_string', b'').decode('latin-1')).items()}
+        self.headers = {key.decode('latin-1').lower(): value.decode('latin-1') for key, value in scope.get('headers', [])}
+        self.body = body
+        self.params = {}
+        self.user = None
+        self.session_token = None
+    
+    def json(self):
+        try:
+            data = json.loads(self.body or b'{}')
+        except ValueError:
+            raise HTTPError(400, "Request body must be JSON")
+        if not isinstance(data, dict):
+            raise HTTPError(400, "Request body must be a JSON object")
+        return data
+
+class RequestMetrics:
+    """Per-route request counts, errors and latency percentiles over a sliding window"""
+    def __init__(self, window=2048):
+        self.window = window
+        self._routes = {}
+        self._lock = threading.Lock()
+    
+    def record(self, route, status, elapsed_ms):
+        with self._lock:
+            stats = self._routes.setdefault(route, {'count': 0, 'errors': 0, 'total_ms': 0.0, 'latencies': deque(maxlen=self.window)})
+            stats['count'] += 1
+            stats['errors'] += status >= 500
+            stats['total_ms'] += elapsed_ms
+            stats['latencies'].append(elapsed_ms)
+    
+    def snapshot(self):
+        """Route -> count, errors, avg and p50/p95/p99/max latency in milliseconds"""
+        with self._lock:
+            routes = {route: (stats['count'], stats['errors'], stats['total_ms'], sorted(stats['latencies'])) for route, stats in self._routes.items()}
+        snapshot = {}
+        for route, (count, errors, total_ms, latencies) in routes.items():
+            def percentile(p):
+                return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))], 2)
+            snapshot[route] = {
+                'count': count,
+                'errors': errors,
+                'avg_ms': round(total_ms / count, 2),
+                'p50_ms': percentile(0.50),
+                'p95_ms': percentile(0.95),
+                'p99_ms': percentile(0.99),
+                'max_ms': round(latencies[-1], 2)
+            }
+        return snapshot
+
+metrics = RequestMetrics()
+
+_db_executor = None
+_parse_executor = None
+_executor_lock = threading.Lock()
+
+def _executors():
+    global _db_executor, _parse_executor
+    if _db_executor is None:
+        with _executor_lock:
+            if _db_executor is None:
+                # Spawned, not forked: the parent has live DB connections and threads
+                _parse_executor = ProcessPoolExecutor(max_workers=API_CONFIG['parse_workers'], mp_context=multiprocessing.get_context('spawn'))
+                _db_executor = ThreadPoolExecutor(max_workers=API_CONFIG['db_threads'], thread_name_prefix='api-db')
+    return _db_executor, _parse_executor
+
+async def run_blocking(fn, *args, **kwargs):
+    """Run a blocking (database) call on the API thread pool"""
+    return await asyncio.get_running_loop().run_in_executor(_executors()[0], partial(fn, *args, **kwargs))
+
+async def parse_upload(request):
+    """(file_name, data, content_hash, raw_text, resume_data) for an uploaded resume body"""
+    from batch_ingest import process_resume
+    from extraction_cache import file_hash, get_extraction_cache
+    
+    file_name = request.query.get('filename') or request.headers.get('x-filename', '')
+    if not file_name.lower().endswith(SUPPORTED_EXTENSIONS):
+        raise HTTPError(415, "Pass ?filename= ending in .pdf or .docx")
+    if not request.body:
+        raise HTTPError(400, "Request body must be the resume file")
+    
+    data = request.body
+    content_hash = file_hash(data)
+    cache = get_extraction_cache()
+    entry = cache.get(content_hash)
+    if entry is not None:
+        return file_name, data, content_hash, entry[0], entry[1]
+    
+    result = await asyncio.get_running_loop().run_in_executor(_executors()[1], process_resume, file_name, data)
+    if 'error' in result:
+        raise HTTPError(422, f"Could not parse {file_name}: {result['error']}")
+    cache.put(content_hash, result['raw_text'], result['extracted_data'])
+    return file_name, data, content_hash, result['raw_text'], result['extracted_data']
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (bytes, bytearray)):
+        return None
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+ROUTES = []
+
+def route(method, pattern, auth=True):
+    """Register a handler for METHOD and a path pattern with {name} integer parameters"""
+    regex = re.compile('^' + re.sub(r'\{(\w+)\}', r'(?P<\1>\\d+)', pattern) + '$')
+    
+    def decorator(handler):
+        ROUTES.append((method, regex, f"{method} {pattern}", handler, auth))
+        return handler
+    return decorator
+
+# ---------------------------------------------------------------------- handlers
+
+@route('GET', '/health', auth=False)
+async def health(request):
+    return {'status': 'ok'}
+
+@route('GET', '/metrics', auth=False)
+async def get_metrics(request):
+    # Internal latency and pool state: a logged-in user, or a scraper holding the metrics token
+    token = API_CONFIG['metrics_token']
+    authorization = request.headers.get('authorization', '')
+    if not (token and authorization.lower().startswith('bearer ') and hmac.compare_digest(authorization[7:].strip(), token)):
+        await _authenticate(request)
+    
+    from analysis_cache import get_analysis_cache
+    from auth import session_cache, session_sweeper
+    from database import get_pool_stats
+    from extraction_cache import get_extraction_cache
+    from job_tracker import get_company_cache
+    from text_store import get_text_blob_cache
+    
+    return {
+        'requests': metrics.snapshot(),
+        'db_pool': get_pool_stats(),
+        'extraction_cache': get_extraction_cache().stats(),
+        'analysis_cache': get_analysis_cache().stats(),
+        'session_cache': session_cache.stats(),
+        'session_sweeper': session_sweeper.stats(),
+        'company_cache': get_company_cache().stats(),
+        'text_blob_cache': get_text_blob_cache().stats()
+    }
+
+@route('POST', '/auth/login', auth=False)
+async def login(request):
+    from auth import login_user
+    
+    body = request.json()
+    success, result = await run_blocking(login_user, body.get('email', ''), body.get('password', ''))
+    if not success:
+        raise HTTPError(401, result)
+    return result
+
+@route('POST', '/auth/logout')
+async def logout(request):
+    from auth import logout_user
+    
+    await run_blocking(logout_user, request.session_token)
+    return {'logged_out': True}
+
+@route('POST', '/parse')
+async def parse(request):
+    file_name, _, content_hash, _, resume_data = await parse_upload(request)
+    return {'file_name': file_name, 'content_hash': content_hash, 'resume_data': resume_data}
+
+@route('POST', '/resumes')
+async def upload_resume(request):
+    from resume_manager import get_current_version_id, save_resume
+    
+    try:
+        target_id = int(request.query['resume_id']) if request.query.get('resume_id') else None
+    except ValueError:
+        raise HTTPError(400, "resume_id must be an integer")
+    if target_id is not None:
+        await _owned_resume(request, target_id)
+    file_name, data, content_hash, raw_text, resume_data = await parse_upload(request)
+    success, resume_id, message = await run_blocking(
+        save_resume,
+        user_id=request.user['user_id'],
+        resume_name=file_name,
+        file_path=f"api/{file_name}",
+        file_size=len(data),
+        file_type=file_name.rsplit('.', 1)[-1].lower(),
+        raw_text=raw_text,
+        extracted_data=resume_data,
+        content_hash=content_hash,
+        resume_id=target_id
+    )
+    if not success:
+        raise HTTPError(500, message)
+    version_id = await run_blocking(get_current_version_id, resume_id)
+    return 201, {'resume_id': resume_id, 'version_id': version_id, 'message': message, 'resume_data': resume_data}
+
+@route('GET', '/resumes')
+async def list_resumes(request):
+    from resume_manager import get_user_resumes
+    
+    return {'resumes': await run_blocking(get_user_resumes, request.user['user_id'])}
+
+async def _owned_resume(request, resume_id):
+    from resume_manager import get_latest_resume_data
+    
+    rows = await run_blocking(get_latest_resume_data, user_id=request.user['user_id'], resume_ids=[resume_id])
+    if not rows:
+        raise HTTPError(404, f"Resume {resume_id} not found")
+    return rows[0]
+
+@route('GET', '/resumes/{resume_id}/versions')
+async def resume_versions(request):
+    from resume_manager import get_resume_versions
+    
+    resume_id = int(request.params['resume_id'])
+    await _owned_resume(request, resume_id)
+    return {'versions': await run_blocking(get_resume_versions, request.user['user_id'], resume_id)}
+
+@route('GET', '/resumes/{resume_id}/analyses')
+async def resume_analyses(request):
+    from resume_manager import get_analysis_history
+    
+    resume_id = int(request.params['resume_id'])
+    await _owned_resume(request, resume_id)
+    history = await run_blocking(get_analysis_history, resume_id)
+    for row in history:
+        for field in ANALYSIS_JSON_FIELDS:
+            if isinstance(row.get(field), str):
+                row[field] = json.loads(row[field])
+    return {'analyses': history}
+
+@route('GET', '/analyses')
+async def analysis_history(request):
+    from resume_manager import get_user_analysis_history
+    
+    try:
+        limit = min(int(request.query.get('limit', 100)), 500)
+        cursor = int(request.query['cursor']) if 'cursor' in request.query else None
+    except ValueError:
+        raise HTTPError(400, "limit and cursor must be integers")
+    history, next_cursor = await run_blocking(get_user_analysis_history, request.user['user_id'], limit, cursor)
+    return {'analyses': history, 'next_cursor': next_cursor}
+
+async def _analysis_inputs(request, body):
+    """(resume_id, version_id, resume_data, job_description, job_requirements) from an /analyze or /chat body"""
+    from job_templates import get_job_description_by_title
+    
+    if body.get('resume_id') is not None:
+        if not isinstance(body['resume_id'], int):
+            raise HTTPError(400, "resume_id must be an integer")
+        row = await _owned_resume(request, body['resume_id'])
+        resume_id, version_id, resume_data = row['resume_id'], row['version_id'], row['extracted_data']
+    elif isinstance(body.get('resume_data'), dict):
+        resume_id, version_id = None, None
+        given = body['resume_data']
+        resume_data = {field: given.get(field) or '' for field in RESUME_TEXT_FIELDS}
+        resume_data.update({field: list(given.get(field) or []) for field in RESUME_LIST_FIELDS})
+    else:
+        raise HTTPError(400, "Pass resume_id or resume_data")
+    
+    requirements = body.get('job_requirements') or {}
+    if not isinstance(requirements, dict):
+        raise HTTPError(400, "job_requirements must be an object")
+    job_description = body.get('job_description') or ''
+    skills = requirements.get('skills')
+    if body.get('job_title') and (not job_description or skills is None):
+        template_description, template_skills = get_job_description_by_title(body['job_title'])
+        job_description = job_description or template_description
+        skills = template_skills if skills is None else skills
+    if not job_description.strip():
+        raise HTTPError(400, "Pass job_description or job_title")
+    
+    job_requirements = {
+        'skills': list(skills or []),
+        'min_experience': requirements.get('min_experience', 0),
+        'education_level': requirements.get('education_level', 'Any')
+    }
+    return resume_id, version_id, resume_data, job_description, job_requirements
+
+@route('POST', '/analyze')
+async def analyze(request):
+    from analysis_cache import get_resume_analysis
+    from resume_manager import save_analysis
+    
+    body = request.json()
+    resume_id, version_id, resume_data, job_description, job_requirements = await _analysis_inputs(request, body)
+    # CPU-bound on a cache miss; off the event loop and off the DB threads
+    analysis = await asyncio.to_thread(get_resume_analysis, resume_data, job_description, job_requirements)
+    result = {
+        'resume_id': resume_id,
+        'version_id': version_id,
+        'selection_probability': analysis.selection_probability,
+        'gaps': analysis.gaps,
+        'suggestions': analysis.suggestions,
+        'honest_review': analysis.honest_review
+    }
+    if body.get('save') and resume_id is not None:
+        success, message = await run_blocking(
+            save_analysis,
+            resume_id=resume_id,
+            version_id=version_id,
+            job_title=body.get('job_title') or 'Unknown',
+            job_description=job_description,
+            analysis_results={
+                'selection_probability': analysis.selection_probability,
+                'missing_skills': analysis.gaps.get('missing_skills', []),
+                'strengths': analysis.gaps.get('matching_skills', []),
+                'weaknesses': analysis.gaps.get('missing_skills', []),
+                'suggestions': []
+            },
+            input_hash=analysis.fingerprint
+        )
+        if not success:
+            raise HTTPError(500, message)
+        result['saved'] = True
+    return result
+
+@route('POST', '/chat')
+async def chat(request):
+    from analysis_cache import get_resume_analysis
+    from chatbot import chatbot_response
+    
+    body = request.json()
+    message = body.get('message')
+    if not isinstance(message, str) or not message.strip():
+        raise HTTPError(400, "Pass a message")
+    _, version_id, resume_data, job_description, job_requirements = await _analysis_inputs(request, body)
+    analysis = await asyncio.to_thread(get_resume_analysis, resume_data, job_description, job_requirements)
+    # Semantic analysis can take up to its latency budget, so keep it off the event loop
+    response = await run_blocking(
+        chatbot_response, message, resume_data, job_description, job_requirements,
+        enable_ai=bool(body.get('enable_ai', False)), analysis=analysis, version_id=version_id
+    )
+    return {'response': response}
+
+@route('GET', '/jobs/{job_id}')
+async def job_status(request):
+    from job_queue import get_job_status
+    
+    job = await run_blocking(get_job_status, int(request.params['job_id']), request.user['user_id'])
+    if job is None:
+        raise HTTPError(404, "Job not found")
+    return job
+
+@route('GET', '/applications')
+async def list_applications(request):
+    from job_tracker import get_applications_page
+    
+    query = request.query
+    try:
+        limit = min(int(query.get('limit', 50)), 200)
+        date_from = date.fromisoformat(query['from']) if query.get('from') else None
+        date_to = date.fromisoformat(query['to']) if query.get('to') else None
+        applications, next_cursor = await run_blocking(
+            get_applications_page, request.user['user_id'], limit, query.get('cursor'),
+            query.get('status'), query.get('company'), date_from, date_to
+        )
+    except ValueError:
+        raise HTTPError(400, "limit must be an integer, from/to ISO dates and cursor a next_cursor value")
+    return {'applications': applications, 'next_cursor': next_cursor}
+
+@route('POST', '/applications')
+async def create_application(request):
+    from job_tracker import add_job_application
+    
+    body = request.json()
+    if not body.get('company_name') or not body.get('job_title'):
+        raise HTTPError(400, "company_name and job_title are required")
+    try:
+        body['application_date'] = date.fromisoformat(body['application_date']) if body.get('application_date') else date.today()
+        resume_id = int(body['resume_id']) if body.get('resume_id') is not None else None
+    except (TypeError, ValueError):
+        raise HTTPError(400, "application_date must be YYYY-MM-DD and resume_id an integer")
+    if resume_id is not None:
+        await _owned_resume(request, resume_id)
+    success, application_id, message = await run_blocking(add_job_application, request.user['user_id'], body, resume_id)
+    if not success:
+        raise HTTPError(500, message)
+    return 201, {'application_id': application_id, 'message': message}
+
+@route('POST', '/applications/import')
+async def import_applications(request):
+    from application_io import import_applications
+    
+    file_format = request.query.get('format', 'csv')
+    if file_format not in ('csv', 'json'):
+        raise HTTPError(400, "format must be csv or json")
+    if not request.body:
+        raise HTTPError(400, "Request body must be the CSV or JSON file")
+    report = await run_blocking(import_applications, request.user['user_id'], io.BytesIO(request.body), file_format)
+    return 201 if report['imported'] else 422, report
+
+@route('PATCH', '/applications/{application_id}')
+async def update_application(request):
+    from job_tracker import update_application_status
+    
+    body = request.json()
+    if not body.get('status'):
+        raise HTTPError(400, "status is required")
+    success, message = await run_blocking(update_application_status, int(request.params['application_id']), request.user['user_id'], body['status'], body.get('notes'))
+    if not success:
+        raise HTTPError(500, message)
+    return {'message': message}
+
+@route('GET', '/applications/stats')
+async def application_stats(request):
+    from job_tracker import get_application_statistics
+    
+    stats = await run_blocking(get_application_statistics, request.user['user_id'])
+    if stats is None:
+        raise HTTPError(500, "Failed to load application statistics")
+    return stats
+
+# ---------------------------------------------------------------------- ASGI plumbing
+
+async def _read_body(receive):
+    chunks, size = [], 0
+    while True:
+        message = await receive()
+        chunk = message.get('body', b'')
+        size += len(chunk)
+        if size > API_CONFIG['max_body_bytes']:
+            raise HTTPError(413, f"Request body exceeds {API_CONFIG['max_body_bytes']} bytes")
+        chunks.append(chunk)
+        if not message.get('more_body', False):
+            return b''.join(chunks)
+
+async def _authenticate(request):
+    from auth import get_session_user
+    
+    authorization = request.headers.get('authorization', '')
+    if not authorization.lower().startswith('bearer '):
+        raise HTTPError(401, "Missing bearer session token")
+    request.session_token = authorization[7:].strip()
+    request.user = await run_blocking(get_session_user, request.session_token)
+    if request.user is None:
+        raise HTTPError(401, "Invalid or expired session")
+
+def _resolve(method, path):
+    """(route_name, handler, auth, params) for a request, raising 404/405"""
+    allowed = False
+    for route_method, regex, name, handler, auth in ROUTES:
+        match = regex.match(path)
+        if match:
+            if route_method == method:
+                return name, handler, auth, match.groupdict()
+            allowed = True
+    raise HTTPError(405 if allowed else 404, "Method not allowed" if allowed else "Not found")
+
+async def _lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            from auth import start_session_sweeper
+            
+            _executors()
+            start_session_sweeper()
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            if _db_executor is not None:
+                _db_executor.shutdown(wait=False)
+                _parse_executor.shutdown(wait=False)
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+async def app(scope, receive, send):
+    """ASGI entry point"""
+    if scope['type'] == 'lifespan':
+        return await _lifespan(receive, send)
+    if scope['type'] != 'http':
+        return
+    
+    started = time.perf_counter()
+    route_name = f"{scope['method']} (unmatched)"
+    try:
+        route_name, handler, auth, params = _resolve(scope['method'], scope['path'])
+        request = Request(scope, await _read_body(receive))
+        request.params = params
+        if auth:
+            await _authenticate(request)
+        result = await handler(request)
+        status, payload = result if isinstance(result, tuple) else (200, result)
+    except HTTPError as e:
+        status, payload = e.status, {'error': e.message}
+    except Exception as e:
+        print(f"❌ {route_name} failed: {type(e).__name__}: {e}")
+        status, payload = 500, {'error': "Internal server error"}
+    
+    body = json.dumps(payload, default=_json_default).encode('utf-8')
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    metrics.record(route_name, status, elapsed_ms)
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [
+            (b'content-type', b'application/json'),
+            (b'content-length', str(len(body)).encode()),
+            (b'x-response-time-ms', f"{elapsed_ms:.1f}".encode())
+        ]
+    })
+    await send({'type': 'http.response.body', 'body': body})
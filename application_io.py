@@ -0,0 +1,305 @@
+"""
+Bulk import and export of job applications
+Imports stream CSV, JSON Lines or JSON-array files row by row: each row is validated,
+valid rows are saved in chunks (one transaction per chunk, companies resolved per chunk,
+multi-row inserts for applications and their first status rows) and invalid rows are
+reported with their line number. Exports read a user's applications page by page with
+their status history and stream them out, so neither side holds a whole file or result
+set in memory.
+
+Usage:
+    python application_io.py import applications.csv --user-id 42
+    python application_io.py export applications.jsonl --user-id 42 --format json
+"""
+import argparse
+import csv
+import io
+import itertools
+import json
+import os
+import sys
+import time
+from datetime import date, datetime
+
+from database import get_db_connection
+from job_tracker import add_job_applications_batch, normalize_company_name
+from text_store import resolve_text_columns
+
+# Accepted column names for each application field, first one canonical
+IMPORT_FIELDS = {
+    'company_name': ('company_name', 'company', 'employer'),
+    'job_title': ('job_title', 'title', 'position', 'role'),
+    'application_date': ('application_date', 'date', 'applied', 'applied_on'),
+    'status': ('status',),
+    'location': ('location',),
+    'job_url': ('job_url', 'url', 'link'),
+    'notes': ('notes',),
+    'job_description': ('job_description', 'description'),
+    'offer_date': ('offer_date',),
+}
+FIELD_LIMITS = {'company_name': 255, 'job_title': 255, 'location': 255, 'job_url': 500, 'status': 50}
+KNOWN_STATUSES = {status.lower(): status for status in ('Applied', 'Interview', 'Offer', 'Rejected')}
+EXPORT_FIELDS = ['application_id', 'company_name', 'job_title', 'application_date', 'status', 'location', 'job_url', 'notes', 'job_description', 'offer_date', 'rejection_date', 'follow_up_date', 'interview_date', 'created_at', 'updated_at', 'status_history']
+MAX_REPORTED_ERRORS = 100
+
+def _open_text(source):
+    """Text stream for a path, a binary file object (e.g. an upload) or a text file object"""
+    if isinstance(source, (str, os.PathLike)):
+        return open(source, encoding='utf-8-sig', newline='')
+    if isinstance(source, io.TextIOBase):
+        return source
+    return io.TextIOWrapper(source, encoding='utf-8-sig', newline='')
+
+def _iter_json_records(stream, chunk_size=65536):
+    """
+    Objects of a JSON array or JSON Lines stream, decoded incrementally. A JSON Lines line
+    that doesn't parse is yielded as a ValueError, so it fails alone like an invalid row.
+    """
+    decoder = json.JSONDecoder()
+    buffer = stream.read(chunk_size)
+    if not buffer.lstrip().startswith('['):
+        # JSON Lines: one object per line (finish the line the first read stopped in)
+        lines = itertools.chain(io.StringIO(buffer + stream.readline()), stream)
+        for line_number, line in enumerate(lines, 1):
+            if line.strip():
+                try:
+                    yield line_number, json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield line_number, ValueError(f"invalid JSON: {e.msg} at column {e.colno}")
+        return
+    
+    position = buffer.index('[') + 1
+    record_number, eof = 0, False
+    while True:
+        while position < len(buffer) and (buffer[position].isspace() or buffer[position] == ','):
+            position += 1
+        if position < len(buffer) and buffer[position] == ']':
+            return
+        try:
+            if position >= len(buffer):
+                raise json.JSONDecodeError("Need more data", buffer, position)
+            record, position = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            # Object split across chunks; read more and retry
+            if eof:
+                raise ValueError(f"Malformed or unterminated JSON array after record {record_number}")
+            chunk = stream.read(chunk_size)
+            eof = not chunk
+            buffer = buffer[position:] + chunk
+            position = 0
+            continue
+        record_number += 1
+        yield record_number, record
+
+def iter_import_records(source, file_format):
+    """(line or record number, raw dict, or ValueError for an unparseable line) for each row of a CSV or JSON source"""
+    stream = _open_text(source)
+    try:
+        if file_format == 'csv':
+            reader = csv.DictReader(stream)
+            for row in reader:
+                yield reader.line_num, row
+        else:
+            yield from _iter_json_records(stream)
+    finally:
+        if isinstance(source, (str, os.PathLike)):
+            stream.close()
+        elif not isinstance(source, io.TextIOBase):
+            # Don't let the wrapper close the caller's binary file object
+            stream.detach()
+
+def _parse_date(value):
+    if isinstance(value, date):
+        return value
+    value = str(value).strip()
+    for pattern in ('%Y-%m-%d', '%Y/%m/%d', '%m/%d/%Y'):
+        try:
+            return datetime.strptime(value[:10], pattern).date()
+        except ValueError:
+            continue
+    raise ValueError(f"unrecognized date '{value}' (use YYYY-MM-DD)")
+
+def validate_application_record(record):
+    """app_data dict for add_job_applications_batch from one imported row; raises ValueError"""
+    if not isinstance(record, dict):
+        raise ValueError("row is not an object")
+    columns = {str(key).strip().lower().replace(' ', '_'): value for key, value in record.items() if key is not None}
+    app_data = {}
+    for field, names in IMPORT_FIELDS.items():
+        value = next((columns[name] for name in names if columns.get(name) not in (None, '')), None)
+        if isinstance(value, (list, dict)):
+            raise ValueError(f"{field} must be a string, not a JSON {'array' if isinstance(value, list) else 'object'}")
+        if value is not None:
+            # JSON rows may hold numbers or booleans, e.g. a numeric company name
+            value = str(value).strip() or None
+        app_data[field] = value
+    
+    app_data['company_name'] = normalize_company_name(app_data['company_name'])
+    if not app_data['company_name'] or not app_data['job_title']:
+        raise ValueError("company_name and job_title are required")
+    app_data['application_date'] = _parse_date(app_data['application_date']) if app_data['application_date'] else date.today()
+    if app_data['offer_date']:
+        app_data['offer_date'] = _parse_date(app_data['offer_date'])
+        if app_data['offer_date'] < app_data['application_date']:
+            raise ValueError("offer_date is before application_date")
+    status = app_data['status'] or 'Applied'
+    app_data['status'] = KNOWN_STATUSES.get(status.lower(), status)
+    for field, limit in FIELD_LIMITS.items():
+        if app_data[field] and len(str(app_data[field])) > limit:
+            raise ValueError(f"{field} is longer than {limit} characters")
+    return app_data
+
+def import_applications(user_id, source, file_format='csv', chunk_size=1000, progress=None):
+    """
+    Import applications from a CSV or JSON (array or lines) path or file object for a user.
+    Valid rows are saved chunk_size at a time, one transaction per chunk; a failed chunk is
+    reported and the import continues. progress(report) is called after each chunk.
+    Returns a report dict: rows, imported, failed, errors [(line, message)], seconds, rows_per_second.
+    """
+    report = {'rows': 0, 'imported': 0, 'failed': 0, 'errors': [], 'seconds': 0.0, 'rows_per_second': 0.0}
+    started = time.perf_counter()
+    
+    def record_error(line, message):
+        report['failed'] += 1
+        if len(report['errors']) < MAX_REPORTED_ERRORS:
+            report['errors'].append((line, message))
+    
+    def flush(chunk):
+        success, app_ids, message = add_job_applications_batch(user_id, [app_data for _, app_data in chunk])
+        if success:
+            report['imported'] += len(app_ids)
+        else:
+            for line, _ in chunk:
+                record_error(line, message)
+        report['seconds'] = time.perf_counter() - started
+        report['rows_per_second'] = report['rows'] / report['seconds'] if report['seconds'] else 0.0
+        if progress:
+            progress(report)
+    
+    chunk = []
+    try:
+        for line, record in iter_import_records(source, file_format):
+            report['rows'] += 1
+            try:
+                if isinstance(record, ValueError):
+                    raise record
+                chunk.append((line, validate_application_record(record)))
+            except ValueError as e:
+                record_error(line, str(e))
+                continue
+            if len(chunk) >= chunk_size:
+                flush(chunk)
+                chunk = []
+    except (ValueError, csv.Error, UnicodeDecodeError) as e:
+        record_error(report['rows'] + 1, f"Could not read file: {e}")
+    if chunk:
+        flush(chunk)
+    report['seconds'] = time.perf_counter() - started
+    report['rows_per_second'] = report['rows'] / report['seconds'] if report['seconds'] else 0.0
+    return report
+
+def iter_application_export(user_id, page_size=1000, include_history=True):
+    """Yield a user's applications oldest first, reading one keyset page at a time"""
+    cursor_key = None
+    while True:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            query = 'SELECT ja.application_id, c.company_name, ja.job_title, ja.application_date, ja.status, ja.location, ja.job_url, ja.notes, ja.job_description, ja.job_description_blob_id, ja.offer_date, ja.rejection_date, ja.follow_up_date, ja.interview_date, ja.created_at, ja.updated_at FROM job_applications ja LEFT JOIN companies c ON ja.company_id = c.company_id WHERE ja.user_id = %s'
+            params = [user_id]
+            if cursor_key:
+                query += ' AND (ja.application_date > %s OR (ja.application_date = %s AND ja.application_id > %s))'
+                params.extend([cursor_key[0], cursor_key[0], cursor_key[1]])
+            cursor.execute(query + ' ORDER BY ja.application_date, ja.application_id LIMIT %s', (*params, page_size))
+            applications = resolve_text_columns(cursor, cursor.fetchall(), {'job_description': 'job_description_blob_id'})
+            if include_history and applications:
+                history = {}
+                placeholders = ', '.join(['%s'] * len(applications))
+                cursor.execute(f'SELECT application_id, status, notes, changed_at FROM application_status WHERE application_id IN ({placeholders}) ORDER BY application_id, changed_at, status_id', tuple(app['application_id'] for app in applications))
+                for row in cursor.fetchall():
+                    history.setdefault(row.pop('application_id'), []).append(row)
+                for app in applications:
+                    app['status_history'] = history.get(app['application_id'], [])
+        if not applications:
+            return
+        yield from applications
+        cursor_key = (applications[-1]['application_date'], applications[-1]['application_id'])
+
+def _export_value(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+def export_applications(user_id, out, file_format='csv', include_history=True, progress=None, progress_every=5000):
+    """
+    Stream a user's applications to a text file object as CSV or JSON Lines.
+    In CSV the status history is a JSON list in the status_history column.
+    Returns {'rows', 'seconds', 'rows_per_second'}.
+    """
+    started = time.perf_counter()
+    fields = EXPORT_FIELDS if include_history else EXPORT_FIELDS[:-1]
+    writer = csv.DictWriter(out, fields) if file_format == 'csv' else None
+    if writer:
+        writer.writeheader()
+    rows = 0
+    for app in iter_application_export(user_id, include_history=include_history):
+        record = {field: _export_value(app.get(field)) for field in fields}
+        if include_history:
+            record['status_history'] = [{key: _export_value(value) for key, value in entry.items()} for entry in app['status_history']]
+        if writer:
+            if include_history:
+                record['status_history'] = json.dumps(record['status_history'])
+            writer.writerow(record)
+        else:
+            out.write(json.dumps(record) + '\n')
+        rows += 1
+        if progress and rows % progress_every == 0:
+            progress(rows, time.perf_counter() - started)
+    seconds = time.perf_counter() - started
+    return {'rows': rows, 'seconds': seconds, 'rows_per_second': rows / seconds if seconds else 0.0}
+
+def detect_format(file_name):
+    """'csv' or 'json' from a file name's extension"""
+    return 'csv' if file_name.lower().endswith('.csv') else 'json'
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import or export job applications as CSV or JSON")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    import_parser = subparsers.add_parser('import', help="Import applications from a CSV, JSON or JSON Lines file")
+    import_parser.add_argument('path')
+    import_parser.add_argument('--user-id', type=int, required=True)
+    import_parser.add_argument('--format', choices=['csv', 'json'], default=None, help="Default: from the file extension")
+    import_parser.add_argument('--chunk-size', type=int, default=1000, help="Rows per database transaction")
+    export_parser = subparsers.add_parser('export', help="Export a user's applications and status history")
+    export_parser.add_argument('path', help="Output file, or - for stdout")
+    export_parser.add_argument('--user-id', type=int, required=True)
+    export_parser.add_argument('--format', choices=['csv', 'json'], default=None, help="Default: from the file extension")
+    export_parser.add_argument('--no-history', action='store_true', help="Leave out status history")
+    args = parser.parse_args(argv)
+    file_format = args.format or detect_format(args.path)
+    
+    if args.command == 'import':
+        report = import_applications(
+            args.user_id, args.path, file_format, args.chunk_size,
+            progress=lambda r: print(f"  {r['rows']} rows read, {r['imported']} imported ({r['rows_per_second']:.0f} rows/s)")
+        )
+        for line, message in report['errors']:
+            print(f"⚠️ Line {line}: {message}")
+        if report['failed'] > len(report['errors']):
+            print(f"⚠️ ... and {report['failed'] - len(report['errors'])} more rejected rows")
+        print(f"✅ Imported {report['imported']} of {report['rows']} rows in {report['seconds']:.1f}s ({report['rows_per_second']:.0f} rows/s)")
+        return 1 if report['failed'] else 0
+    
+    out = sys.stdout if args.path == '-' else open(args.path, 'w', encoding='utf-8', newline='')
+    try:
+        result = export_applications(
+            args.user_id, out, file_format, not args.no_history,
+            progress=lambda rows, seconds: print(f"  {rows} rows ({rows / seconds:.0f} rows/s)", file=sys.stderr)
+        )
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(f"✅ Exported {result['rows']} applications in {result['seconds']:.1f}s ({result['rows_per_second']:.0f} rows/s)", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
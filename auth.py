@@ -1,7 +1,164 @@
-import streamlit as st
-from database import get_db_connection, hash_password, verify_password
+from database import get_db_connection, hash_password, verify_password, password_needs_rehash
+from config import AUTH_CONFIG
+from collections import OrderedDict
 from datetime import datetime
 import secrets
+import threading
+import time
+
+class SessionCache:
+    """
+    TTL cache of validated session tokens, so page reruns and API calls don't query
+    user_sessions each time. Logouts in this process take effect at once; a logout
+    handled by another process is seen here within ttl_seconds.
+    """
+    def __init__(self, ttl_seconds=60, max_entries=10000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0}
+    
+    def get(self, session_token):
+        """Cached user for a token, or None when unknown or expired"""
+        with self._lock:
+            entry = self._entries.get(session_token)
+            if entry is not None and entry[1] > time.monotonic():
+                self._entries.move_to_end(session_token)
+                self._stats['hits'] += 1
+                return entry[0]
+            self._entries.pop(session_token, None)
+            self._stats['misses'] += 1
+            return None
+    
+    def put(self, session_token, user, ttl_seconds=None):
+        """Cache a validated user; ttl_seconds caps the entry at the session's own expiry"""
+        ttl_seconds = self.ttl_seconds if ttl_seconds is None else min(ttl_seconds, self.ttl_seconds)
+        with self._lock:
+            self._entries[session_token] = (user, time.monotonic() + ttl_seconds)
+            self._entries.move_to_end(session_token)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def invalidate(self, session_token):
+        with self._lock:
+            self._entries.pop(session_token, None)
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+    
+    def stats(self):
+        """Snapshot of hit/miss counters"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        return stats
+
+session_cache = SessionCache(AUTH_CONFIG['session_cache_ttl'], AUTH_CONFIG['session_cache_size'])
+
+class SessionSweeper:
+    """
+    Removes expired and logged-out sessions in bounded batches, optionally copying them
+    to user_sessions_archive first. Each batch is its own short transaction, and rows are
+    claimed with SKIP LOCKED so sweepers in several processes never wait on each other.
+    """
+    def __init__(self, batch_size=1000, max_batches=20, archive=False):
+        self.batch_size = batch_size
+        self.max_batches = max_batches
+        self.archive = archive
+        self._lock = threading.Lock()
+        self._stats = {'sweeps': 0, 'errors': 0, 'removed_total': 0, 'last_removed': 0,
+                       'last_sweep_ms': None, 'last_sweep_at': None, 'table_rows': None}
+    
+    def _sweep_batch(self):
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT session_id FROM user_sessions
+                WHERE expires_at <= NOW()
+                ORDER BY expires_at
+                LIMIT %s
+                FOR UPDATE SKIP LOCKED
+            ''', (self.batch_size,))
+            session_ids = [row['session_id'] for row in cursor.fetchall()]
+            if not session_ids:
+                return 0
+            placeholders = ', '.join(['%s'] * len(session_ids))
+            if self.archive:
+                cursor.execute(f'''
+                    INSERT IGNORE INTO user_sessions_archive
+                        (session_id, user_id, ip_address, user_agent, login_time, logout_time, last_seen, expires_at)
+                    SELECT session_id, user_id, ip_address, user_agent, login_time, logout_time, last_seen, expires_at
+                    FROM user_sessions
+                    WHERE session_id IN ({placeholders})
+                ''', tuple(session_ids))
+            cursor.execute(f'DELETE FROM user_sessions WHERE session_id IN ({placeholders})', tuple(session_ids))
+            return len(session_ids)
+    
+    def _table_rows(self):
+        """InnoDB's row estimate for user_sessions; avoids a full COUNT(*) scan"""
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT TABLE_ROWS AS table_rows FROM information_schema.TABLES
+                WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'user_sessions'
+            ''')
+            row = cursor.fetchone()
+            return row['table_rows'] if row else None
+    
+    def sweep(self):
+        """Run one sweep of at most max_batches batches; returns the number of sessions removed"""
+        started = time.perf_counter()
+        removed, table_rows, failed = 0, None, False
+        try:
+            for _ in range(self.max_batches):
+                batch = self._sweep_batch()
+                removed += batch
+                if batch < self.batch_size:
+                    break
+            table_rows = self._table_rows()
+        except Exception as e:
+            failed = True
+            print(f"⚠️ Session sweep failed after removing {removed} sessions: {e}")
+        elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+        with self._lock:
+            self._stats['sweeps'] += 1
+            self._stats['errors'] += failed
+            self._stats['removed_total'] += removed
+            self._stats['last_removed'] = removed
+            self._stats['last_sweep_ms'] = elapsed_ms
+            self._stats['last_sweep_at'] = datetime.now().isoformat(timespec='seconds')
+            if table_rows is not None:
+                self._stats['table_rows'] = table_rows
+        return removed
+    
+    def stats(self):
+        """Snapshot of sweep counters, duration and the user_sessions size estimate"""
+        with self._lock:
+            return dict(self._stats)
+
+session_sweeper = SessionSweeper(AUTH_CONFIG['sweep_batch_size'], AUTH_CONFIG['sweep_max_batches'], AUTH_CONFIG['archive_sessions'])
+
+_sweeper_thread = None
+_sweeper_lock = threading.Lock()
+
+def _run_session_sweeper(interval):
+    while True:
+        time.sleep(interval)
+        session_sweeper.sweep()
+
+def start_session_sweeper(interval=None):
+    """Start the background session sweeper thread once per process"""
+    global _sweeper_thread
+    interval = interval or AUTH_CONFIG['sweep_interval']
+    with _sweeper_lock:
+        if _sweeper_thread is None:
+            _sweeper_thread = threading.Thread(target=_run_session_sweeper, args=(interval,), name="session-sweeper", daemon=True)
+            _sweeper_thread.start()
+    return _sweeper_thread
 
 def register_user(email, password, full_name, phone=None):
     """Register a new user"""
@@ -44,6 +201,14 @@ def login_user(email, password):
             user = cursor.fetchone()
             
             if user and verify_password(password, user['password_hash']):
+                # Upgrade legacy SHA-256 hashes (and old scrypt costs) while we have the password
+                if password_needs_rehash(user['password_hash']):
+                    cursor.execute('''
+                        UPDATE users
+                        SET password_hash = %s
+                        WHERE user_id = %s
+                    ''', (hash_password(password), user['user_id']))
+                
                 # Update last login
                 cursor.execute('''
                     UPDATE users
@@ -54,17 +219,18 @@ def login_user(email, password):
                 # Create session token
                 session_token = secrets.token_hex(32)
                 cursor.execute('''
-                    INSERT INTO user_sessions (user_id, session_token)
-                    VALUES (%s, %s)
-                ''', (user['user_id'], session_token))
+                    INSERT INTO user_sessions (user_id, session_token, last_seen, expires_at)
+                    VALUES (%s, %s, NOW(), NOW() + INTERVAL %s SECOND)
+                ''', (user['user_id'], session_token, AUTH_CONFIG['session_idle_timeout']))
                 
-                return True, {
+                session_user = {
                     'user_id': user['user_id'],
                     'email': email,
                     'full_name': user['full_name'],
-                    'role': user['role'],
-                    'session_token': session_token
+                    'role': user['role']
                 }
+                session_cache.put(session_token, session_user)
+                return True, {**session_user, 'session_token': session_token}
             else:
                 return False, "Invalid email or password"
     except Exception as e:
@@ -72,18 +238,61 @@ def login_user(email, password):
 
 def logout_user(session_token):
     """Logout user and deactivate session"""
+    session_cache.invalidate(session_token)
     try:
         with get_db_connection() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 UPDATE user_sessions
-                SET is_active = 0, logout_time = CURRENT_TIMESTAMP
+                SET is_active = 0, logout_time = CURRENT_TIMESTAMP, expires_at = CURRENT_TIMESTAMP
                 WHERE session_token = %s
             ''', (session_token,))
             return True
     except:
         return False
 
+def get_session_user(session_token):
+    """
+    Get the user of an unexpired session token, or None. Each DB check slides the expiry
+    forward (up to session_max_age after login); between checks the user is served from
+    session_cache, so an active session is written at most once per cache TTL.
+    """
+    user = session_cache.get(session_token)
+    if user is not None:
+        return user
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            # Validity comes from a SELECT: UPDATE's rowcount counts changed rows, not matched
+            # ones, so a second check in the same second would look like an expired session
+            cursor.execute('''
+                SELECT s.session_id, u.user_id, u.email, u.full_name, u.role,
+                       TIMESTAMPDIFF(SECOND, NOW(), LEAST(s.login_time + INTERVAL %s SECOND, NOW() + INTERVAL %s SECOND)) AS expires_in
+                FROM user_sessions s
+                JOIN users u ON u.user_id = s.user_id
+                WHERE s.session_token = %s AND s.is_active = 1 AND s.expires_at > NOW() AND u.is_active = 1
+            ''', (AUTH_CONFIG['session_max_age'], AUTH_CONFIG['session_idle_timeout'], session_token))
+            user = cursor.fetchone()
+            if user is None:
+                return None
+            # The same conditions again, so a logout in between is never extended
+            cursor.execute('''
+                UPDATE user_sessions
+                SET last_seen = NOW(),
+                    expires_at = LEAST(login_time + INTERVAL %s SECOND, NOW() + INTERVAL %s SECOND)
+                WHERE session_id = %s AND is_active = 1 AND expires_at > NOW()
+            ''', (AUTH_CONFIG['session_max_age'], AUTH_CONFIG['session_idle_timeout'], user.pop('session_id')))
+    except:
+        return None
+    # Only valid sessions are cached, so a new login is never hidden behind a cached miss
+    if user is None:
+        return None
+    expires_in = user.pop('expires_in')
+    if expires_in <= 0:
+        return None
+    session_cache.put(session_token, user, expires_in)
+    return user
+
 def get_user_profile(user_id):
     """Get user profile information"""
     try:
@@ -134,12 +343,18 @@ def update_user_profile(user_id, profile_data):
 
 def check_authentication():
     """Check if user is authenticated"""
+    import streamlit as st  # Only the Streamlit UI uses these helpers; keeps auth importable by the API
     if 'user' not in st.session_state:
         return False
+    # Served from session_cache on most reruns; drops the login once the session expires or is revoked
+    if get_session_user(st.session_state['user']['session_token']) is None:
+        del st.session_state['user']
+        return False
     return True
 
 def require_authentication():
     """Decorator to require authentication"""
+    import streamlit as st
     if not check_authentication():
         st.warning("⚠️ Please login to access this feature")
         st.stop()
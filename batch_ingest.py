@@ -0,0 +1,201 @@
+"""
+Batch Resume Ingestion
+Parses a directory or archive (.zip, .tar, .tar.gz) of PDF/DOCX resumes across a
+process pool and saves them for one user with batched multi-row inserts.
+
+Usage:
+    python batch_ingest.py resumes/ --user-id 42
+    python batch_ingest.py cohort.zip --user-id 42 --workers 8 --batch-size 100
+
+Progress is checkpointed to a JSON-lines state file after every committed batch,
+so re-running the same command after a crash skips files that were already saved.
+Files already saved for the user (same content hash) are never inserted twice.
+"""
+import argparse
+import json
+import os
+import sys
+import tarfile
+import time
+import zipfile
+from concurrent.futures import ALL_COMPLETED, FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from extraction_cache import file_hash
+from resume_extractor import extract_resume_data
+from resume_parser import extract_text
+
+SUPPORTED_EXTENSIONS = ('.pdf', '.docx')
+
+def iter_resume_sources(source):
+    """Yield (display_path, file_path_or_bytes) for every supported resume in a directory or archive"""
+    if os.path.isdir(source):
+        for root, dirs, files in os.walk(source):
+            dirs.sort()
+            for name in sorted(files):
+                if name.lower().endswith(SUPPORTED_EXTENSIONS):
+                    path = os.path.join(root, name)
+                    yield os.path.relpath(path, source), path
+    elif zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as archive:
+            for info in archive.infolist():
+                if not info.is_dir() and info.filename.lower().endswith(SUPPORTED_EXTENSIONS):
+                    yield info.filename, archive.read(info)
+    elif tarfile.is_tarfile(source):
+        with tarfile.open(source) as archive:
+            for member in archive:
+                if member.isfile() and member.name.lower().endswith(SUPPORTED_EXTENSIONS):
+                    yield member.name, archive.extractfile(member).read()
+    else:
+        raise ValueError(f"{source} is not a directory or a supported archive")
+
+def process_resume(display_path, source):
+    """Worker: parse one resume; returns a result dict with either the data or an error"""
+    try:
+        if isinstance(source, str):
+            with open(source, 'rb') as f:
+                data = f.read()
+        else:
+            data = source
+        name = os.path.basename(display_path)
+        raw_text = extract_text(name.lower(), data)
+        return {
+            'display_path': display_path,
+            'resume_name': name,
+            'file_path': f"batch/{display_path}",
+            'file_size': len(data),
+            'file_type': name.rsplit('.', 1)[-1].lower(),
+            'raw_text': raw_text,
+            'extracted_data': extract_resume_data(raw_text),
+            'content_hash': file_hash(data),
+        }
+    except Exception as e:
+        return {'display_path': display_path, 'error': f"{type(e).__name__}: {e}"}
+
+def load_checkpoint(state_path):
+    """Display paths already handled by a previous run"""
+    done = set()
+    if os.path.exists(state_path):
+        with open(state_path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    done.add(json.loads(line)['path'])
+                except (ValueError, KeyError):
+                    continue  # Torn last line from a crash mid-write
+    return done
+
+class BatchIngestor:
+    """Collects parsed resumes, flushes them in batches and keeps progress counters"""
+    def __init__(self, user_id, state_path, batch_size=50):
+        self.user_id = user_id
+        self.batch_size = batch_size
+        self.state_file = open(state_path, 'a', encoding='utf-8')
+        self.pending = []
+        self.failures = []
+        self.saved = 0
+        self.processed = 0
+        self.started = time.monotonic()
+    
+    def _checkpoint(self, path, **fields):
+        self.state_file.write(json.dumps({'path': path, **fields}) + '\n')
+    
+    def add(self, result):
+        self.processed += 1
+        if 'error' in result:
+            self.failures.append((result['display_path'], result['error']))
+            # Failures are not checkpointed so a re-run retries them
+            return
+        self.pending.append(result)
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+    
+    def flush(self):
+        if not self.pending:
+            return
+        # Imported lazily so worker processes never open database connections
+        from resume_manager import save_resumes_batch
+        
+        batch, self.pending = self.pending, []
+        success, saved, message = save_resumes_batch(self.user_id, batch)
+        if not success:
+            for result in batch:
+                self.failures.append((result['display_path'], message))
+            return
+        
+        for result in batch:
+            self._checkpoint(result['display_path'], resume_id=saved.get(result['content_hash']), content_hash=result['content_hash'])
+        self.saved += len(batch)
+        self.state_file.flush()
+        os.fsync(self.state_file.fileno())
+    
+    def report_progress(self):
+        elapsed = time.monotonic() - self.started
+        rate = self.processed / elapsed if elapsed else 0.0
+        print(f"📄 {self.processed} processed | {self.saved} saved | {len(self.failures)} failed | {rate:.1f} files/s")
+    
+    def close(self):
+        self.flush()
+        self.state_file.close()
+
+def ingest(source, user_id, workers=None, batch_size=50, state_path=None, progress_every=25):
+    """Ingest every resume under source for user_id; returns the BatchIngestor with final counters"""
+    state_path = state_path or f"{source.rstrip(os.sep)}.ingest-state.jsonl"
+    done = load_checkpoint(state_path)
+    if done:
+        print(f"↩️ Resuming: {len(done)} files already ingested according to {state_path}")
+    
+    ingestor = BatchIngestor(user_id, state_path, batch_size)
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = workers * 4  # Bounded so archives are never fully loaded into memory
+    skipped = 0
+    
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            in_flight = set()
+            
+            def drain(return_when):
+                nonlocal in_flight
+                finished, in_flight = wait(in_flight, return_when=return_when)
+                for future in finished:
+                    ingestor.add(future.result())
+                    if ingestor.processed % progress_every == 0:
+                        ingestor.report_progress()
+            
+            for display_path, file_source in iter_resume_sources(source):
+                if display_path in done:
+                    skipped += 1
+                    continue
+                in_flight.add(executor.submit(process_resume, display_path, file_source))
+                if len(in_flight) >= max_in_flight:
+                    drain(FIRST_COMPLETED)
+            
+            if in_flight:
+                drain(ALL_COMPLETED)
+    finally:
+        ingestor.close()
+    
+    elapsed = time.monotonic() - ingestor.started
+    print("\n" + "="*50)
+    print(f"✅ Ingestion finished in {elapsed:.1f}s")
+    print("="*50)
+    print(f"Processed: {ingestor.processed} ({ingestor.processed / elapsed if elapsed else 0:.1f} files/s)")
+    print(f"Saved: {ingestor.saved} (identical files share one stored resume)")
+    print(f"Skipped (already ingested): {skipped}")
+    print(f"Failed: {len(ingestor.failures)}")
+    for path, error in ingestor.failures:
+        print(f"  ❌ {path}: {error}")
+    return ingestor
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch-ingest PDF/DOCX resumes from a directory or archive")
+    parser.add_argument('source', help="Directory, .zip or .tar(.gz) archive of resumes")
+    parser.add_argument('--user-id', type=int, required=True, help="User that will own the ingested resumes")
+    parser.add_argument('--workers', type=int, default=None, help="Parser processes (default: CPU count)")
+    parser.add_argument('--batch-size', type=int, default=50, help="Resumes per database transaction")
+    parser.add_argument('--state', default=None, help="Checkpoint file (default: <source>.ingest-state.jsonl)")
+    args = parser.parse_args(argv)
+    
+    ingestor = ingest(args.source, args.user_id, args.workers, args.batch_size, args.state)
+    return 1 if ingestor.failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -22,6 +22,95 @@ MYSQL_CONFIG = {
     'autocommit': False
 }
 
+# Connection Pool Configuration
+DB_POOL_CONFIG = {
+    'pool_size': int(os.getenv('DB_POOL_SIZE', '5')),
+    'checkout_timeout': float(os.getenv('DB_POOL_TIMEOUT', '10')),
+    'recycle_seconds': int(os.getenv('DB_POOL_RECYCLE', '1800')),
+    'health_check_idle_seconds': int(os.getenv('DB_POOL_HEALTH_CHECK_IDLE', '30')),
+}
+
+# Authentication Configuration (scrypt cost: n must be a power of 2; memory is 128 * n * r bytes)
+# Sessions expire after session_idle_timeout seconds unused, and never later than session_max_age after login
+AUTH_CONFIG = {
+    'scrypt_n': int(os.getenv('AUTH_SCRYPT_N', str(2 ** 14))),
+    'scrypt_r': int(os.getenv('AUTH_SCRYPT_R', '8')),
+    'scrypt_p': int(os.getenv('AUTH_SCRYPT_P', '1')),
+    'session_cache_ttl': int(os.getenv('AUTH_SESSION_CACHE_TTL', '60')),
+    'session_cache_size': int(os.getenv('AUTH_SESSION_CACHE_SIZE', '10000')),
+    'session_idle_timeout': int(os.getenv('AUTH_SESSION_IDLE_TIMEOUT', str(7 * 24 * 3600))),
+    'session_max_age': int(os.getenv('AUTH_SESSION_MAX_AGE', str(30 * 24 * 3600))),
+    'sweep_interval': int(os.getenv('AUTH_SESSION_SWEEP_INTERVAL', '300')),
+    'sweep_batch_size': int(os.getenv('AUTH_SESSION_SWEEP_BATCH', '1000')),
+    'sweep_max_batches': int(os.getenv('AUTH_SESSION_SWEEP_MAX_BATCHES', '20')),
+    'archive_sessions': os.getenv('AUTH_SESSION_ARCHIVE', 'False').lower() == 'true',
+}
+
+# Resume Extraction Cache Configuration (EXTRACTION_CACHE_DIR empty = memory only)
+EXTRACTION_CACHE_CONFIG = {
+    'max_entries': int(os.getenv('EXTRACTION_CACHE_SIZE', '256')),
+    'disk_dir': os.getenv('EXTRACTION_CACHE_DIR') or None,
+}
+
+# Job Templates Configuration (JOB_TEMPLATES_PATH: extra JSON template files, os.pathsep-separated)
+JOB_TEMPLATES_CONFIG = {
+    'extra_files': [path for path in os.getenv('JOB_TEMPLATES_PATH', '').split(os.pathsep) if path],
+    'match_cache_size': int(os.getenv('JOB_TEMPLATE_MATCH_CACHE_SIZE', '1024')),
+}
+
+# Company Cache Configuration (company name -> id lookups for the job tracker)
+COMPANY_CACHE_CONFIG = {
+    'max_entries': int(os.getenv('COMPANY_CACHE_SIZE', '4096')),
+}
+
+# Text Blob Storage Configuration (zlib level 1-9; the cache holds decompressed texts by blob id)
+TEXT_BLOB_CONFIG = {
+    'compression_level': int(os.getenv('TEXT_BLOB_COMPRESSION_LEVEL', '6')),
+    'cache_size': int(os.getenv('TEXT_BLOB_CACHE_SIZE', '256')),
+}
+
+# Analysis Cache Configuration (rule-based analyses shared across Streamlit sessions)
+ANALYSIS_CACHE_CONFIG = {
+    'max_entries': int(os.getenv('ANALYSIS_CACHE_SIZE', '512')),
+}
+
+# Semantic Matching Configuration (sentence-transformers, CPU by default)
+SEMANTIC_CONFIG = {
+    'enabled': os.getenv('SEMANTIC_MATCHING', 'True').lower() == 'true',
+    'model_name': os.getenv('SEMANTIC_MODEL', 'all-MiniLM-L6-v2'),
+    'device': os.getenv('SEMANTIC_DEVICE', 'cpu'),
+    'batch_size': int(os.getenv('SEMANTIC_BATCH_SIZE', '32')),
+    'latency_budget_ms': int(os.getenv('SEMANTIC_LATENCY_BUDGET_MS', '1500')),
+    'keyword_threshold': float(os.getenv('SEMANTIC_KEYWORD_THRESHOLD', '0.5')),
+}
+
+# Vector Index Configuration
+VECTOR_INDEX_CONFIG = {
+    'directory': os.getenv('VECTOR_INDEX_DIR', '.vector_index'),
+    'brute_force_threshold': int(os.getenv('VECTOR_INDEX_BRUTE_FORCE_MAX', '20000')),
+    'nprobe': int(os.getenv('VECTOR_INDEX_NPROBE', '16')),
+}
+
+# Background Job Queue Configuration (inline workers run inside the Streamlit process)
+JOB_QUEUE_CONFIG = {
+    'inline_workers': int(os.getenv('JOB_QUEUE_INLINE_WORKERS', '1')),
+    'poll_interval': float(os.getenv('JOB_QUEUE_POLL_INTERVAL', '1.0')),
+    'max_attempts': int(os.getenv('JOB_QUEUE_MAX_ATTEMPTS', '3')),
+    'retry_backoff_seconds': int(os.getenv('JOB_QUEUE_RETRY_BACKOFF', '5')),
+    'stale_after_seconds': int(os.getenv('JOB_QUEUE_STALE_AFTER', '600')),
+    # The UI's poll interval doubles from poll_interval up to this while a job's stage doesn't change
+    'ui_max_poll_interval': float(os.getenv('JOB_QUEUE_UI_MAX_POLL_INTERVAL', '15')),
+}
+
+# HTTP API Configuration (api.py); DB threads default to the connection pool size
+API_CONFIG = {
+    'db_threads': int(os.getenv('API_DB_THREADS', str(DB_POOL_CONFIG['pool_size']))),
+    'parse_workers': int(os.getenv('API_PARSE_WORKERS', str(os.cpu_count() or 1))),
+    'max_body_bytes': int(os.getenv('API_MAX_BODY_MB', '10')) * 1024 * 1024,
+    # Bearer token for GET /metrics without a user session (e.g. for a scraper); empty = sessions only
+    'metrics_token': os.getenv('API_METRICS_TOKEN', ''),
+}
+
 # Application Configuration
 APP_CONFIG = {
     'env': os.getenv('APP_ENV', 'development'),
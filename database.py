@@ -1,47 +1,200 @@
 import hashlib
+import hmac
 import os
-from datetime import datetime
+import queue
+import threading
+import time
 from contextlib import contextmanager
 import mysql.connector
 from mysql.connector import Error
+from mysql.connector.errors import PoolError
 
 # Import MySQL configuration
-from config import MYSQL_CONFIG
+from config import MYSQL_CONFIG, DB_POOL_CONFIG, AUTH_CONFIG
+
+class MySQLConnection:
+    """Wrapper to make MySQL connection compatible with existing code"""
+    def __init__(self, connection, cursor):
+        self._conn = connection
+        self._cursor = cursor
+    
+    def cursor(self):
+        return self._cursor
+    
+    def commit(self):
+        return self._conn.commit()
+    
+    def rollback(self):
+        return self._conn.rollback()
+    
+    def close(self):
+        # The underlying connection goes back to the pool when the context exits
+        return self._cursor.close()
+    
+    def execute(self, *args, **kwargs):
+        return self._cursor.execute(*args, **kwargs)
+    
+    def fetchone(self):
+        return self._cursor.fetchone()
+    
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+class ConnectionPool:
+    """Bounded pool of reusable MySQL connections with health checks and recycling"""
+    def __init__(self, config, pool_size=5, checkout_timeout=10, recycle_seconds=1800, health_check_idle_seconds=30):
+        self._config = config
+        self.pool_size = pool_size
+        self.checkout_timeout = checkout_timeout
+        self.recycle_seconds = recycle_seconds
+        self.health_check_idle_seconds = health_check_idle_seconds
+        self._idle = queue.LifoQueue()  # Most recently used first keeps the hot set small
+        self._slots = threading.BoundedSemaphore(pool_size)
+        self._lock = threading.Lock()
+        self._stats = {
+            'checkouts': 0,
+            'timeouts': 0,
+            'connections_created': 0,
+            'connections_recycled': 0,
+            'connections_discarded': 0,
+            'health_check_failures': 0,
+            'in_use': 0,
+            'wait_time_total': 0.0,
+            'wait_time_max': 0.0,
+            'checkout_latency_total': 0.0,
+            'checkout_latency_max': 0.0,
+        }
+    
+    def _count(self, key, amount=1):
+        with self._lock:
+            self._stats[key] += amount
+    
+    def _close_quietly(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+    
+    def _connect(self):
+        conn = mysql.connector.connect(**self._config)
+        self._count('connections_created')
+        return conn, time.monotonic()
+    
+    def _take_idle(self):
+        """Return a healthy idle connection, or None if a new one is needed"""
+        while True:
+            try:
+                conn, created_at, last_used = self._idle.get_nowait()
+            except queue.Empty:
+                return None
+            
+            now = time.monotonic()
+            if now - created_at > self.recycle_seconds:
+                self._close_quietly(conn)
+                self._count('connections_recycled')
+                continue
+            
+            # Only ping connections that have sat idle long enough to have gone stale
+            if now - last_used > self.health_check_idle_seconds:
+                try:
+                    healthy = conn.is_connected()
+                except Exception:
+                    healthy = False
+                if not healthy:
+                    self._close_quietly(conn)
+                    self._count('health_check_failures')
+                    continue
+            
+            return conn, created_at
+    
+    def acquire(self):
+        """Check out a connection, waiting up to checkout_timeout for a free slot"""
+        start = time.monotonic()
+        if not self._slots.acquire(timeout=self.checkout_timeout):
+            self._count('timeouts')
+            raise PoolError(f"No database connection available within {self.checkout_timeout}s (pool size {self.pool_size})")
+        waited = time.monotonic() - start
+        
+        try:
+            entry = self._take_idle() or self._connect()
+        except Exception:
+            self._slots.release()
+            raise
+        
+        latency = time.monotonic() - start
+        with self._lock:
+            self._stats['checkouts'] += 1
+            self._stats['in_use'] += 1
+            self._stats['wait_time_total'] += waited
+            self._stats['wait_time_max'] = max(self._stats['wait_time_max'], waited)
+            self._stats['checkout_latency_total'] += latency
+            self._stats['checkout_latency_max'] = max(self._stats['checkout_latency_max'], latency)
+        return entry
+    
+    def release(self, conn, created_at, discard=False):
+        """Return a connection to the pool, closing it instead if it is broken"""
+        try:
+            if discard:
+                self._close_quietly(conn)
+                self._count('connections_discarded')
+            else:
+                self._idle.put((conn, created_at, time.monotonic()))
+        finally:
+            with self._lock:
+                self._stats['in_use'] -= 1
+            self._slots.release()
+    
+    def close_all(self):
+        """Close every idle connection (checked-out connections are closed on release)"""
+        while True:
+            try:
+                conn, _, _ = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._close_quietly(conn)
+    
+    def stats(self):
+        """Snapshot of pool counters"""
+        with self._lock:
+            stats = dict(self._stats)
+        stats['idle'] = self._idle.qsize()
+        stats['pool_size'] = self.pool_size
+        checkouts = stats['checkouts'] or 1
+        stats['wait_time_avg'] = stats['wait_time_total'] / checkouts
+        stats['checkout_latency_avg'] = stats['checkout_latency_total'] / checkouts
+        return stats
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_connection_pool():
+    """Get the process-wide connection pool, creating it on first use"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(MYSQL_CONFIG, **DB_POOL_CONFIG)
+    return _pool
+
+def get_pool_stats():
+    """Get checkout, wait-time and latency counters for the connection pool"""
+    return get_connection_pool().stats()
 
 @contextmanager
 def get_db_connection():
-    """Context manager for MySQL database connections"""
+    """Context manager for pooled MySQL database connections"""
     try:
-        conn = mysql.connector.connect(**MYSQL_CONFIG)
-        cursor = conn.cursor(dictionary=True)  # Return results as dictionaries
+        pool = get_connection_pool()
+        conn, created_at = pool.acquire()
+        discard = False
         
-        class MySQLConnection:
-            """Wrapper to make MySQL connection compatible with existing code"""
-            def __init__(self, connection, cursor):
-                self._conn = connection
-                self._cursor = cursor
-            
-            def cursor(self):
-                return self._cursor
-            
-            def commit(self):
-                return self._conn.commit()
-            
-            def rollback(self):
-                return self._conn.rollback()
-            
-            def close(self):
-                self._cursor.close()
-                return self._conn.close()
-            
-            def execute(self, *args, **kwargs):
-                return self._cursor.execute(*args, **kwargs)
-            
-            def fetchone(self):
-                return self._cursor.fetchone()
-            
-            def fetchall(self):
-                return self._cursor.fetchall()
+        try:
+            ensure_schema(conn)
+            # Buffered so a reused connection never carries unread rows into the next checkout
+            cursor = conn.cursor(dictionary=True, buffered=True)  # Return results as dictionaries
+        except Exception:
+            pool.release(conn, created_at, discard=True)
+            raise
         
         wrapped_conn = MySQLConnection(conn, cursor)
         
@@ -49,187 +202,453 @@ def get_db_connection():
             yield wrapped_conn
             conn.commit()
         except Exception as e:
-            conn.rollback()
+            try:
+                conn.rollback()
+            except Exception:
+                discard = True
             raise e
         finally:
-            cursor.close()
-            conn.close()
+            try:
+                cursor.close()
+            except Exception:
+                discard = True
+            pool.release(conn, created_at, discard)
     except Error as e:
         print(f"❌ MySQL Connection Error: {e}")
         print("Make sure MySQL server is running and config.py has correct credentials!")
         raise e
 
-def init_database():
-    """Initialize MySQL database with all required tables"""
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
-        
+def _add_column(table, column, definition):
+    """Migration step adding a column unless it already exists"""
+    def step(cursor):
+        cursor.execute('SELECT 1 FROM information_schema.COLUMNS WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s', (table, column))
+        if cursor.fetchone() is None:
+            cursor.execute(f'ALTER TABLE {table} ADD COLUMN {column} {definition}')
+    return step
+
+def _add_index(table, index, columns):
+    """Migration step adding an index unless it already exists"""
+    def step(cursor):
+        cursor.execute('SELECT 1 FROM information_schema.STATISTICS WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME = %s LIMIT 1', (table, index))
+        if cursor.fetchone() is None:
+            cursor.execute(f'ALTER TABLE {table} ADD INDEX {index} ({columns})')
+    return step
+
+# Schema migrations, applied in order. Each entry is (version, description, steps), a step
+# being a SQL statement or a function of the cursor; append new entries instead of editing
+# old ones so existing databases pick them up. MySQL DDL commits implicitly, so a version
+# that fails partway is left half-applied and re-run from its first step: a version with
+# more than one step must make each one idempotent (CREATE TABLE IF NOT EXISTS,
+# _add_column, _add_index).
+MIGRATIONS = [
+    (1, 'Initial schema', [
         # Users table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS users (
-                user_id INT PRIMARY KEY AUTO_INCREMENT,
-                email VARCHAR(255) UNIQUE NOT NULL,
-                password_hash VARCHAR(255) NOT NULL,
-                full_name VARCHAR(255),
-                phone VARCHAR(50),
-                role VARCHAR(50) DEFAULT 'job_seeker',
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                last_login TIMESTAMP NULL,
-                is_active BOOLEAN DEFAULT TRUE
-            )
-        ''')
-        
+        '''
+        CREATE TABLE IF NOT EXISTS users (
+            user_id INT PRIMARY KEY AUTO_INCREMENT,
+            email VARCHAR(255) UNIQUE NOT NULL,
+            password_hash VARCHAR(255) NOT NULL,
+            full_name VARCHAR(255),
+            phone VARCHAR(50),
+            role VARCHAR(50) DEFAULT 'job_seeker',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            last_login TIMESTAMP NULL,
+            is_active BOOLEAN DEFAULT TRUE
+        )
+        ''',
         # User profiles table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS user_profiles (
-                profile_id INT PRIMARY KEY AUTO_INCREMENT,
-                user_id INT NOT NULL,
-                current_title VARCHAR(255),
-                experience_years INT,
-                education_level VARCHAR(100),
-                location VARCHAR(255),
-                linkedin_url VARCHAR(500),
-                github_url VARCHAR(500),
-                portfolio_url VARCHAR(500),
-                bio TEXT,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE
-            )
-        ''')
-        
+        '''
+        CREATE TABLE IF NOT EXISTS user_profiles (
+            profile_id INT PRIMARY KEY AUTO_INCREMENT,
+            user_id INT NOT NULL,
+            current_title VARCHAR(255),
+            experience_years INT,
+            education_level VARCHAR(100),
+            location VARCHAR(255),
+            linkedin_url VARCHAR(500),
+            github_url VARCHAR(500),
+            portfolio_url VARCHAR(500),
+            bio TEXT,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE
+        )
+        ''',
         # User sessions table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS user_sessions (
-                session_id INT PRIMARY KEY AUTO_INCREMENT,
-                user_id INT NOT NULL,
-                session_token VARCHAR(255) UNIQUE NOT NULL,
-                ip_address VARCHAR(50),
-                user_agent VARCHAR(500),
-                login_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                logout_time TIMESTAMP NULL,
-                is_active BOOLEAN DEFAULT TRUE,
-                FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE
-            )
-        ''')
-        
+        '''
+        CREATE TABLE IF NOT EXISTS user_sessions (
+            session_id INT PRIMARY KEY AUTO_INCREMENT,
+            user_id INT NOT NULL,
+            session_token VARCHAR(255) UNIQUE NOT NULL,
+            ip_address VARCHAR(50),
+            user_agent VARCHAR(500),
+            login_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            logout_time TIMESTAMP NULL,
+            is_active BOOLEAN DEFAULT TRUE,
+            FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE
+        )
+        ''',
         # Resumes table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS resumes (
-                resume_id INT PRIMARY KEY AUTO_INCREMENT,
-                user_id INT NOT NULL,
-                resume_name VARCHAR(255) NOT NULL,
-                file_path VARCHAR(500),
-                file_size INT,
-                file_type VARCHAR(50),
-                is_current BOOLEAN DEFAULT TRUE,
-                uploaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE
-            )
-        ''')
-        
+        '''
+        CREATE TABLE IF NOT EXISTS resumes (
+            resume_id INT PRIMARY KEY AUTO_INCREMENT,
+            user_id INT NOT NULL,
+            resume_name VARCHAR(255) NOT NULL,
+            file_path VARCHAR(500),
+            file_size INT,
+            file_type VARCHAR(50),
+            is_current BOOLEAN DEFAULT TRUE,
+            uploaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE
+        )
+        ''',
         # Resume versions table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS resume_versions (
-                version_id INT PRIMARY KEY AUTO_INCREMENT,
-                resume_id INT NOT NULL,
-                version_number INT NOT NULL,
-                raw_text LONGTEXT,
-                extracted_data TEXT,
-                changes_description TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (resume_id) REFERENCES resumes(resume_id) ON DELETE CASCADE
-            )
-        ''')
-        
+        '''
+        CREATE TABLE IF NOT EXISTS resume_versions (
+            version_id INT PRIMARY KEY AUTO_INCREMENT,
+            resume_id INT NOT NULL,
+            version_number INT NOT NULL,
+            raw_text LONGTEXT,
+            extracted_data TEXT,
+            changes_description TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (resume_id) REFERENCES resumes(resume_id) ON DELETE CASCADE
+        )
+        ''',
         # Resume analysis history table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS resume_analysis_history (
-                analysis_id INT PRIMARY KEY AUTO_INCREMENT,
-                resume_id INT NOT NULL,
-                version_id INT,
-                job_title VARCHAR(255),
-                job_description TEXT,
-                selection_probability FLOAT,
-                missing_skills TEXT,
-                strengths TEXT,
-                weaknesses TEXT,
-                suggestions TEXT,
-                analyzed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (resume_id) REFERENCES resumes(resume_id) ON DELETE CASCADE,
-                FOREIGN KEY (version_id) REFERENCES resume_versions(version_id) ON DELETE SET NULL
-            )
-        ''')
-        
+        '''
+        CREATE TABLE IF NOT EXISTS resume_analysis_history (
+            analysis_id INT PRIMARY KEY AUTO_INCREMENT,
+            resume_id INT NOT NULL,
+            version_id INT,
+            job_title VARCHAR(255),
+            job_description TEXT,
+            selection_probability FLOAT,
+            missing_skills TEXT,
+            strengths TEXT,
+            weaknesses TEXT,
+            suggestions TEXT,
+            analyzed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (resume_id) REFERENCES resumes(resume_id) ON DELETE CASCADE,
+            FOREIGN KEY (version_id) REFERENCES resume_versions(version_id) ON DELETE SET NULL
+        )
+        ''',
         # Companies table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS companies (
-                company_id INT PRIMARY KEY AUTO_INCREMENT,
-                company_name VARCHAR(255) UNIQUE NOT NULL,
-                industry VARCHAR(100),
-                company_size VARCHAR(50),
-                location VARCHAR(255),
-                website VARCHAR(500),
-                description TEXT,
-                rating FLOAT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
+        '''
+        CREATE TABLE IF NOT EXISTS companies (
+            company_id INT PRIMARY KEY AUTO_INCREMENT,
+            company_name VARCHAR(255) UNIQUE NOT NULL,
+            industry VARCHAR(100),
+            company_size VARCHAR(50),
+            location VARCHAR(255),
+            website VARCHAR(500),
+            description TEXT,
+            rating FLOAT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        ''',
         # Job applications table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS job_applications (
-                application_id INT PRIMARY KEY AUTO_INCREMENT,
-                user_id INT NOT NULL,
-                company_id INT,
-                resume_id INT,
-                job_title VARCHAR(255) NOT NULL,
-                job_description TEXT,
-                job_url VARCHAR(500),
-                application_date DATE NOT NULL,
-                status VARCHAR(50) DEFAULT 'Applied',
-                salary_min DECIMAL(10,2),
-                salary_max DECIMAL(10,2),
-                location VARCHAR(255),
-                job_type VARCHAR(50),
-                notes TEXT,
-                follow_up_date DATE,
-                interview_date DATETIME,
-                offer_date DATE,
-                rejection_date DATE,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE,
-                FOREIGN KEY (company_id) REFERENCES companies(company_id) ON DELETE SET NULL,
-                FOREIGN KEY (resume_id) REFERENCES resumes(resume_id) ON DELETE SET NULL
-            )
-        ''')
-        
+        '''
+        CREATE TABLE IF NOT EXISTS job_applications (
+            application_id INT PRIMARY KEY AUTO_INCREMENT,
+            user_id INT NOT NULL,
+            company_id INT,
+            resume_id INT,
+            job_title VARCHAR(255) NOT NULL,
+            job_description TEXT,
+            job_url VARCHAR(500),
+            application_date DATE NOT NULL,
+            status VARCHAR(50) DEFAULT 'Applied',
+            salary_min DECIMAL(10,2),
+            salary_max DECIMAL(10,2),
+            location VARCHAR(255),
+            job_type VARCHAR(50),
+            notes TEXT,
+            follow_up_date DATE,
+            interview_date DATETIME,
+            offer_date DATE,
+            rejection_date DATE,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE,
+            FOREIGN KEY (company_id) REFERENCES companies(company_id) ON DELETE SET NULL,
+            FOREIGN KEY (resume_id) REFERENCES resumes(resume_id) ON DELETE SET NULL
+        )
+        ''',
         # Application status history table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS application_status (
-                status_id INT PRIMARY KEY AUTO_INCREMENT,
-                application_id INT NOT NULL,
-                status VARCHAR(50) NOT NULL,
-                notes TEXT,
-                changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (application_id) REFERENCES job_applications(application_id) ON DELETE CASCADE
-            )
-        ''')
-        
+        '''
+        CREATE TABLE IF NOT EXISTS application_status (
+            status_id INT PRIMARY KEY AUTO_INCREMENT,
+            application_id INT NOT NULL,
+            status VARCHAR(50) NOT NULL,
+            notes TEXT,
+            changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (application_id) REFERENCES job_applications(application_id) ON DELETE CASCADE
+        )
+        ''',
+    ]),
+    (2, 'Content hash on resume versions', [
+        '''
+        ALTER TABLE resume_versions
+            ADD COLUMN content_hash CHAR(64) NULL,
+            ADD INDEX idx_resume_versions_content_hash (content_hash)
+        ''',
+    ]),
+    (3, 'Skill inverted index', [
+        '''
+        CREATE TABLE IF NOT EXISTS resume_skill_index (
+            skill_token VARCHAR(191) NOT NULL,
+            resume_id INT NOT NULL,
+            version_id INT NOT NULL,
+            PRIMARY KEY (skill_token, resume_id),
+            INDEX idx_resume_skill_index_resume (resume_id),
+            FOREIGN KEY (resume_id) REFERENCES resumes(resume_id) ON DELETE CASCADE,
+            FOREIGN KEY (version_id) REFERENCES resume_versions(version_id) ON DELETE CASCADE
+        )
+        ''',
+    ]),
+    (4, 'Resume section embeddings', [
+        '''
+        CREATE TABLE IF NOT EXISTS resume_embeddings (
+            version_id INT NOT NULL,
+            model_name VARCHAR(191) NOT NULL,
+            section VARCHAR(50) NOT NULL,
+            dimensions INT NOT NULL,
+            embedding BLOB NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (version_id, model_name, section),
+            FOREIGN KEY (version_id) REFERENCES resume_versions(version_id) ON DELETE CASCADE
+        )
+        ''',
+    ]),
+    (5, 'Background analysis jobs', [
+        '''
+        CREATE TABLE IF NOT EXISTS analysis_jobs (
+            job_id INT PRIMARY KEY AUTO_INCREMENT,
+            user_id INT NOT NULL,
+            job_type VARCHAR(50) NOT NULL,
+            status ENUM('queued', 'running', 'succeeded', 'failed') DEFAULT 'queued',
+            stage VARCHAR(50),
+            payload LONGTEXT NOT NULL,
+            input_data LONGBLOB,
+            result LONGTEXT,
+            error TEXT,
+            stage_timings TEXT,
+            attempts INT DEFAULT 0,
+            max_attempts INT DEFAULT 3,
+            run_after TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            locked_by VARCHAR(100),
+            locked_at TIMESTAMP NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            finished_at TIMESTAMP NULL,
+            INDEX idx_analysis_jobs_claim (status, run_after),
+            INDEX idx_analysis_jobs_user (user_id, created_at),
+            FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE
+        )
+        ''',
+    ]),
+    # Existing sessions get expires_at = now, so they are swept and their users log in again
+    (6, 'Session expiry', [
+        _add_column('user_sessions', 'last_seen', 'TIMESTAMP NULL'),
+        _add_column('user_sessions', 'expires_at', 'TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP'),
+        _add_index('user_sessions', 'idx_user_sessions_expiry', 'expires_at'),
+        '''
+        CREATE TABLE IF NOT EXISTS user_sessions_archive (
+            session_id INT PRIMARY KEY,
+            user_id INT NOT NULL,
+            ip_address VARCHAR(50),
+            user_agent VARCHAR(500),
+            login_time TIMESTAMP NULL,
+            logout_time TIMESTAMP NULL,
+            last_seen TIMESTAMP NULL,
+            expires_at TIMESTAMP NULL,
+            archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            INDEX idx_user_sessions_archive_user (user_id, login_time)
+        )
+        ''',
+    ]),
+    # Composite indexes matching the filters and sort orders of the per-user listing queries;
+    # each one also serves its table's foreign key, so the FK-only indexes become redundant
+    (7, 'Composite indexes for hot queries', [
+        _add_index('job_applications', 'idx_job_applications_user_status_date', 'user_id, status, application_date'),
+        _add_index('job_applications', 'idx_job_applications_user_date', 'user_id, application_date'),
+        _add_index('resumes', 'idx_resumes_user_uploaded', 'user_id, uploaded_at'),
+        _add_index('resume_analysis_history', 'idx_resume_analysis_history_resume_date', 'resume_id, analyzed_at'),
+        _add_index('application_status', 'idx_application_status_application', 'application_id, changed_at'),
+    ]),
+    # Maintained by job_tracker in the same transaction as each application write;
+    # a user's rows are built from job_applications on first use after this migration
+    (8, 'Materialized application statistics', [
+        '''
+        CREATE TABLE IF NOT EXISTS user_application_stats (
+            user_id INT PRIMARY KEY,
+            total_applications INT NOT NULL DEFAULT 0,
+            dated_offers INT NOT NULL DEFAULT 0,
+            offer_days_total INT NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS user_application_status_stats (
+            user_id INT NOT NULL,
+            status VARCHAR(50) NOT NULL,
+            application_count INT NOT NULL DEFAULT 0,
+            stage_exits INT NOT NULL DEFAULT 0,
+            stage_seconds BIGINT NOT NULL DEFAULT 0,
+            PRIMARY KEY (user_id, status),
+            FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE
+        )
+        ''',
+    ]),
+    # Re-uploads of a resume become versions of it; input_hash lets an analysis be reused
+    # by later versions whose analysed sections are unchanged
+    (9, 'Resume version diffs', [
+        _add_index('resumes', 'idx_resumes_user_name', 'user_id, resume_name'),
+        _add_column('resume_versions', 'section_diff', 'TEXT NULL'),
+        _add_index('resume_versions', 'idx_resume_versions_resume', 'resume_id, version_number'),
+        _add_column('resume_analysis_history', 'input_hash', 'CHAR(64) NULL'),
+        _add_index('resume_analysis_history', 'idx_resume_analysis_history_input', 'resume_id, input_hash'),
+    ]),
+    # Large texts move into deduplicated, compressed blobs (see text_store.py). The new
+    # columns are nullable with no foreign keys so they are added instantly on big tables;
+    # existing rows keep their inline text until `python text_store.py backfill` moves it
+    (10, 'Compressed text blobs', [
+        '''
+        CREATE TABLE IF NOT EXISTS text_blobs (
+            blob_id INT PRIMARY KEY AUTO_INCREMENT,
+            content_hash CHAR(64) NOT NULL,
+            compression VARCHAR(10) NOT NULL,
+            original_size INT NOT NULL,
+            data LONGBLOB NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE KEY uq_text_blobs_content_hash (content_hash)
+        )
+        ''',
+        _add_column('resume_versions', 'raw_text_blob_id', 'INT NULL'),
+        _add_column('resume_analysis_history', 'job_description_blob_id', 'INT NULL'),
+        _add_column('job_applications', 'job_description_blob_id', 'INT NULL'),
+    ]),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+SCHEMA_LOCK_NAME = 'resume_analyzer_schema_migration'
+SCHEMA_LOCK_TIMEOUT = 60
+
+_schema_ready = False
+_schema_lock = threading.Lock()
+
+def _current_schema_version(cursor):
+    """Read the applied schema version, 0 if the database has never been migrated"""
+    try:
+        cursor.execute('SELECT MAX(version) AS version FROM schema_version')
+        row = cursor.fetchone()
+        return (row['version'] or 0) if row else 0
+    except Error:
+        return 0
+
+def _apply_migrations(conn):
+    """Apply pending migrations while holding a cross-process advisory lock"""
+    cursor = conn.cursor(dictionary=True, buffered=True)
+    try:
+        # Fast path: one round-trip when another process already migrated
+        if _current_schema_version(cursor) >= SCHEMA_VERSION:
+            conn.commit()
+            return 0
+        # End the read snapshot so the re-check below sees other processes' work
         conn.commit()
-        print("✅ Database initialized successfully!")
+        
+        cursor.execute('SELECT GET_LOCK(%s, %s) AS acquired', (SCHEMA_LOCK_NAME, SCHEMA_LOCK_TIMEOUT))
+        if not cursor.fetchone()['acquired']:
+            raise Error(f"Timed out waiting for schema migration lock '{SCHEMA_LOCK_NAME}'")
+        
+        try:
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS schema_version (
+                    version INT PRIMARY KEY,
+                    description VARCHAR(255),
+                    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            
+            # Re-check under the lock; another process may have finished while we waited
+            current = _current_schema_version(cursor)
+            applied = 0
+            for version, description, steps in MIGRATIONS:
+                if version <= current:
+                    continue
+                for step in steps:
+                    if callable(step):
+                        step(cursor)
+                    else:
+                        cursor.execute(step)
+                cursor.execute('INSERT INTO schema_version (version, description) VALUES (%s, %s)', (version, description))
+                conn.commit()
+                applied += 1
+                print(f"✅ Applied schema migration {version}: {description}")
+            return applied
+        finally:
+            cursor.execute('SELECT RELEASE_LOCK(%s)', (SCHEMA_LOCK_NAME,))
+            cursor.fetchone()
+    finally:
+        cursor.close()
+
+def ensure_schema(conn=None):
+    """Bring the schema up to date once per process; later calls return immediately"""
+    global _schema_ready
+    if _schema_ready:
+        return
+    with _schema_lock:
+        if _schema_ready:
+            return
+        if conn is not None:
+            _apply_migrations(conn)
+        else:
+            pool = get_connection_pool()
+            raw_conn, created_at = pool.acquire()
+            discard = False
+            try:
+                _apply_migrations(raw_conn)
+            except Exception:
+                discard = True
+                raise
+            finally:
+                pool.release(raw_conn, created_at, discard)
+        _schema_ready = True
+
+def init_database():
+    """Initialize MySQL database with all required tables"""
+    global _schema_ready
+    _schema_ready = False
+    ensure_schema()
+    print("✅ Database initialized successfully!")
+
+PASSWORD_SCHEME = 'scrypt'
+
+def _scrypt(password, salt, n, r, p):
+    # scrypt needs 128 * n * r bytes; allow twice that so OpenSSL's default cap doesn't reject it
+    return hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p, maxmem=256 * n * r * p, dklen=32)
 
 def hash_password(password):
-    """Hash password using SHA-256"""
-    return hashlib.sha256(password.encode()).hexdigest()
+    """Hash password with salted scrypt, stored as scrypt$n$r$p$salt$hash"""
+    n, r, p = AUTH_CONFIG['scrypt_n'], AUTH_CONFIG['scrypt_r'], AUTH_CONFIG['scrypt_p']
+    salt = os.urandom(16)
+    return f"{PASSWORD_SCHEME}${n}${r}${p}${salt.hex()}${_scrypt(password, salt, n, r, p).hex()}"
 
 def verify_password(password, password_hash):
-    """Verify password against hash"""
-    return hash_password(password) == password_hash
+    """Verify password against a scrypt hash or a legacy unsalted SHA-256 hex digest"""
+    if password_hash.startswith(f"{PASSWORD_SCHEME}$"):
+        try:
+            _, n, r, p, salt, expected = password_hash.split('$')
+            actual = _scrypt(password, bytes.fromhex(salt), int(n), int(r), int(p))
+        except ValueError:
+            return False
+        return hmac.compare_digest(actual.hex(), expected)
+    return hmac.compare_digest(hashlib.sha256(password.encode()).hexdigest(), password_hash)
+
+def password_needs_rehash(password_hash):
+    """True for legacy hashes and scrypt hashes made with other cost parameters"""
+    current = f"{PASSWORD_SCHEME}${AUTH_CONFIG['scrypt_n']}${AUTH_CONFIG['scrypt_r']}${AUTH_CONFIG['scrypt_p']}$"
+    return not password_hash.startswith(current)
 
-# Initialize MySQL database on import
-try:
+if __name__ == "__main__":
     init_database()
-except Exception as e:
-    print(f"⚠️ Database initialization skipped: {e}")
-    print("Database will be created when first accessed.")
@@ -0,0 +1,275 @@
+"""
+Query plan check for auth.py, resume_manager.py and job_tracker.py
+Seeds a scratch MySQL database with synthetic users, sessions, resumes, analyses and
+applications, calls each public function while recording the statements it runs, then
+EXPLAINs every SELECT, UPDATE and DELETE. Exits non-zero when a plan does a full table
+scan or a filesort, so a missing index or a query that stops using one is caught
+before it reaches production.
+
+Usage:
+    python explain_queries.py
+    python explain_queries.py --database resume_analyzer_explain --users 500 --drop
+    python explain_queries.py --bench-resumes
+
+The scratch database is created on the server configured in config.py (DB_HOST etc.);
+never point --database at a database holding real data.
+"""
+import argparse
+import hashlib
+import io
+import random
+import statistics
+import sys
+import time
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+import mysql.connector
+
+import application_io
+import auth
+import database
+import job_tracker
+import resume_manager
+import text_store
+from config import MYSQL_CONFIG
+
+MODEL_NAME = 'explain-model'
+PASSWORD = 'explain-password'
+STATUSES = ['Applied', 'Interview', 'Offer', 'Rejected', 'Withdrawn']
+
+class RecordingCursor:
+    """Cursor proxy that records every statement executed through it"""
+    def __init__(self, cursor, statements):
+        self._cursor = cursor
+        self._statements = statements
+    
+    def execute(self, query, params=None):
+        self._statements.append((query, params))
+        return self._cursor.execute(query, params)
+    
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+@contextmanager
+def recording(statements):
+    """Record the statements run by module functions while the block executes"""
+    original = database.MySQLConnection.cursor
+    database.MySQLConnection.cursor = lambda self: RecordingCursor(original(self), statements)
+    try:
+        yield
+    finally:
+        database.MySQLConnection.cursor = original
+
+def create_database(name, drop=False):
+    server_config = {key: value for key, value in MYSQL_CONFIG.items() if key != 'database'}
+    conn = mysql.connector.connect(**server_config)
+    try:
+        cursor = conn.cursor()
+        if drop:
+            cursor.execute(f'DROP DATABASE IF EXISTS `{name}`')
+        cursor.execute(f'CREATE DATABASE IF NOT EXISTS `{name}` CHARACTER SET utf8mb4')
+    finally:
+        conn.close()
+    # The pool is created on first use, so pointing the shared config here redirects every module
+    MYSQL_CONFIG['database'] = name
+
+def seed(users, resumes_per_user, applications_per_user, seed_value=42):
+    """Insert synthetic rows; returns the ids the query catalogue uses"""
+    rng = random.Random(seed_value)
+    password_hash = database.hash_password(PASSWORD)
+    today = date.today()
+    with database.get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute('SELECT COALESCE(MAX(user_id), 0) AS last_id FROM users')
+        first_user = cursor.fetchone()['last_id'] + 1
+        user_ids = list(range(first_user, first_user + users))
+        cursor.executemany('INSERT INTO users (user_id, email, password_hash, full_name) VALUES (%s, %s, %s, %s)', [(user_id, f'user{user_id}@example.com', password_hash, f'User {user_id}') for user_id in user_ids])
+        cursor.executemany('INSERT INTO user_profiles (user_id) VALUES (%s)', [(user_id,) for user_id in user_ids])
+        cursor.executemany('INSERT INTO user_sessions (user_id, session_token, last_seen, expires_at) VALUES (%s, %s, NOW(), NOW() + INTERVAL %s SECOND)', [(user_id, f'{user_id:08d}-{i}-{rng.getrandbits(64):016x}', 86400 if i == 0 else rng.choice([-3600, 3600])) for user_id in user_ids for i in range(3)])
+        
+        company_names = [f'Company {i}' for i in range(max(10, users // 4))]
+        cursor.executemany('INSERT IGNORE INTO companies (company_name) VALUES (%s)', [(name,) for name in company_names])
+        cursor.execute('SELECT company_id FROM companies')
+        company_ids = [row['company_id'] for row in cursor.fetchall()]
+        
+        cursor.executemany('INSERT INTO resumes (user_id, resume_name, file_path, file_size, file_type, is_current, uploaded_at) VALUES (%s, %s, %s, %s, %s, %s, %s)', [(user_id, f'resume{i}.pdf', f'uploads/{user_id}/resume{i}.pdf', 1000, 'pdf', i == 0, today - timedelta(days=rng.randrange(365))) for user_id in user_ids for i in range(resumes_per_user)])
+        cursor.execute('SELECT resume_id FROM resumes WHERE user_id >= %s', (first_user,))
+        resume_ids = [row['resume_id'] for row in cursor.fetchall()]
+        cursor.executemany('INSERT INTO resume_versions (resume_id, version_number, raw_text, extracted_data, changes_description, content_hash) VALUES (%s, %s, %s, %s, %s, %s)', [(resume_id, version, 'resume text', '{"skills": ["python", "sql"]}', 'Seeded', hashlib.sha256(f'{resume_id}:{version}'.encode()).hexdigest()) for resume_id in resume_ids for version in (1, 2)])
+        cursor.executemany('INSERT INTO resume_analysis_history (resume_id, job_title, selection_probability, analyzed_at) VALUES (%s, %s, %s, NOW() - INTERVAL %s DAY)', [(resume_id, 'Software Engineer', rng.random() * 100, rng.randrange(365)) for resume_id in resume_ids for _ in range(3)])
+        
+        cursor.executemany('INSERT INTO job_applications (user_id, company_id, job_title, application_date, status, offer_date) VALUES (%s, %s, %s, %s, %s, %s)', [(user_id, rng.choice(company_ids), 'Engineer', applied, status, applied + timedelta(days=20) if status == 'Offer' else None) for user_id in user_ids for status, applied in ((rng.choice(STATUSES), today - timedelta(days=rng.randrange(365))) for _ in range(applications_per_user))])
+        cursor.execute('INSERT INTO application_status (application_id, status, notes) SELECT application_id, status, %s FROM job_applications WHERE user_id >= %s', ('Seeded', first_user))
+        cursor.execute('SELECT application_id FROM job_applications WHERE user_id = %s LIMIT 1', (first_user,))
+        application_id = cursor.fetchone()['application_id']
+        cursor.execute('SELECT MAX(version_id) AS version_id FROM resume_versions WHERE resume_id = %s', (resume_ids[0],))
+        version_id = cursor.fetchone()['version_id']
+        cursor.execute('SELECT session_token FROM user_sessions WHERE user_id = %s AND expires_at > NOW() LIMIT 1', (first_user,))
+        session_token = cursor.fetchone()['session_token']
+        
+        for table in ('users', 'user_sessions', 'companies', 'resumes', 'resume_versions', 'resume_analysis_history', 'job_applications', 'application_status'):
+            cursor.execute(f'ANALYZE TABLE {table}')
+            cursor.fetchall()
+    return {'user_id': first_user, 'resume_id': resume_ids[0], 'version_id': version_id, 'application_id': application_id, 'session_token': session_token}
+
+def query_catalogue(ids):
+    """(name, function, args, allowed problems) for every public query function"""
+    user_id, resume_id, version_id = ids['user_id'], ids['resume_id'], ids['version_id']
+    email = f'user{user_id}@example.com'
+    upload = {'resume_name': 'explain.pdf', 'file_path': 'uploads/explain.pdf', 'file_size': 1000, 'file_type': 'pdf', 'raw_text': 'text', 'extracted_data': {'skills': ['python']}}
+    return [
+        ('auth.register_user', auth.register_user, ('explain-new@example.com', PASSWORD, 'New User'), ()),
+        ('auth.login_user', auth.login_user, (email, PASSWORD), ()),
+        ('auth.get_session_user', auth.get_session_user, (ids['session_token'],), ()),
+        ('auth.logout_user', auth.logout_user, (ids['session_token'],), ()),
+        ('auth.get_user_profile', auth.get_user_profile, (user_id,), ()),
+        ('auth.update_user_profile', auth.update_user_profile, (user_id, {'current_title': 'Engineer'}), ()),
+        ('auth.SessionSweeper.sweep', auth.session_sweeper.sweep, (), ()),
+        ('resume_manager.save_resume', resume_manager.save_resume, (user_id, upload['resume_name'], upload['file_path'], upload['file_size'], upload['file_type'], upload['raw_text'], upload['extracted_data'], 'f' * 64), ()),
+        # Same name as the upload above, so this one is saved as its second version
+        ('resume_manager.save_resume(new version)', resume_manager.save_resume, (user_id, upload['resume_name'], upload['file_path'], upload['file_size'], upload['file_type'], upload['raw_text'], {'skills': ['python', 'sql']}, 'd' * 64), ()),
+        ('resume_manager.get_resume_versions', resume_manager.get_resume_versions, (user_id, resume_id), ()),
+        ('resume_manager.get_resume_versions(user)', resume_manager.get_resume_versions, (user_id,), ()),
+        ('resume_manager.save_resumes_batch', resume_manager.save_resumes_batch, (user_id, [{**upload, 'file_path': 'uploads/explain-batch.pdf', 'content_hash': 'e' * 64}]), ()),
+        ('resume_manager.get_user_resumes', resume_manager.get_user_resumes, (user_id,), ()),
+        ('resume_manager.get_latest_resume_data(user)', resume_manager.get_latest_resume_data, (user_id,), ()),
+        ('resume_manager.get_latest_resume_data(ids)', resume_manager.get_latest_resume_data, (None, [resume_id, resume_id + 1]), ()),
+        ('resume_manager.get_version_raw_text', resume_manager.get_version_raw_text, (version_id,), ()),
+        ('resume_manager.get_current_version_id', resume_manager.get_current_version_id, (resume_id,), ()),
+        ('resume_manager.save_resume_embeddings', resume_manager.save_resume_embeddings, (version_id, MODEL_NAME, {'full': [0.1, 0.2]}), ()),
+        ('resume_manager.get_resume_embeddings', resume_manager.get_resume_embeddings, (version_id, MODEL_NAME), ()),
+        ('resume_manager.get_resume_embedding_batch', resume_manager.get_resume_embedding_batch, (MODEL_NAME,), ()),
+        # Whole-corpus batch reads for the vector index; scanning every resume is the point
+        ('resume_manager.get_latest_resume_data(all)', resume_manager.get_latest_resume_data, (), ('full scan',)),
+        ('resume_manager.get_versions_missing_embeddings', resume_manager.get_versions_missing_embeddings, (MODEL_NAME,), ('full scan',)),
+        ('resume_manager.get_latest_version_ids', resume_manager.get_latest_version_ids, (), ('full scan',)),
+        ('resume_manager.save_analysis', resume_manager.save_analysis, (resume_id, version_id, 'Engineer', 'Description', {'selection_probability': 50}), ()),
+        ('resume_manager.reuse_analysis', resume_manager.reuse_analysis, (resume_id, version_id, 'Engineer', 'c' * 64), ()),
+        ('resume_manager.get_analysis_history', resume_manager.get_analysis_history, (resume_id,), ()),
+        # Newest first across all of a user's resumes; the sort covers only that user's analyses
+        ('resume_manager.get_user_analysis_history', resume_manager.get_user_analysis_history, (user_id,), ('filesort',)),
+        ('resume_manager.get_user_analysis_history(cursor)', resume_manager.get_user_analysis_history, (user_id, 200, 10 ** 9), ('filesort',)),
+        # The user's first write builds their statistics summary
+        ('job_tracker.add_job_application', job_tracker.add_job_application, (user_id, {'company_name': 'Company 1', 'job_title': 'Engineer', 'application_date': date.today()}), ()),
+        ('job_tracker.add_job_applications_batch', job_tracker.add_job_applications_batch, (user_id, [{'company_name': f'Company {i}', 'job_title': 'Engineer', 'application_date': date.today()} for i in range(3)] + [{'company_name': 'Explain New Company', 'job_title': 'Engineer', 'application_date': date.today()}]), ()),
+        ('job_tracker.get_user_applications', job_tracker.get_user_applications, (user_id,), ()),
+        ('job_tracker.get_user_applications(status)', job_tracker.get_user_applications, (user_id, 'Interview'), ()),
+        ('job_tracker.get_applications_page', job_tracker.get_applications_page, (user_id,), ()),
+        ('job_tracker.get_applications_page(cursor, status)', job_tracker.get_applications_page, (user_id, 25, f'{date.today().isoformat()}:{10 ** 9}', 'Interview'), ()),
+        ('job_tracker.get_applications_page(company, dates)', job_tracker.get_applications_page, (user_id, 25, None, None, 'Company 1', date.today() - timedelta(days=90), date.today()), ()),
+        ('job_tracker.update_application_status', job_tracker.update_application_status, (ids['application_id'], user_id, 'Interview'), ()),
+        ('job_tracker.get_application_statistics', job_tracker.get_application_statistics, (user_id,), ()),
+        ('job_tracker.reconcile_application_stats', job_tracker.reconcile_application_stats, ([user_id], False), ()),
+        ('text_store.backfill', text_store.backfill, (), ()),
+        ('application_io.export_applications', application_io.export_applications, (user_id, io.StringIO()), ()),
+    ]
+
+def explainable(query):
+    statement = query.lstrip().split(None, 1)[0].upper()
+    return statement in ('SELECT', 'UPDATE', 'DELETE') and 'information_schema' not in query and 'schema_version' not in query
+
+def plan_problems(plan, allowed=()):
+    """Full scans and filesorts in an EXPLAIN result"""
+    problems = []
+    for row in plan:
+        table = row.get('table') or ''
+        # Derived tables and subquery results are materialized; their base tables are checked on their own rows
+        if table.startswith('<'):
+            continue
+        extra = row.get('Extra') or ''
+        if row.get('type') == 'ALL' and 'full scan' not in allowed:
+            problems.append(f"full scan of {table}")
+        if 'filesort' in extra and 'filesort' not in allowed:
+            problems.append(f"filesort on {table}")
+    return problems
+
+def check_plans(catalogue, verbose=False):
+    """Run each catalogue entry, EXPLAIN what it executed; returns the number of failing statements"""
+    failures = 0
+    for name, function, args, allowed in catalogue:
+        statements = []
+        with recording(statements):
+            function(*args)
+        explained = [(query, params) for query, params in statements if explainable(query)]
+        with database.get_db_connection() as conn:
+            cursor = conn.cursor()
+            for query, params in explained:
+                cursor.execute('EXPLAIN ' + query, params)
+                plan = cursor.fetchall()
+                problems = plan_problems(plan, allowed)
+                summary = ', '.join(f"{row.get('table')}:{row.get('type')}/{row.get('key') or '-'}" for row in plan)
+                if problems:
+                    failures += 1
+                    print(f"❌ {name}: {'; '.join(problems)}")
+                    print(f"   {' '.join(query.split())}")
+                    print(f"   plan: {summary}")
+                elif verbose:
+                    print(f"✅ {name}: {summary}")
+        if not explained and verbose:
+            print(f"➖ {name}: inserts only")
+    return failures
+
+# get_user_resumes before it switched to count subqueries, kept for comparison
+FAN_OUT_RESUMES_QUERY = 'SELECT r.*, COUNT(DISTINCT rv.version_id) as version_count, COUNT(DISTINCT rah.analysis_id) as analysis_count FROM resumes r LEFT JOIN resume_versions rv ON r.resume_id = rv.resume_id LEFT JOIN resume_analysis_history rah ON r.resume_id = rah.resume_id WHERE r.user_id = %s GROUP BY r.resume_id ORDER BY r.uploaded_at DESC'
+
+def _median_ms(function, repeats):
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+def benchmark_user_resumes(sizes=((1, 1), (10, 100), (100, 1000)), repeats=20):
+    """Time get_user_resumes against the old double-join query for one resume of each (versions, analyses) size"""
+    print(f"{'versions x analyses':>20} {'get_user_resumes':>17} {'double join':>12}")
+    for versions, analyses in sizes:
+        with database.get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT COALESCE(MAX(user_id), 0) + 1 AS user_id FROM users')
+            user_id = cursor.fetchone()['user_id']
+            cursor.execute('INSERT INTO users (user_id, email, password_hash, full_name) VALUES (%s, %s, %s, %s)', (user_id, f'bench{user_id}@example.com', 'x', 'Benchmark'))
+            cursor.execute('INSERT INTO resumes (user_id, resume_name, file_path, file_size, file_type) VALUES (%s, %s, %s, %s, %s)', (user_id, 'bench.pdf', 'uploads/bench.pdf', 1000, 'pdf'))
+            resume_id = cursor.lastrowid
+            cursor.executemany('INSERT INTO resume_versions (resume_id, version_number, raw_text) VALUES (%s, %s, %s)', [(resume_id, version, 'text') for version in range(1, versions + 1)])
+            cursor.executemany('INSERT INTO resume_analysis_history (resume_id, job_title) VALUES (%s, %s)', [(resume_id, 'Engineer')] * analyses)
+        
+        def fan_out():
+            with database.get_db_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(FAN_OUT_RESUMES_QUERY, (user_id,))
+                cursor.fetchall()
+        
+        current_ms = _median_ms(lambda: resume_manager.get_user_resumes(user_id), repeats)
+        fan_out_ms = _median_ms(fan_out, repeats)
+        print(f"{f'{versions} x {analyses}':>20} {current_ms:>14.2f} ms {fan_out_ms:>9.2f} ms")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="EXPLAIN the application's queries against a seeded scratch database")
+    parser.add_argument('--database', default=f"{MYSQL_CONFIG['database']}_explain")
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--resumes-per-user', type=int, default=5)
+    parser.add_argument('--applications-per-user', type=int, default=25)
+    parser.add_argument('--drop', action='store_true', help="Drop and recreate the scratch database first")
+    parser.add_argument('-v', '--verbose', action='store_true', help="Print passing plans too")
+    parser.add_argument('--bench-resumes', action='store_true', help="Also time get_user_resumes as versions and analyses grow")
+    args = parser.parse_args(argv)
+    
+    if args.database == MYSQL_CONFIG['database']:
+        print("❌ Refusing to seed the application database; pass a scratch --database")
+        return 2
+    create_database(args.database, args.drop)
+    ids = seed(args.users, args.resumes_per_user, args.applications_per_user)
+    print(f"✅ Seeded {args.users} users into {args.database}")
+    failures = check_plans(query_catalogue(ids), args.verbose)
+    if args.bench_resumes:
+        benchmark_user_resumes()
+    if failures:
+        print(f"❌ {failures} statements scan whole tables or filesort")
+        return 1
+    print("✅ All query plans use indexes")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
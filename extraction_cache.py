@@ -0,0 +1,125 @@
+"""
+Content-addressed cache for resume extraction results
+Keyed by the SHA-256 of the uploaded file bytes, so re-uploading or re-analyzing
+an unchanged resume skips PDF/DOCX parsing and extract_resume_data entirely
+"""
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from config import EXTRACTION_CACHE_CONFIG
+
+# Bump when the extractor output format changes so stale disk entries are ignored
+CACHE_FORMAT_VERSION = 1
+
+def file_hash(data):
+    """SHA-256 hex digest of uploaded file bytes"""
+    return hashlib.sha256(data).hexdigest()
+
+class ExtractionCache:
+    """Bounded in-process LRU with an optional on-disk JSON tier"""
+    def __init__(self, max_entries=256, disk_dir=None):
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'disk_hits': 0, 'misses': 0, 'evictions': 0, 'disk_errors': 0}
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+    
+    def _disk_path(self, content_hash):
+        return os.path.join(self.disk_dir, f"{content_hash}.json")
+    
+    def _remember(self, content_hash, entry):
+        with self._lock:
+            self._entries[content_hash] = entry
+            self._entries.move_to_end(content_hash)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+    
+    def get(self, content_hash):
+        """Return (raw_text, resume_data) for a hash, or None on a miss; treat the result as read-only"""
+        with self._lock:
+            entry = self._entries.get(content_hash)
+            if entry is not None:
+                self._entries.move_to_end(content_hash)
+                self._stats['hits'] += 1
+                return entry
+        
+        if self.disk_dir:
+            try:
+                with open(self._disk_path(content_hash), encoding='utf-8') as f:
+                    payload = json.load(f)
+                if payload.get('version') == CACHE_FORMAT_VERSION:
+                    entry = (payload['raw_text'], payload['resume_data'])
+                    self._remember(content_hash, entry)
+                    with self._lock:
+                        self._stats['disk_hits'] += 1
+                    return entry
+            except FileNotFoundError:
+                pass
+            except (OSError, ValueError, KeyError):
+                with self._lock:
+                    self._stats['disk_errors'] += 1
+        
+        with self._lock:
+            self._stats['misses'] += 1
+        return None
+    
+    def put(self, content_hash, raw_text, resume_data):
+        """Store extraction results for a hash in memory and, if enabled, on disk"""
+        self._remember(content_hash, (raw_text, resume_data))
+        if self.disk_dir:
+            path = self._disk_path(content_hash)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            try:
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump({'version': CACHE_FORMAT_VERSION, 'raw_text': raw_text, 'resume_data': resume_data}, f)
+                os.replace(tmp_path, path)  # Atomic, so readers never see a partial file
+            except OSError:
+                with self._lock:
+                    self._stats['disk_errors'] += 1
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+    
+    def stats(self):
+        """Snapshot of hit/miss counters"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+        lookups = stats['hits'] + stats['disk_hits'] + stats['misses']
+        stats['hit_rate'] = (stats['hits'] + stats['disk_hits']) / lookups if lookups else 0.0
+        return stats
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_extraction_cache():
+    """Get the process-wide extraction cache, creating it on first use"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ExtractionCache(**EXTRACTION_CACHE_CONFIG)
+    return _cache
+
+def cached_extraction(data, extract_text_fn, extract_data_fn):
+    """
+    Return (content_hash, raw_text, resume_data) for file bytes, running the
+    extractors only when this exact file has not been seen before
+    """
+    content_hash = file_hash(data)
+    cache = get_extraction_cache()
+    entry = cache.get(content_hash)
+    if entry is not None:
+        return content_hash, entry[0], entry[1]
+    
+    raw_text = extract_text_fn(data)
+    resume_data = extract_data_fn(raw_text)
+    cache.put(content_hash, raw_text, resume_data)
+    return content_hash, raw_text, resume_data
@@ -0,0 +1,215 @@
+"""
+Semantic resume/job matching with sentence-transformers
+The model is loaded lazily, once per process, on a background thread so the first
+request never blocks past the configured latency budget. Resume section embeddings
+are stored per resume_versions row and reused; job description embeddings are kept
+in a small in-process LRU.
+"""
+import hashlib
+import re
+import threading
+import time
+from collections import Counter, OrderedDict
+
+import numpy as np
+
+from config import SEMANTIC_CONFIG
+
+RESUME_SECTIONS = ['skills', 'experience', 'projects', 'education', 'certifications']
+
+STOPWORDS = frozenset("""
+a about above across after all also an and any are as at be been being both but by can could
+daily do does each either etc for from has have having help how if in including into is it its
+job join key looking make may more most must need new not of on or other our out over own per
+responsibilities role seeking should so some strong such team than that the their them then
+there these they this those through to under up us using we well what when where which while
+who will with within work working would you your ideal candidate experience skills ability
+years year plus preferred required requirements responsible knowledge understanding talented
+""".split())
+
+KEYWORD_PATTERN = re.compile(r'[a-z][a-z0-9+#./-]*[a-z0-9+#]')
+
+def empty_analysis(status='disabled'):
+    """Analysis result used when semantic matching is off or not ready"""
+    return {'similarity_score': 0, 'missing_keywords': [], 'strengths': [], 'improvements': [], 'status': status}
+
+def extract_keywords(text, limit=15):
+    """Most frequent non-stopword terms of a job description"""
+    counts = Counter(word for word in KEYWORD_PATTERN.findall(text.lower()) if word not in STOPWORDS and len(word) > 2)
+    return [word for word, _ in counts.most_common(limit)]
+
+def resume_section_texts(resume_data):
+    """Non-empty section texts of a resume, plus the whole resume under 'full'"""
+    sections = {}
+    for section in RESUME_SECTIONS:
+        text = ' '.join(resume_data.get(section, []))
+        if text.strip():
+            sections[section] = text
+    sections['full'] = ' '.join([resume_data.get('name', '')] + list(sections.values())).strip()
+    return sections
+
+class FreeAIAnalyzer:
+    """Sentence-embedding similarity between a resume and a job description"""
+    def __init__(self, model_name=None, device=None, batch_size=None, latency_budget_ms=None, keyword_threshold=None, job_cache_size=128, keyword_cache_size=4096):
+        self.model_name = model_name or SEMANTIC_CONFIG['model_name']
+        self.device = device or SEMANTIC_CONFIG['device']
+        self.batch_size = batch_size or SEMANTIC_CONFIG['batch_size']
+        self.latency_budget_ms = latency_budget_ms or SEMANTIC_CONFIG['latency_budget_ms']
+        self.keyword_threshold = keyword_threshold or SEMANTIC_CONFIG['keyword_threshold']
+        self._model = None
+        self._load_error = None
+        self._loaded = threading.Event()
+        self._load_lock = threading.Lock()
+        self._loader = None
+        self._job_cache = OrderedDict()
+        self._job_cache_size = job_cache_size
+        self._keyword_cache = OrderedDict()
+        self._keyword_cache_size = keyword_cache_size
+        self._cache_lock = threading.Lock()
+    
+    def _load_model(self):
+        try:
+            from sentence_transformers import SentenceTransformer
+            self._model = SentenceTransformer(self.model_name, device=self.device)
+        except Exception as e:
+            self._load_error = e
+            print(f"⚠️ Semantic model unavailable: {e}")
+        finally:
+            self._loaded.set()
+    
+    def warm_up(self):
+        """Start loading the model in the background (no-op once started)"""
+        with self._load_lock:
+            if self._loader is None:
+                self._loader = threading.Thread(target=self._load_model, name='semantic-model-loader', daemon=True)
+                self._loader.start()
+    
+    def wait_until_ready(self, timeout=None):
+        """True once the model is loaded and usable"""
+        self.warm_up()
+        return self._loaded.wait(timeout) and self._model is not None
+    
+    def encode(self, texts):
+        """Batch-encode texts into L2-normalized float32 embeddings"""
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        embeddings = self._model.encode(texts, batch_size=self.batch_size, convert_to_numpy=True, normalize_embeddings=True, show_progress_bar=False)
+        return embeddings.astype(np.float32, copy=False)
+    
+    def _job_embedding(self, job_description):
+        key = hashlib.sha256(f"{self.model_name}\0{job_description}".encode()).hexdigest()
+        with self._cache_lock:
+            if key in self._job_cache:
+                self._job_cache.move_to_end(key)
+                return self._job_cache[key]
+        embedding = self.encode([job_description])[0]
+        with self._cache_lock:
+            self._job_cache[key] = embedding
+            while len(self._job_cache) > self._job_cache_size:
+                self._job_cache.popitem(last=False)
+        return embedding
+    
+    def _keyword_embeddings(self, keywords):
+        """Embeddings of keywords as a matrix, encoding only those not cached yet in one batch"""
+        with self._cache_lock:
+            cached = {}
+            for keyword in keywords:
+                if keyword in self._keyword_cache:
+                    self._keyword_cache.move_to_end(keyword)
+                    cached[keyword] = self._keyword_cache[keyword]
+        missing = [keyword for keyword in keywords if keyword not in cached]
+        if missing:
+            encoded = dict(zip(missing, self.encode(missing)))
+            cached.update(encoded)
+            with self._cache_lock:
+                self._keyword_cache.update(encoded)
+                while len(self._keyword_cache) > self._keyword_cache_size:
+                    self._keyword_cache.popitem(last=False)
+        return np.stack([cached[keyword] for keyword in keywords])
+    
+    def resume_embeddings(self, resume_data, version_id=None):
+        """
+        Section name -> embedding, loaded from resume_versions storage when available.
+        A new version carries over its unchanged sections' embeddings, so only the
+        changed sections are encoded.
+        """
+        sections = resume_section_texts(resume_data)
+        stored = {}
+        if version_id is not None:
+            from resume_manager import get_resume_embeddings
+            stored = {name: embedding for name, embedding in get_resume_embeddings(version_id, self.model_name).items() if name in sections}
+            if len(stored) == len(sections):
+                return stored
+        
+        missing = [name for name in sections if name not in stored]
+        embeddings = dict(zip(missing, self.encode([sections[name] for name in missing])))
+        if version_id is not None:
+            from resume_manager import save_resume_embeddings
+            save_resume_embeddings(version_id, self.model_name, embeddings)
+        return {name: stored[name] if name in stored else embeddings[name] for name in sections}
+    
+    def advanced_resume_analysis(self, resume_data, job_description, version_id=None, job_skills=None):
+        """
+        Similarity score (0-100), missing keywords, strengths and improvements.
+        Stages that would run past latency_budget_ms are skipped and the result's
+        status says why; the model load itself never blocks longer than the budget.
+        """
+        if not SEMANTIC_CONFIG['enabled'] or not job_description.strip():
+            return empty_analysis()
+        
+        started = time.monotonic()
+        budget = self.latency_budget_ms / 1000
+        if not self.wait_until_ready(timeout=budget):
+            return empty_analysis('model_loading' if self._load_error is None else 'model_unavailable')
+        
+        try:
+            resume = self.resume_embeddings(resume_data, version_id)
+            job = self._job_embedding(job_description)
+        except Exception as e:
+            print(f"⚠️ Semantic analysis failed: {e}")
+            return empty_analysis('error')
+        
+        section_scores = {name: float(np.dot(embedding, job)) for name, embedding in resume.items()}
+        analysis = empty_analysis('ok')
+        analysis['similarity_score'] = max(0.0, section_scores.get('full', 0.0)) * 100
+        
+        for section in RESUME_SECTIONS:
+            if section not in section_scores:
+                continue
+            if section_scores[section] >= 0.5:
+                analysis['strengths'].append(f"{section.title()} section closely matches the job description")
+            elif section_scores[section] < 0.3:
+                analysis['improvements'].append(f"Tailor your {section} section to the job description's wording")
+        
+        if time.monotonic() - started > budget:
+            analysis['status'] = 'budget_exceeded'
+            return analysis
+        
+        # Keywords are missing if neither written in the resume nor semantically close to a section
+        candidates, seen = [], set()
+        for keyword in (job_skills or []) + extract_keywords(job_description):
+            if keyword.lower() not in seen:
+                seen.add(keyword.lower())
+                candidates.append(keyword)
+        resume_text = resume_section_texts(resume_data)['full'].lower()
+        unmatched = [keyword for keyword in candidates if keyword.lower() not in resume_text]
+        if unmatched:
+            keyword_embeddings = self._keyword_embeddings(unmatched)
+            section_matrix = np.stack(list(resume.values()))
+            best = (keyword_embeddings @ section_matrix.T).max(axis=1)
+            analysis['missing_keywords'] = [keyword for keyword, score in zip(unmatched, best) if score < self.keyword_threshold]
+        return analysis
+
+_analyzer = None
+_analyzer_lock = threading.Lock()
+
+def get_ai_analyzer():
+    """Get the process-wide analyzer; its model loads once and is shared by all sessions"""
+    global _analyzer
+    if _analyzer is None:
+        with _analyzer_lock:
+            if _analyzer is None:
+                _analyzer = FreeAIAnalyzer()
+                if SEMANTIC_CONFIG['enabled']:
+                    _analyzer.warm_up()
+    return _analyzer
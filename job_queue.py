@@ -0,0 +1,313 @@
+"""
+Background job queue for resume analysis
+Jobs are rows in analysis_jobs. Workers claim them with SELECT ... FOR UPDATE SKIP
+LOCKED, run them stage by stage (recording the current stage and per-stage timings
+so the UI can poll progress), and retry failures with exponential backoff.
+
+Workers run either as threads inside the Streamlit process (JOB_QUEUE_INLINE_WORKERS)
+or as a separate pool of processes:
+    python job_queue.py worker --workers 4
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import socket
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from config import JOB_QUEUE_CONFIG
+from database import get_db_connection
+
+class StageTimer:
+    """Times the stages of one job and publishes the current stage to its row"""
+    def __init__(self, job_id):
+        self.job_id = job_id
+        self.timings = {}
+    
+    @contextmanager
+    def stage(self, name):
+        update_job_stage(self.job_id, name, self.timings)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = round((time.perf_counter() - started) * 1000, 1)
+
+def run_resume_analysis(job, timer):
+    """Handler: parse an uploaded resume, save it and its analysis; returns the job result"""
+    from analysis_cache import analysis_fingerprint, get_resume_analysis
+    from extraction_cache import cached_extraction
+    from resume_extractor import extract_resume_data
+    from resume_manager import get_current_version_id, reuse_analysis, save_analysis, save_resume
+    from resume_parser import extract_text
+    
+    payload = job['payload']
+    file_name = payload['file_name']
+    with timer.stage('extract'):
+        content_hash, raw_text, resume_data = cached_extraction(
+            job['input_data'],
+            lambda data: extract_text(file_name, data),
+            extract_resume_data
+        )
+    
+    # save_resume reuses the stored copy of an identical upload, so a retry never duplicates it;
+    # a re-upload under the same name becomes a new version of that resume
+    with timer.stage('save_resume'):
+        success, resume_id, message = save_resume(
+            user_id=job['user_id'],
+            resume_name=file_name,
+            file_path=f"uploads/{file_name}",
+            file_size=payload['file_size'],
+            file_type=file_name.split('.')[-1],
+            raw_text=raw_text,
+            extracted_data=resume_data,
+            content_hash=content_hash
+        )
+        if not success:
+            raise RuntimeError(message)
+        version_id = get_current_version_id(resume_id)
+    
+    # An earlier version's analysis stands if the sections it read and the job are unchanged
+    job_title = payload.get('job_title') or 'Unknown'
+    input_hash = analysis_fingerprint(resume_data, payload['job_description'], payload['job_requirements'])
+    with timer.stage('reuse_analysis'):
+        reused, _ = reuse_analysis(resume_id, version_id, job_title, input_hash)
+    
+    if not reused:
+        with timer.stage('analyze'):
+            analysis = get_resume_analysis(resume_data, payload['job_description'], payload['job_requirements'])
+        
+        with timer.stage('save_analysis'):
+            success, analysis_message = save_analysis(
+                resume_id=resume_id,
+                version_id=version_id,
+                job_title=job_title,
+                job_description=payload['job_description'],
+                analysis_results={
+                    'selection_probability': analysis.selection_probability,
+                    'missing_skills': analysis.gaps.get('missing_skills', []),
+                    'strengths': analysis.gaps.get('matching_skills', []),
+                    'weaknesses': analysis.gaps.get('missing_skills', []),
+                    'suggestions': []
+                },
+                input_hash=input_hash
+            )
+            if not success:
+                raise RuntimeError(analysis_message)
+    
+    return {'resume_id': resume_id, 'version_id': version_id, 'content_hash': content_hash, 'resume_data': resume_data, 'message': message, 'analysis_reused': reused}
+
+JOB_HANDLERS = {
+    'resume_analysis': run_resume_analysis,
+}
+
+def enqueue_job(user_id, job_type, payload, input_data=None):
+    """Queue a job; returns (success, job_id, message)"""
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('INSERT INTO analysis_jobs (user_id, job_type, payload, input_data, max_attempts) VALUES (%s, %s, %s, %s, %s)', (user_id, job_type, json.dumps(payload), input_data, JOB_QUEUE_CONFIG['max_attempts']))
+            return True, cursor.lastrowid, "Analysis queued"
+    except Exception as e:
+        return False, None, f"Failed to queue analysis: {str(e)}"
+
+def enqueue_resume_analysis(user_id, file_name, data, job_title, job_description, job_requirements):
+    """Queue parsing, saving and analysis of an uploaded resume"""
+    payload = {
+        'file_name': file_name,
+        'file_size': len(data),
+        'job_title': job_title,
+        'job_description': job_description,
+        'job_requirements': job_requirements
+    }
+    return enqueue_job(user_id, 'resume_analysis', payload, data)
+
+def get_job_status(job_id, user_id=None):
+    """Status, stage, timings and result of a job (only the owner's when user_id is given)"""
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            query = 'SELECT job_id, user_id, job_type, status, stage, payload, result, error, stage_timings, attempts, max_attempts, created_at, finished_at FROM analysis_jobs WHERE job_id = %s'
+            params = [job_id]
+            if user_id is not None:
+                query += ' AND user_id = %s'
+                params.append(user_id)
+            cursor.execute(query, tuple(params))
+            job = cursor.fetchone()
+            if job:
+                job['payload'] = json.loads(job['payload'])
+                job['result'] = json.loads(job['result']) if job['result'] else None
+                job['stage_timings'] = json.loads(job['stage_timings']) if job['stage_timings'] else {}
+            return job
+    except Exception as e:
+        return None
+
+def update_job_stage(job_id, stage, timings):
+    """Record the stage a running job has reached; also refreshes its lock"""
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('UPDATE analysis_jobs SET stage = %s, stage_timings = %s, locked_at = NOW() WHERE job_id = %s', (stage, json.dumps(timings), job_id))
+    except Exception as e:
+        print(f"⚠️ Could not update stage of job {job_id}: {e}")
+
+def heartbeat_job(job_id):
+    """Refresh a running job's lock so requeue_stale_jobs leaves it to its worker"""
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("UPDATE analysis_jobs SET locked_at = NOW() WHERE job_id = %s AND status = 'running'", (job_id,))
+    except Exception as e:
+        print(f"⚠️ Could not refresh lock of job {job_id}: {e}")
+
+@contextmanager
+def job_heartbeat(job_id):
+    """Heartbeat a job from a background thread while the block runs, so one long stage isn't taken for a dead worker"""
+    stop = threading.Event()
+    interval = JOB_QUEUE_CONFIG['stale_after_seconds'] / 3
+    
+    def beat():
+        while not stop.wait(interval):
+            heartbeat_job(job_id)
+    
+    thread = threading.Thread(target=beat, name=f'job-heartbeat-{job_id}', daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+def claim_job(worker_id):
+    """Lock the oldest runnable job for this worker; None when the queue is empty"""
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        # SKIP LOCKED lets concurrent workers claim different rows without waiting on each other
+        cursor.execute("SELECT job_id FROM analysis_jobs WHERE status = 'queued' AND run_after <= NOW() ORDER BY job_id LIMIT 1 FOR UPDATE SKIP LOCKED")
+        row = cursor.fetchone()
+        if not row:
+            return None
+        cursor.execute("UPDATE analysis_jobs SET status = 'running', attempts = attempts + 1, locked_by = %s, locked_at = NOW(), error = NULL WHERE job_id = %s", (worker_id, row['job_id']))
+        cursor.execute('SELECT job_id, user_id, job_type, payload, input_data, attempts, max_attempts FROM analysis_jobs WHERE job_id = %s', (row['job_id'],))
+        job = cursor.fetchone()
+    job['payload'] = json.loads(job['payload'])
+    if job['input_data'] is not None:
+        job['input_data'] = bytes(job['input_data'])
+    return job
+
+def complete_job(job_id, result, timings):
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        # The upload is no longer needed once the resume is stored
+        cursor.execute("UPDATE analysis_jobs SET status = 'succeeded', stage = NULL, result = %s, stage_timings = %s, input_data = NULL, locked_by = NULL, finished_at = NOW() WHERE job_id = %s", (json.dumps(result), json.dumps(timings), job_id))
+
+def fail_job(job, error, timings):
+    """Requeue a failed job with exponential backoff, or mark it failed after max_attempts"""
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        if job['attempts'] < job['max_attempts']:
+            delay = JOB_QUEUE_CONFIG['retry_backoff_seconds'] * 2 ** (job['attempts'] - 1)
+            cursor.execute("UPDATE analysis_jobs SET status = 'queued', error = %s, stage_timings = %s, locked_by = NULL, run_after = NOW() + INTERVAL %s SECOND WHERE job_id = %s", (error, json.dumps(timings), delay, job['job_id']))
+        else:
+            cursor.execute("UPDATE analysis_jobs SET status = 'failed', error = %s, stage_timings = %s, input_data = NULL, locked_by = NULL, finished_at = NOW() WHERE job_id = %s", (error, json.dumps(timings), job['job_id']))
+
+def requeue_stale_jobs(stale_after_seconds=None):
+    """Return jobs whose worker died mid-run to the queue (or fail them if out of attempts)"""
+    stale_after_seconds = stale_after_seconds or JOB_QUEUE_CONFIG['stale_after_seconds']
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("UPDATE analysis_jobs SET status = 'failed', error = 'Worker stopped responding', input_data = NULL, locked_by = NULL, finished_at = NOW() WHERE status = 'running' AND locked_at < NOW() - INTERVAL %s SECOND AND attempts >= max_attempts", (stale_after_seconds,))
+        cursor.execute("UPDATE analysis_jobs SET status = 'queued', locked_by = NULL WHERE status = 'running' AND locked_at < NOW() - INTERVAL %s SECOND", (stale_after_seconds,))
+        return cursor.rowcount
+
+def execute_job(job):
+    """Run one claimed job through its handler and record the outcome"""
+    timer = StageTimer(job['job_id'])
+    try:
+        handler = JOB_HANDLERS[job['job_type']]
+        with job_heartbeat(job['job_id']):
+            result = handler(job, timer)
+    except Exception as e:
+        print(f"❌ Job {job['job_id']} failed (attempt {job['attempts']}/{job['max_attempts']}): {e}")
+        fail_job(job, f"{type(e).__name__}: {e}", timer.timings)
+        return False
+    complete_job(job['job_id'], result, timer.timings)
+    return True
+
+def run_worker(worker_id=None, poll_interval=None, stop_event=None):
+    """Claim and run jobs until stop_event is set"""
+    worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+    poll_interval = poll_interval or JOB_QUEUE_CONFIG['poll_interval']
+    stop_event = stop_event or threading.Event()
+    last_stale_check = 0.0
+    while not stop_event.is_set():
+        try:
+            if time.monotonic() - last_stale_check > JOB_QUEUE_CONFIG['stale_after_seconds'] / 2:
+                requeue_stale_jobs()
+                last_stale_check = time.monotonic()
+            job = claim_job(worker_id)
+        except Exception as e:
+            print(f"⚠️ Worker {worker_id} could not reach the queue: {e}")
+            job = None
+        if job is None:
+            stop_event.wait(poll_interval)
+            continue
+        execute_job(job)
+
+_inline_workers = []
+_inline_lock = threading.Lock()
+
+def start_inline_workers(count=None):
+    """Start worker threads inside this process once; lets the app run without a separate worker"""
+    count = JOB_QUEUE_CONFIG['inline_workers'] if count is None else count
+    with _inline_lock:
+        while len(_inline_workers) < count:
+            worker = threading.Thread(target=run_worker, name=f"analysis-worker-{len(_inline_workers)}", daemon=True)
+            worker.start()
+            _inline_workers.append(worker)
+    return len(_inline_workers)
+
+def run_worker_pool(workers):
+    """Run a pool of worker processes until interrupted"""
+    # Spawned, not forked, so no process inherits another's pooled MySQL connections
+    context = multiprocessing.get_context('spawn')
+    processes = [context.Process(target=run_worker, name=f"analysis-worker-{i}") for i in range(workers)]
+    for process in processes:
+        process.start()
+    print(f"✅ Started {workers} analysis workers")
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        for process in processes:
+            process.terminate()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Background analysis job workers")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    worker_parser = subparsers.add_parser('worker', help="Run worker processes")
+    worker_parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    status_parser = subparsers.add_parser('status', help="Show a job's status")
+    status_parser.add_argument('job_id', type=int)
+    args = parser.parse_args(argv)
+    
+    if args.command == 'worker':
+        run_worker_pool(args.workers)
+        return 0
+    job = get_job_status(args.job_id)
+    if not job:
+        print(f"❌ Job {args.job_id} not found")
+        return 1
+    print(f"Job {job['job_id']} ({job['job_type']}): {job['status']}, stage {job['stage'] or '-'}, attempt {job['attempts']}/{job['max_attempts']}")
+    for stage, elapsed_ms in job['stage_timings'].items():
+        print(f"  {stage}: {elapsed_ms} ms")
+    if job['error']:
+        print(f"  Last error: {job['error']}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,157 @@
+"""
+Job description and required-skill templates by job title
+Templates are loaded once from job_templates.json (plus any files listed in
+JOB_TEMPLATES_PATH, which add templates or override them by title) into an
+immutable registry. Titles are matched through a token index, with synonyms,
+seniority words and typos handled by normalization and a character trigram index.
+A fuzzy match must share a word other than a generic role word ("engineer",
+"manager", ...), so "Civil Engineer" gets the default template, not a software one.
+"""
+import json
+import os
+import re
+import threading
+from collections import namedtuple
+from functools import lru_cache
+from types import MappingProxyType
+
+from config import JOB_TEMPLATES_CONFIG
+
+BUILTIN_TEMPLATES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'job_templates.json')
+TITLE_TOKEN_PATTERN = re.compile(r'[a-z0-9+#]+(?:/[a-z0-9+#]+)*')
+MIN_MATCH_SCORE = 0.5
+MIN_TYPO_SIMILARITY = 0.6
+
+JobTemplate = namedtuple('JobTemplate', ['title', 'description', 'skills'])
+
+def _trigrams(token):
+    padded = f"  {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class JobTemplateRegistry:
+    """Read-only set of job templates with a fuzzy title index"""
+    def __init__(self, data_files):
+        synonyms, seniority, role_words, default, templates, aliases = {}, set(), set(), None, {}, {}
+        for path in data_files:
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+            synonyms.update(data.get('synonyms', {}))
+            seniority.update(data.get('seniority', []))
+            role_words.update(data.get('role_words', []))
+            if 'default' in data:
+                default = data['default']
+            for entry in data.get('templates', []):
+                title = entry['title'].lower().strip()
+                templates[title] = JobTemplate(title, entry['description'], tuple(entry['skills']))
+                aliases[title] = entry.get('aliases', [])
+        
+        # Longest phrases first so "front end" is rewritten before "end" could be
+        self._synonyms = [(re.compile(rf'(?<![\w/]){re.escape(phrase.lower())}(?![\w/])'), replacement.lower())
+                          for phrase, replacement in sorted(synonyms.items(), key=lambda item: -len(item[0]))]
+        self._seniority = frozenset(word.lower() for word in seniority)
+        self._role_words = frozenset(word.lower() for word in role_words)
+        self.default = JobTemplate('', default['description'], tuple(default['skills']))
+        self.templates = MappingProxyType(templates)
+        self.titles = tuple(templates)
+        
+        # Every normalized title and alias points at its template
+        self._names = {}
+        for title in self.titles:
+            for name in [title] + aliases[title]:
+                key = self.normalize(name)
+                if key:
+                    self._names.setdefault(key, title)
+        self._token_index = {}
+        for name, title in self._names.items():
+            for token in name.split():
+                self._token_index.setdefault(token, set()).add((name, title))
+        self._trigram_index = {}
+        for token in self._token_index:
+            for gram in _trigrams(token):
+                self._trigram_index.setdefault(gram, set()).add(token)
+    
+    def normalize(self, title):
+        """Lowercase title tokens with synonyms expanded and seniority words removed"""
+        text = ' '.join(title.lower().split())
+        for pattern, replacement in self._synonyms:
+            text = pattern.sub(replacement, text)
+        return ' '.join(token for token in TITLE_TOKEN_PATTERN.findall(text) if token not in self._seniority)
+    
+    def _correct_token(self, token):
+        """Closest indexed token by trigram similarity, for typos like 'enginer'"""
+        if token in self._token_index:
+            return token
+        grams = _trigrams(token)
+        counts = {}
+        for gram in grams:
+            for candidate in self._trigram_index.get(gram, ()):
+                counts[candidate] = counts.get(candidate, 0) + 1
+        best, best_score = None, MIN_TYPO_SIMILARITY
+        for candidate, shared in counts.items():
+            score = 2 * shared / (len(grams) + len(_trigrams(candidate)))
+            if score > best_score or (score == best_score and best is not None and candidate < best):
+                best, best_score = candidate, score
+        return best
+    
+    def match(self, job_title):
+        """Best matching template for a job title, or None"""
+        query = self.normalize(job_title)
+        if not query:
+            return None
+        if query in self._names:
+            return self.templates[self._names[query]]
+        
+        # A known title inside a longer one, e.g. "software engineer, payments"
+        padded = f" {query} "
+        contained = [name for name in self._names if f" {name} " in padded]
+        if contained:
+            return self.templates[self._names[max(contained, key=len)]]
+        
+        tokens = {self._correct_token(token) for token in query.split()} - {None}
+        shared, distinctive = {}, set()
+        for token in tokens:
+            for name, title in self._token_index[token]:
+                shared[name] = shared.get(name, 0) + 1
+                if token not in self._role_words:
+                    distinctive.add(name)
+        # Sharing only "engineer" or "manager" says nothing about the field
+        shared = {name: count for name, count in shared.items() if name in distinctive}
+        if not shared:
+            return None
+        
+        def rank(name):
+            # Dice coefficient over title tokens; ties prefer canonical titles, then earlier templates
+            title = self._names[name]
+            return 2 * shared[name] / (len(tokens) + len(name.split())), name == title, -self.titles.index(title)
+        
+        best = max(shared, key=rank)
+        return self.templates[self._names[best]] if rank(best)[0] >= MIN_MATCH_SCORE else None
+
+_registry = None
+_registry_lock = threading.Lock()
+
+def get_job_template_registry():
+    """Get the process-wide template registry, loading the data files on first use"""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = JobTemplateRegistry([BUILTIN_TEMPLATES_PATH] + JOB_TEMPLATES_CONFIG['extra_files'])
+    return _registry
+
+def reload_job_templates():
+    """Re-read the template files, e.g. after adding one"""
+    global _registry
+    with _registry_lock:
+        _registry = None
+    _match_template.cache_clear()
+    return get_job_template_registry()
+
+@lru_cache(maxsize=JOB_TEMPLATES_CONFIG['match_cache_size'])
+def _match_template(job_title):
+    return get_job_template_registry().match(job_title) or get_job_template_registry().default
+
+def get_job_description_by_title(job_title):
+    """Auto-generate job description and skills based on job title"""
+    template = _match_template(' '.join(job_title.split()))
+    return template.description, list(template.skills)
@@ -1,25 +1,155 @@
+import argparse
 import json
+import sys
+import threading
+from collections import OrderedDict
 from datetime import datetime, date
+from config import COMPANY_CACHE_CONFIG
 from database import get_db_connection
+from text_store import resolve_text_columns, store_texts
+
+class CompanyCache:
+    """
+    Bounded LRU of normalized company name -> company_id, shared by every session in the
+    process. Companies are never deleted, so entries only need evicting for size. Ids are
+    cached after the transaction that resolved them commits, never from a rolled-back insert.
+    """
+    def __init__(self, max_entries=4096):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0}
+    
+    def get(self, key):
+        with self._lock:
+            company_id = self._entries.get(key)
+            if company_id is not None:
+                self._entries.move_to_end(key)
+                self._stats['hits'] += 1
+            else:
+                self._stats['misses'] += 1
+            return company_id
+    
+    def put_many(self, company_ids):
+        with self._lock:
+            for key, company_id in company_ids.items():
+                self._entries[key] = company_id
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+    
+    def stats(self):
+        """Snapshot of hit/miss counters"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        return stats
+
+_company_cache = None
+_company_cache_lock = threading.Lock()
+
+def get_company_cache():
+    """Get the process-wide company cache, creating it on first use"""
+    global _company_cache
+    if _company_cache is None:
+        with _company_cache_lock:
+            if _company_cache is None:
+                _company_cache = CompanyCache(**COMPANY_CACHE_CONFIG)
+    return _company_cache
+
+def normalize_company_name(company_name):
+    """Company name with runs of whitespace collapsed; compare names by its casefold()"""
+    return ' '.join((company_name or '').split())
+
+def resolve_company_ids(cursor, company_names):
+    """
+    company_id for each name, creating missing companies, as ({key: company_id}, resolved);
+    keys are casefolded normalized names. Pass resolved to get_company_cache().put_many()
+    once the transaction has committed.
+    """
+    names = {}
+    for company_name in company_names:
+        name = normalize_company_name(company_name)
+        if name:
+            names.setdefault(name.casefold(), name)
+    cache = get_company_cache()
+    company_ids = {key: cache.get(key) for key in names}
+    missing = [key for key, company_id in company_ids.items() if company_id is None]
+    if len(missing) > 1:
+        cursor.executemany('INSERT IGNORE INTO companies (company_name) VALUES (%s)', [(names[key],) for key in missing])
+        placeholders = ', '.join(['%s'] * len(missing))
+        cursor.execute(f'SELECT company_id, company_name FROM companies WHERE company_name IN ({placeholders})', tuple(names[key] for key in missing))
+        for row in cursor.fetchall():
+            key = normalize_company_name(row['company_name']).casefold()
+            if key in company_ids:
+                company_ids[key] = row['company_id']
+    # The single-name path, and any name the stored row doesn't casefold to (the collation
+    # also ignores accents, so "Café" finds "Cafe"); LAST_INSERT_ID(company_id) makes
+    # lastrowid the existing row's id on a duplicate
+    for key in missing:
+        if company_ids[key] is None:
+            cursor.execute('INSERT INTO companies (company_name) VALUES (%s) ON DUPLICATE KEY UPDATE company_id = LAST_INSERT_ID(company_id)', (names[key],))
+            company_ids[key] = cursor.lastrowid
+    return company_ids, {key: company_ids[key] for key in missing}
 
 def add_job_application(user_id, app_data, resume_id=None):
     """Add a new job application"""
+    success, app_ids, message = add_job_applications_batch(user_id, [{**app_data, 'resume_id': resume_id}], initial_note='Initial application')
+    if not success:
+        return False, None, message
+    return True, app_ids[0], "Application added successfully!"
+
+def add_job_applications_batch(user_id, applications, initial_note='Imported'):
+    """
+    Add many applications for a user in one transaction: companies are resolved in two
+    round-trips and applications and their first history rows use multi-row inserts.
+    Each item is an app_data dict as for add_job_application, optionally with resume_id
+    and offer_date. Returns (success, application_ids in input order, message).
+    """
+    if not applications:
+        return True, [], "Nothing to add"
+    if any(not normalize_company_name(app.get('company_name')) or not app.get('job_title') for app in applications):
+        return False, [], "Company Name and Job Title are required"
     try:
         with get_db_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute('SELECT company_id FROM companies WHERE company_name = %s', (app_data['company_name'],))
-            company = cursor.fetchone()
-            if company:
-                company_id = company['company_id']
+            # Also serializes this user's application writes, so the new ids below are ours alone
+            _lock_application_stats(cursor, user_id)
+            company_ids, resolved = resolve_company_ids(cursor, [app['company_name'] for app in applications])
+            description_blob_ids = store_texts(cursor, [app.get('job_description') or None for app in applications])
+            cursor.executemany('INSERT INTO job_applications (user_id, company_id, resume_id, job_title, job_description_blob_id, job_url, application_date, status, location, notes, offer_date) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)', [(user_id, company_ids[normalize_company_name(app['company_name']).casefold()], app.get('resume_id'), app['job_title'], blob_id, app.get('job_url'), app['application_date'], app.get('status') or 'Applied', app.get('location'), app.get('notes'), app.get('offer_date')) for app, blob_id in zip(applications, description_blob_ids)])
+            first_id = cursor.lastrowid
+            if len(applications) == 1:
+                app_ids = [first_id]
             else:
-                cursor.execute('INSERT INTO companies (company_name) VALUES (%s)', (app_data['company_name'],))
-                company_id = cursor.lastrowid
-            cursor.execute('INSERT INTO job_applications (user_id, company_id, resume_id, job_title, job_description, job_url, application_date, status, location, notes) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)', (user_id, company_id, resume_id, app_data['job_title'], app_data.get('job_description'), app_data.get('job_url'), app_data['application_date'], app_data.get('status', 'Applied'), app_data.get('location'), app_data.get('notes')))
-            app_id = cursor.lastrowid
-            cursor.execute('INSERT INTO application_status (application_id, status, notes) VALUES (%s, %s, %s)', (app_id, app_data.get('status', 'Applied'), 'Initial application'))
-            return True, app_id, "Application added successfully!"
+                # One statement's auto-increment ids ascend in row order
+                cursor.execute('SELECT application_id FROM job_applications WHERE user_id = %s AND application_id >= %s ORDER BY application_id', (user_id, first_id))
+                app_ids = [row['application_id'] for row in cursor.fetchall()]
+            cursor.executemany('INSERT INTO application_status (application_id, status, notes) VALUES (%s, %s, %s)', [(app_id, app.get('status') or 'Applied', initial_note) for app_id, app in zip(app_ids, applications)])
+            
+            cursor.execute('UPDATE user_application_stats SET total_applications = total_applications + %s WHERE user_id = %s', (len(applications), user_id))
+            status_counts = {}
+            for app in applications:
+                status = app.get('status') or 'Applied'
+                status_counts[status] = status_counts.get(status, 0) + 1
+            for status, count in status_counts.items():
+                _add_status_stats(cursor, user_id, status, application_count=count)
+            offers = [(_as_date(app['offer_date']) - _as_date(app['application_date'])).days for app in applications if app.get('offer_date')]
+            if offers:
+                cursor.execute('UPDATE user_application_stats SET dated_offers = dated_offers + %s, offer_days_total = offer_days_total + %s WHERE user_id = %s', (len(offers), sum(offers), user_id))
+        get_company_cache().put_many(resolved)
+        return True, app_ids, f"Added {len(app_ids)} applications"
     except Exception as e:
-        return False, None, f"Failed to add application: {str(e)}"
+        return False, [], f"Failed to add applications: {str(e)}"
+
+def _as_date(value):
+    return value if isinstance(value, date) else date.fromisoformat(str(value))
 
 def get_user_applications(user_id, status=None):
     """Get all job applications for a user"""
@@ -30,33 +160,238 @@ def get_user_applications(user_id, status=None):
                 cursor.execute('SELECT ja.*, c.company_name FROM job_applications ja LEFT JOIN companies c ON ja.company_id = c.company_id WHERE ja.user_id = %s AND ja.status = %s ORDER BY ja.application_date DESC', (user_id, status))
             else:
                 cursor.execute('SELECT ja.*, c.company_name FROM job_applications ja LEFT JOIN companies c ON ja.company_id = c.company_id WHERE ja.user_id = %s ORDER BY ja.application_date DESC', (user_id,))
-            return cursor.fetchall()
+            return resolve_text_columns(cursor, cursor.fetchall(), {'job_description': 'job_description_blob_id'})
     except Exception as e:
         return []
 
+# Columns the tracker lists; job descriptions are only needed when viewing one application
+APPLICATION_LIST_COLUMNS = 'ja.application_id, ja.company_id, ja.resume_id, ja.job_title, ja.job_url, ja.application_date, ja.status, ja.location, ja.notes, ja.follow_up_date, ja.interview_date, ja.updated_at, c.company_name'
+
+def encode_application_cursor(application):
+    return f"{application['application_date'].isoformat()}:{application['application_id']}"
+
+def decode_application_cursor(cursor):
+    """(application_date, application_id) from a page cursor; raises ValueError if malformed"""
+    application_date, application_id = cursor.split(':')
+    return date.fromisoformat(application_date), int(application_id)
+
+def get_applications_page(user_id, limit=25, cursor=None, status=None, company=None, date_from=None, date_to=None):
+    """
+    One page of a user's applications, newest first, keyset-paginated on
+    (application_date, application_id) so every page is an index range read.
+    company matches a company name prefix. Returns (applications, next_cursor);
+    next_cursor is None on the last page. Raises ValueError for a malformed cursor.
+    """
+    conditions, params = ['ja.user_id = %s'], [user_id]
+    if status:
+        conditions.append('ja.status = %s')
+        params.append(status)
+    if company:
+        conditions.append("c.company_name LIKE %s")
+        params.append(company.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%')
+    if date_from:
+        conditions.append('ja.application_date >= %s')
+        params.append(date_from)
+    if date_to:
+        conditions.append('ja.application_date <= %s')
+        params.append(date_to)
+    if cursor:
+        cursor_date, cursor_id = decode_application_cursor(cursor)
+        conditions.append('(ja.application_date < %s OR (ja.application_date = %s AND ja.application_id < %s))')
+        params.extend([cursor_date, cursor_date, cursor_id])
+    try:
+        with get_db_connection() as conn:
+            db_cursor = conn.cursor()
+            db_cursor.execute(f"SELECT {APPLICATION_LIST_COLUMNS} FROM job_applications ja LEFT JOIN companies c ON ja.company_id = c.company_id WHERE {' AND '.join(conditions)} ORDER BY ja.application_date DESC, ja.application_id DESC LIMIT %s", (*params, limit + 1))
+            applications = db_cursor.fetchall()
+    except Exception as e:
+        return [], None
+    next_cursor = encode_application_cursor(applications[limit - 1]) if len(applications) > limit else None
+    return applications[:limit], next_cursor
+
 def update_application_status(application_id, user_id, new_status, notes=None):
     """Update job application status"""
     try:
         with get_db_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute('UPDATE job_applications SET status = %s, updated_at = CURRENT_TIMESTAMP WHERE application_id = %s AND user_id = %s', (new_status, application_id, user_id))
-            cursor.execute('INSERT INTO application_status (application_id, status, notes) VALUES (%s, %s, %s)', (application_id, new_status, notes or f'Status changed to {new_status}'))
+            _lock_application_stats(cursor, user_id)
+            cursor.execute('SELECT status FROM job_applications WHERE application_id = %s AND user_id = %s FOR UPDATE', (application_id, user_id))
+            application = cursor.fetchone()
+            if not application:
+                return False, "Application not found"
+            
+            # One timestamp for the history row and the stage it closes keeps the summary equal to a rebuild
+            cursor.execute('SELECT NOW() AS now')
+            now = cursor.fetchone()['now']
+            cursor.execute('SELECT status, changed_at FROM application_status WHERE application_id = %s ORDER BY changed_at DESC, status_id DESC LIMIT 1', (application_id,))
+            last_change = cursor.fetchone()
+            cursor.execute('UPDATE job_applications SET status = %s, updated_at = CURRENT_TIMESTAMP WHERE application_id = %s', (new_status, application_id))
+            cursor.execute('INSERT INTO application_status (application_id, status, notes, changed_at) VALUES (%s, %s, %s, %s)', (application_id, new_status, notes or f'Status changed to {new_status}', now))
+            
+            if application['status'] != new_status:
+                _add_status_stats(cursor, user_id, application['status'], application_count=-1)
+                _add_status_stats(cursor, user_id, new_status, application_count=1)
+            if last_change:
+                _add_status_stats(cursor, user_id, last_change['status'], stage_exits=1, stage_seconds=int((now - last_change['changed_at']).total_seconds()))
             return True, "Status updated successfully!"
     except Exception as e:
         return False, f"Failed to update status: {str(e)}"
 
 def get_application_statistics(user_id):
-    """Get statistics for user's job applications"""
+    """Get statistics for user's job applications from the maintained summary tables"""
     try:
         with get_db_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute('SELECT COUNT(*) as total_applications, SUM(CASE WHEN status IN (%s, %s) THEN 1 ELSE 0 END) as active_applications, SUM(CASE WHEN status = %s THEN 1 ELSE 0 END) as offers, SUM(CASE WHEN status = %s THEN 1 ELSE 0 END) as rejections FROM job_applications WHERE user_id = %s', ('Applied', 'Interview', 'Offer', 'Rejected', user_id))
-            stats = cursor.fetchone()
-            if stats and stats['total_applications'] > 0:
-                success_rate = (stats['offers'] / stats['total_applications']) * 100 if stats['offers'] else 0
-                cursor.execute('SELECT AVG(DATEDIFF(offer_date, application_date)) as avg_days FROM job_applications WHERE user_id = %s AND offer_date IS NOT NULL', (user_id,))
-                days_result = cursor.fetchone()
-                return {'total_applications': stats['total_applications'], 'active_applications': stats['active_applications'], 'success_rate': success_rate, 'avg_days_to_offer': days_result['avg_days'] or 0 if days_result else 0}
-            return {'total_applications': 0, 'active_applications': 0, 'success_rate': 0, 'avg_days_to_offer': 0}
+            totals, statuses = _read_application_stats(cursor, user_id)
+            if totals is None:
+                # First read since the summary tables were added
+                _lock_application_stats(cursor, user_id)
+                totals, statuses = _read_application_stats(cursor, user_id)
     except Exception as e:
         return None
+    if totals['total_applications'] == 0:
+        return {'total_applications': 0, 'active_applications': 0, 'success_rate': 0, 'avg_days_to_offer': 0, 'status_counts': {}, 'avg_days_in_stage': {}}
+    status_counts = {status: counters['application_count'] for status, counters in statuses.items() if counters['application_count']}
+    return {
+        'total_applications': totals['total_applications'],
+        'active_applications': status_counts.get('Applied', 0) + status_counts.get('Interview', 0),
+        'success_rate': status_counts.get('Offer', 0) / totals['total_applications'] * 100,
+        'avg_days_to_offer': totals['offer_days_total'] / totals['dated_offers'] if totals['dated_offers'] else 0,
+        'status_counts': status_counts,
+        'avg_days_in_stage': {status: counters['stage_seconds'] / counters['stage_exits'] / 86400 for status, counters in statuses.items() if counters['stage_exits']}
+    }
+
+# Materialized statistics: user_application_stats holds per-user totals and
+# user_application_status_stats per-status counts and completed time-in-stage. Writers
+# lock the user's totals row first, so concurrent updates and reconciliation serialize.
+
+STATS_TOTAL_FIELDS = ('total_applications', 'dated_offers', 'offer_days_total')
+STATS_STATUS_FIELDS = ('application_count', 'stage_exits', 'stage_seconds')
+STATS_HISTORY_CHUNK = 1000  # Application ids per status history query
+
+def _compute_application_stats(cursor, user_id):
+    """A user's statistics rebuilt from job_applications and application_status: (totals, {status: counters})"""
+    cursor.execute('SELECT COUNT(*) AS total_applications, SUM(offer_date IS NOT NULL) AS dated_offers, SUM(DATEDIFF(offer_date, application_date)) AS offer_days_total FROM job_applications WHERE user_id = %s', (user_id,))
+    row = cursor.fetchone()
+    totals = {field: int(row[field] or 0) for field in STATS_TOTAL_FIELDS}
+    statuses = {}
+    cursor.execute('SELECT status, COUNT(*) AS application_count FROM job_applications WHERE user_id = %s GROUP BY status', (user_id,))
+    for row in cursor.fetchall():
+        statuses[row['status']] = {'application_count': row['application_count'], 'stage_exits': 0, 'stage_seconds': 0}
+    
+    # A stay in a status ends at the application's next history entry. History is read by
+    # application id, so its order comes from the (application_id, changed_at) index; a join
+    # through the user's applications would return them in application_date order and sort
+    cursor.execute('SELECT application_id FROM job_applications WHERE user_id = %s', (user_id,))
+    application_ids = [row['application_id'] for row in cursor.fetchall()]
+    previous = None
+    for start in range(0, len(application_ids), STATS_HISTORY_CHUNK):
+        chunk = application_ids[start:start + STATS_HISTORY_CHUNK]
+        placeholders = ', '.join(['%s'] * len(chunk))
+        cursor.execute(f'SELECT application_id, status, changed_at FROM application_status WHERE application_id IN ({placeholders}) ORDER BY application_id, changed_at, status_id', tuple(chunk))
+        for row in cursor.fetchall():
+            if previous and previous['application_id'] == row['application_id']:
+                counters = statuses.setdefault(previous['status'], {'application_count': 0, 'stage_exits': 0, 'stage_seconds': 0})
+                counters['stage_exits'] += 1
+                counters['stage_seconds'] += int((row['changed_at'] - previous['changed_at']).total_seconds())
+            previous = row
+    return totals, statuses
+
+def _read_application_stats(cursor, user_id):
+    """The maintained summary for a user: (totals or None, {status: counters})"""
+    cursor.execute('SELECT total_applications, dated_offers, offer_days_total FROM user_application_stats WHERE user_id = %s', (user_id,))
+    totals = cursor.fetchone()
+    if totals is None:
+        return None, {}
+    cursor.execute('SELECT status, application_count, stage_exits, stage_seconds FROM user_application_status_stats WHERE user_id = %s', (user_id,))
+    statuses = {row['status']: {field: int(row[field]) for field in STATS_STATUS_FIELDS} for row in cursor.fetchall()}
+    return {field: int(totals[field]) for field in STATS_TOTAL_FIELDS}, statuses
+
+def _write_application_stats(cursor, user_id, totals, statuses):
+    cursor.execute('INSERT INTO user_application_stats (user_id, total_applications, dated_offers, offer_days_total) VALUES (%s, %s, %s, %s) ON DUPLICATE KEY UPDATE total_applications = VALUES(total_applications), dated_offers = VALUES(dated_offers), offer_days_total = VALUES(offer_days_total)', (user_id, *(totals[field] for field in STATS_TOTAL_FIELDS)))
+    cursor.execute('DELETE FROM user_application_status_stats WHERE user_id = %s', (user_id,))
+    if statuses:
+        cursor.executemany('INSERT INTO user_application_status_stats (user_id, status, application_count, stage_exits, stage_seconds) VALUES (%s, %s, %s, %s, %s)', [(user_id, status, *(counters[field] for field in STATS_STATUS_FIELDS)) for status, counters in statuses.items()])
+
+def _claim_application_stats(cursor, user_id):
+    """
+    Lock a user's summary row for this transaction, creating an empty one if it doesn't
+    exist yet; True if it was created. An upsert rather than SELECT ... FOR UPDATE, which
+    on a missing row takes a gap lock that two concurrent first writes would deadlock on.
+    """
+    cursor.execute('INSERT INTO user_application_stats (user_id) VALUES (%s) ON DUPLICATE KEY UPDATE user_id = user_id', (user_id,))
+    return cursor.rowcount == 1
+
+def _lock_application_stats(cursor, user_id):
+    """Lock a user's summary row for this transaction, building the summary if it doesn't exist yet"""
+    if _claim_application_stats(cursor, user_id):
+        _write_application_stats(cursor, user_id, *_compute_application_stats(cursor, user_id))
+
+def _add_status_stats(cursor, user_id, status, application_count=0, stage_exits=0, stage_seconds=0):
+    cursor.execute('INSERT INTO user_application_status_stats (user_id, status, application_count, stage_exits, stage_seconds) VALUES (%s, %s, %s, %s, %s) ON DUPLICATE KEY UPDATE application_count = application_count + VALUES(application_count), stage_exits = stage_exits + VALUES(stage_exits), stage_seconds = stage_seconds + VALUES(stage_seconds)', (user_id, status, application_count, stage_exits, stage_seconds))
+
+def _diff_application_stats(stored, rebuilt):
+    """Human-readable differences between a stored and a rebuilt summary"""
+    (stored_totals, stored_statuses), (totals, statuses) = stored, rebuilt
+    if stored_totals is None:
+        return ["summary missing"]
+    differences = [f"{field}: stored {stored_totals[field]}, rebuilt {totals[field]}" for field in STATS_TOTAL_FIELDS if stored_totals[field] != totals[field]]
+    empty = dict.fromkeys(STATS_STATUS_FIELDS, 0)
+    for status in sorted(set(stored_statuses) | set(statuses)):
+        before, after = stored_statuses.get(status, empty), statuses.get(status, empty)
+        differences.extend(f"{status} {field}: stored {before[field]}, rebuilt {after[field]}" for field in STATS_STATUS_FIELDS if before[field] != after[field])
+    return differences
+
+def reconcile_application_stats(user_ids=None, fix=True):
+    """
+    Rebuild users' statistics from scratch and compare them with the maintained summary.
+    Returns {user_id: differences} for every user whose summary had drifted; with fix=True
+    the rebuilt statistics replace it and missing summaries are built (and reported). A
+    missing summary isn't drift otherwise: it is built on the user's next write. Each user
+    is one short transaction.
+    """
+    if user_ids is None:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT user_id FROM user_application_stats UNION SELECT DISTINCT user_id FROM job_applications')
+            user_ids = sorted(row['user_id'] for row in cursor.fetchall())
+    drift = {}
+    for user_id in user_ids:
+        try:
+            with get_db_connection() as conn:
+                cursor = conn.cursor()
+                if fix and _claim_application_stats(cursor, user_id):
+                    stored = (None, {})
+                else:
+                    stored = _read_application_stats(cursor, user_id)
+                    if stored[0] is None:
+                        continue
+                rebuilt = _compute_application_stats(cursor, user_id)
+                differences = _diff_application_stats(stored, rebuilt)
+                if differences:
+                    drift[user_id] = differences
+                    if fix:
+                        _write_application_stats(cursor, user_id, *rebuilt)
+        except Exception as e:
+            print(f"⚠️ Could not reconcile statistics of user {user_id}: {e}")
+    return drift
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Job application statistics maintenance")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    reconcile_parser = subparsers.add_parser('reconcile-stats', help="Rebuild statistics from scratch and report drift")
+    reconcile_parser.add_argument('--user-id', type=int, action='append', help="Only this user (repeatable)")
+    reconcile_parser.add_argument('--dry-run', action='store_true', help="Report drift without fixing it")
+    args = parser.parse_args(argv)
+    
+    drift = reconcile_application_stats(args.user_id, fix=not args.dry_run)
+    for user_id, differences in drift.items():
+        print(f"⚠️ User {user_id}: {'; '.join(differences)}")
+    if drift:
+        print(f"{'Found' if args.dry_run else 'Rebuilt'} drifted statistics for {len(drift)} users")
+        return 1
+    print("✅ Application statistics match a full rebuild")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
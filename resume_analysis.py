@@ -0,0 +1,191 @@
+"""
+Rule-based resume analysis: skill gaps, selection probability, review and suggestions
+"""
+
+def calculate_selection_probability(resume_data, job_requirements, gaps):
+    """Calculate the probability of being selected for the job"""
+    score = 100
+    
+    # Skills match (40% weight)
+    skills_match_percentage = max(0, 100 - (len(gaps['missing_skills']) * 10))
+    score -= (100 - skills_match_percentage) * 0.4
+    
+    # Experience quality (30% weight)
+    if gaps['weak_experience']:
+        score -= 20 * 0.3
+    else:
+        score += 10 * 0.3
+    
+    # Education match (15% weight)
+    if gaps['education_gaps']:
+        score -= 15 * 0.15
+    else:
+        score += 5 * 0.15
+    
+    # Projects quality (15% weight)
+    if gaps['project_gaps']:
+        score -= 15 * 0.15
+    else:
+        score += 5 * 0.15
+    
+    # Bonus for having certifications
+    if resume_data['certifications']:
+        score += 5
+    
+    return max(0, min(100, score))
+
+def generate_honest_review(resume_data, job_requirements, gaps, selection_probability):
+    """Generate an honest review of the resume"""
+    review = "🔍 **Honest Resume Review:**\n\n"
+    
+    # Overall assessment
+    if selection_probability >= 80:
+        review += "🎯 **Overall Assessment: Strong Candidate**\n"
+        review += "Your resume shows strong alignment with the job requirements. You have a good chance of being selected.\n\n"
+    elif selection_probability >= 60:
+        review += "📈 **Overall Assessment: Good Candidate**\n"
+        review += "Your resume is competitive but has some areas for improvement. With some enhancements, you could be a strong candidate.\n\n"
+    elif selection_probability >= 40:
+        review += "⚠️ **Overall Assessment: Needs Improvement**\n"
+        review += "Your resume needs significant improvements to be competitive for this position.\n\n"
+    else:
+        review += "❌ **Overall Assessment: Not Ready**\n"
+        review += "Your resume is not well-aligned with this job. Consider applying for positions that better match your current skills.\n\n"
+    
+    # Strengths
+    strengths = []
+    if not gaps['missing_skills']:
+        strengths.append("Strong skill match")
+    if not gaps['weak_experience']:
+        strengths.append("Good experience descriptions")
+    if not gaps['project_gaps']:
+        strengths.append("Relevant projects")
+    if resume_data['certifications']:
+        strengths.append("Professional certifications")
+    
+    if strengths:
+        review += "✅ **Strengths:**\n"
+        for strength in strengths:
+            review += f"• {strength}\n"
+        review += "\n"
+    
+    # Areas for improvement
+    improvements = []
+    if gaps['missing_skills']:
+        improvements.append(f"Missing key skills: {', '.join(gaps['missing_skills'][:3])}")
+    if gaps['weak_experience']:
+        improvements.append("Experience section needs strengthening")
+    if gaps['education_gaps']:
+        improvements.append("Education requirements not fully met")
+    if gaps['project_gaps']:
+        improvements.append("Need more relevant projects")
+    
+    if improvements:
+        review += "🔧 **Areas for Improvement:**\n"
+        for improvement in improvements:
+            review += f"• {improvement}\n"
+        review += "\n"
+    
+    # Selection probability
+    review += f"📊 **Selection Probability: {selection_probability:.1f}%**\n"
+    if selection_probability >= 80:
+        review += "🎉 High chance of being selected!"
+    elif selection_probability >= 60:
+        review += "👍 Good chance with some improvements"
+    elif selection_probability >= 40:
+        review += "⚠️ Moderate chance, needs work"
+    else:
+        review += "💡 Consider other opportunities or significant improvements"
+    
+    return review
+
+def analyze_resume_gaps(resume_data, job_description, job_requirements):
+    """Analyze gaps between resume and job requirements"""
+    gaps = {
+        'missing_skills': [],
+        'weak_experience': [],
+        'education_gaps': [],
+        'project_gaps': [],
+        'suggestions': []
+    }
+    
+    # Analyze skills
+    resume_skills = ' '.join(resume_data['skills']).lower()
+    for skill in job_requirements.get('skills', []):
+        if skill.lower() not in resume_skills:
+            gaps['missing_skills'].append(skill)
+    
+    # Analyze experience
+    if job_requirements.get('min_experience', 0) > 0:
+        experience_text = ' '.join(resume_data['experience']).lower()
+        experience_keywords = ['years', 'experience', 'worked', 'developed', 'managed']
+        experience_indicators = sum(1 for keyword in experience_keywords if keyword in experience_text)
+        
+        if experience_indicators < 3:
+            gaps['weak_experience'].append(f"Add more detailed work experience descriptions")
+    
+    # Analyze education
+    education_text = ' '.join(resume_data['education']).lower()
+    required_education = job_requirements.get('education_level', '').lower()
+    
+    if required_education == "bachelor's" and 'bachelor' not in education_text:
+        gaps['education_gaps'].append("Consider adding Bachelor's degree or equivalent")
+    elif required_education == "master's" and 'master' not in education_text:
+        gaps['education_gaps'].append("Consider adding Master's degree or equivalent")
+    
+    # Analyze projects
+    if len(resume_data['projects']) < 2:
+        gaps['project_gaps'].append("Add more relevant projects to showcase practical skills")
+    
+    return gaps
+
+def generate_improvement_suggestions(resume_data, job_description, gaps):
+    """Generate personalized improvement suggestions"""
+    suggestions = []
+    
+    # Skills suggestions
+    if gaps['missing_skills']:
+        suggestions.append({
+            'category': 'Skills',
+            'priority': 'High',
+            'suggestion': f"Add these missing skills: {', '.join(gaps['missing_skills'])}",
+            'action': "Consider taking online courses or adding relevant projects that demonstrate these skills"
+        })
+    
+    # Experience suggestions
+    if gaps['weak_experience']:
+        suggestions.append({
+            'category': 'Experience',
+            'priority': 'High',
+            'suggestion': "Strengthen your work experience section",
+            'action': "Add quantifiable achievements, use action verbs, and include specific technologies used"
+        })
+    
+    # Education suggestions
+    if gaps['education_gaps']:
+        suggestions.append({
+            'category': 'Education',
+            'priority': 'Medium',
+            'suggestion': gaps['education_gaps'][0],
+            'action': "Highlight relevant coursework or certifications that demonstrate required knowledge"
+        })
+    
+    # Project suggestions
+    if gaps['project_gaps']:
+        suggestions.append({
+            'category': 'Projects',
+            'priority': 'Medium',
+            'suggestion': "Add more relevant projects",
+            'action': "Create projects that showcase the required skills and technologies"
+        })
+    
+    # General suggestions
+    if not resume_data['certifications']:
+        suggestions.append({
+            'category': 'Certifications',
+            'priority': 'Low',
+            'suggestion': "Consider adding relevant certifications",
+            'action': "Look for industry-recognized certifications in your field"
+        })
+    
+    return suggestions
@@ -1,635 +1,67 @@
 import streamlit as st
-import os
 import pandas as pd
+import io
 import re
-from resume_parser import extract_text_from_pdf, extract_text_from_docx
-# from free_ai_analyzer import FreeAIAnalyzer  # Temporarily disabled
-from datetime import datetime, date
+import time
+from job_templates import get_job_description_by_title
+from analysis_cache import get_resume_analysis
+from chatbot import chatbot_response
+from datetime import datetime, date, timedelta
 
 # Import database modules
 from auth import (
     register_user, login_user, logout_user,
-    get_user_profile, update_user_profile, check_authentication
+    get_user_profile, update_user_profile, check_authentication, start_session_sweeper
 )
 from resume_manager import (
-    save_resume, get_user_resumes, save_analysis,
-    get_analysis_history, get_resume_improvement_trends
+    get_user_resumes, get_user_analysis_history, get_resume_versions,
+    get_resume_improvement_trends
 )
+from job_queue import enqueue_resume_analysis, get_job_status, start_inline_workers
+from config import JOB_QUEUE_CONFIG
 from job_tracker import (
-    add_job_application, get_user_applications,
+    add_job_application, get_applications_page,
     update_application_status, get_application_statistics
 )
-
-def extract_resume_data(raw_text):
-    """Extract structured data from resume text"""
-    lines = raw_text.split('\n')
-    
-    data = {
-        'name': '',
-        'email': '',
-        'phone': '',
-        'education': [],
-        'skills': [],
-        'experience': [],
-        'projects': [],
-        'certifications': []
-    }
-    
-    current_section = ""
-    current_project = []
-    current_experience = []
-    current_education = []
-    
-    for line in lines:
-        line = line.strip()
-        if not line:
-            continue
-            
-        # Detect sections
-        if line.upper() in ['EDUCATION', 'SKILLS', 'EXPERIENCE', 'PROJECTS', 'CERTIFICATIONS', 'WORK EXPERIENCE']:
-            # Save current project/experience/education before switching sections
-            if current_section == "PROJECTS" and current_project:
-                data['projects'].append(' '.join(current_project))
-                current_project = []
-            elif current_section in ["EXPERIENCE", "WORK EXPERIENCE"] and current_experience:
-                data['experience'].append(' '.join(current_experience))
-                current_experience = []
-            elif current_section == "EDUCATION" and current_education:
-                data['education'].append(' '.join(current_education))
-                current_education = []
-            
-            current_section = line.upper()
-            continue
-            
-        # Extract name (first non-empty line that's not a section header)
-        if not data['name'] and current_section == "" and line and not line.upper() in ['EDUCATION', 'SKILLS', 'EXPERIENCE', 'PROJECTS', 'CERTIFICATIONS']:
-            data['name'] = line
-            continue
-            
-        # Extract email
-        if '@' in line and '.' in line:
-            email_match = re.search(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', line)
-            if email_match:
-                data['email'] = email_match.group()
-                
-        # Extract phone
-        phone_match = re.search(r'[\+]?[1-9][\d]{0,15}', line)
-        if phone_match and len(phone_match.group()) >= 10:
-            data['phone'] = phone_match.group()
-            
-        # Extract content based on current section
-        if current_section == "EDUCATION":
-            # Check if this looks like a new education entry (contains degree keywords or dates)
-            if any(keyword in line.lower() for keyword in ['bachelor', 'master', 'phd', 'degree', 'university', 'college', 'school', '202', '201', '2020', '2021', '2022', '2023', '2024']):
-                if current_education:  # Save previous education entry
-                    data['education'].append(' '.join(current_education))
-                    current_education = []
-            current_education.append(line)
-            
-        elif current_section == "SKILLS":
-            data['skills'].append(line)
-            
-        elif current_section in ["EXPERIENCE", "WORK EXPERIENCE"]:
-            # Check if this looks like a new job entry (contains job keywords or dates)
-            if any(keyword in line.lower() for keyword in ['202', '202', '201', 'jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec']) or \
-               any(keyword in line.lower() for keyword in ['engineer', 'developer', 'manager', 'analyst', 'specialist', 'coordinator', 'intern', 'associate']):
-                if current_experience:  # Save previous experience entry
-                    data['experience'].append(' '.join(current_experience))
-                    current_experience = []
-            current_experience.append(line)
-            
-        elif current_section == "PROJECTS":
-            # Detect new project: Look for project titles (short lines without bullet points)
-            # or lines that end with | or : which typically indicate project names
-            is_new_project = False
-            
-            # Check if it's a project title (not a bullet point)
-            if not (line.startswith('•') or line.startswith('-') or line.startswith('*') or line.startswith('○')):
-                # Check if it looks like a title (ends with | or :, or contains "Project" keyword)
-                if (line.endswith('|') or line.endswith(':') or 
-                    ('project' in line.lower() and len(line) < 80)):
-                    is_new_project = True
-            
-            if is_new_project and current_project:
-                # Save previous project
-                data['projects'].append(' '.join(current_project))
-                current_project = []
-            
-            current_project.append(line)
-            
-        elif current_section == "CERTIFICATIONS":
-            data['certifications'].append(line)
-    
-    # Save any remaining entries
-    if current_project:
-        data['projects'].append(' '.join(current_project))
-    if current_experience:
-        data['experience'].append(' '.join(current_experience))
-    if current_education:
-        data['education'].append(' '.join(current_education))
-    
-    return data
-
-def get_job_description_by_title(job_title):
-    """Auto-generate job description and skills based on job title"""
-    job_templates = {
-        "software engineer": {
-            "description": """We are seeking a talented Software Engineer to join our dynamic team. You will be responsible for designing, developing, and maintaining software applications. The ideal candidate should have strong programming skills, experience with modern development frameworks, and a passion for creating high-quality code.
-
-Key Responsibilities:
-• Design and develop scalable software solutions
-• Collaborate with cross-functional teams
-• Write clean, maintainable code
-• Participate in code reviews and technical discussions
-• Debug and resolve software issues
-• Stay updated with latest technologies and best practices""",
-            "skills": ["Python", "JavaScript", "Java", "React", "Node.js", "SQL", "Git", "Docker", "AWS", "REST APIs"]
-        },
-        "data scientist": {
-            "description": """We are looking for a Data Scientist to help us extract insights from complex data sets. You will work on machine learning models, statistical analysis, and data visualization to drive business decisions.
-
-Key Responsibilities:
-• Develop and implement machine learning models
-• Perform statistical analysis and data mining
-• Create data visualizations and reports
-• Collaborate with stakeholders to understand business needs
-• Optimize model performance and accuracy
-• Present findings to technical and non-technical audiences""",
-            "skills": ["Python", "R", "SQL", "Machine Learning", "Statistics", "Pandas", "NumPy", "Scikit-learn", "TensorFlow", "Data Visualization"]
-        },
-        "frontend developer": {
-            "description": """We are seeking a Frontend Developer to create engaging user interfaces and experiences. You will work with modern web technologies to build responsive and accessible applications.
-
-Key Responsibilities:
-• Develop responsive web applications
-• Implement user interface designs
-• Optimize application performance
-• Ensure cross-browser compatibility
-• Collaborate with designers and backend developers
-• Write clean, maintainable code""",
-            "skills": ["HTML", "CSS", "JavaScript", "React", "Vue.js", "Angular", "TypeScript", "SASS", "Webpack", "Responsive Design"]
-        },
-        "backend developer": {
-            "description": """We are looking for a Backend Developer to build robust server-side applications and APIs. You will work on scalable architectures and database design.
-
-Key Responsibilities:
-• Design and develop server-side applications
-• Create and maintain RESTful APIs
-• Design and optimize databases
-• Implement security best practices
-• Monitor and optimize application performance
-• Collaborate with frontend developers""",
-            "skills": ["Python", "Java", "Node.js", "SQL", "MongoDB", "Redis", "Docker", "AWS", "REST APIs", "Microservices"]
-        },
-        "devops engineer": {
-            "description": """We are seeking a DevOps Engineer to streamline our development and deployment processes. You will work on infrastructure automation and CI/CD pipelines.
-
-Key Responsibilities:
-• Design and maintain CI/CD pipelines
-• Manage cloud infrastructure
-• Automate deployment processes
-• Monitor system performance and security
-• Implement infrastructure as code
-• Collaborate with development teams""",
-            "skills": ["Docker", "Kubernetes", "AWS", "Jenkins", "Terraform", "Linux", "Bash", "Python", "Git", "Monitoring"]
-        },
-        "product manager": {
-            "description": """We are looking for a Product Manager to drive product strategy and development. You will work with cross-functional teams to deliver successful products.
-
-Key Responsibilities:
-• Define product strategy and roadmap
-• Gather and prioritize product requirements
-• Work with development teams to deliver features
-• Analyze market trends and competition
-• Collaborate with stakeholders
-• Measure product success metrics""",
-            "skills": ["Product Strategy", "Market Research", "Agile", "User Research", "Data Analysis", "SQL", "Python", "A/B Testing", "Product Analytics", "JIRA", "Confluence"]
-        },
-        "ui/ux designer": {
-            "description": """We are seeking a UI/UX Designer to create intuitive and engaging user experiences. You will work on user research, wireframing, and visual design.
-
-Key Responsibilities:
-• Conduct user research and usability testing
-• Create wireframes and prototypes
-• Design user interfaces and experiences
-• Collaborate with developers and product managers
-• Create design systems and style guides
-• Iterate designs based on user feedback""",
-            "skills": ["Figma", "Adobe Creative Suite", "Sketch", "InVision", "HTML", "CSS", "JavaScript", "Prototyping", "Design Systems", "User Research", "Wireframing", "Usability Testing"]
-        },
-        "machine learning engineer": {
-            "description": """We are looking for a Machine Learning Engineer to develop and deploy machine learning models. You will work on data preprocessing, model training, and production deployment.
-
-Key Responsibilities:
-• Develop and implement machine learning models
-• Preprocess and analyze large datasets
-• Deploy models to production environments
-• Optimize model performance and accuracy
-• Collaborate with data scientists and engineers
-• Maintain and monitor ML pipelines""",
-            "skills": ["Python", "TensorFlow", "PyTorch", "Scikit-learn", "SQL", "Docker", "AWS", "MLOps", "Data Preprocessing", "Model Deployment", "Statistics", "Deep Learning"]
-        },
-        "cybersecurity analyst": {
-            "description": """We are seeking a Cybersecurity Analyst to protect our systems and data from security threats. You will monitor security systems and respond to incidents.
-
-Key Responsibilities:
-• Monitor security systems and networks
-• Investigate security incidents and threats
-• Implement security controls and policies
-• Conduct vulnerability assessments
-• Respond to security breaches
-• Maintain security documentation""",
-            "skills": ["SIEM", "Wireshark", "Nmap", "Metasploit", "Python", "Linux", "Network Security", "Incident Response", "Vulnerability Assessment", "Security Tools", "Firewall Management"]
-        },
-        "cloud engineer": {
-            "description": """We are looking for a Cloud Engineer to design and manage cloud infrastructure. You will work on cloud migration, automation, and optimization.
-
-Key Responsibilities:
-• Design and implement cloud architectures
-• Manage cloud infrastructure and services
-• Automate deployment and scaling processes
-• Monitor cloud performance and costs
-• Implement security best practices
-• Support cloud migration projects""",
-            "skills": ["AWS", "Azure", "GCP", "Terraform", "Docker", "Kubernetes", "CI/CD", "Python", "Bash", "Infrastructure as Code", "Cloud Security", "Monitoring"]
-        }
-    }
-    
-    # Find the best match for the job title
-    job_title_lower = job_title.lower()
-    for key, value in job_templates.items():
-        if key in job_title_lower or job_title_lower in key:
-            return value["description"], value["skills"]
-    
-    # Default template for unknown job titles
-    return """We are seeking a talented professional to join our team. The ideal candidate should have relevant experience and skills in their field.
-
-Key Responsibilities:
-• Perform assigned duties and responsibilities
-• Collaborate with team members
-• Meet project deadlines and goals
-• Continuously improve skills and knowledge
-• Contribute to team success""", ["Technical Analysis", "Problem Solving", "Data Analysis", "Project Management", "System Design"]
-
-def calculate_selection_probability(resume_data, job_requirements, gaps):
-    """Calculate the probability of being selected for the job"""
-    score = 100
-    
-    # Skills match (40% weight)
-    skills_match_percentage = max(0, 100 - (len(gaps['missing_skills']) * 10))
-    score -= (100 - skills_match_percentage) * 0.4
-    
-    # Experience quality (30% weight)
-    if gaps['weak_experience']:
-        score -= 20 * 0.3
-    else:
-        score += 10 * 0.3
-    
-    # Education match (15% weight)
-    if gaps['education_gaps']:
-        score -= 15 * 0.15
-    else:
-        score += 5 * 0.15
-    
-    # Projects quality (15% weight)
-    if gaps['project_gaps']:
-        score -= 15 * 0.15
-    else:
-        score += 5 * 0.15
-    
-    # Bonus for having certifications
-    if resume_data['certifications']:
-        score += 5
-    
-    return max(0, min(100, score))
-
-def generate_honest_review(resume_data, job_requirements, gaps, selection_probability):
-    """Generate an honest review of the resume"""
-    review = "🔍 **Honest Resume Review:**\n\n"
-    
-    # Overall assessment
-    if selection_probability >= 80:
-        review += "🎯 **Overall Assessment: Strong Candidate**\n"
-        review += "Your resume shows strong alignment with the job requirements. You have a good chance of being selected.\n\n"
-    elif selection_probability >= 60:
-        review += "📈 **Overall Assessment: Good Candidate**\n"
-        review += "Your resume is competitive but has some areas for improvement. With some enhancements, you could be a strong candidate.\n\n"
-    elif selection_probability >= 40:
-        review += "⚠️ **Overall Assessment: Needs Improvement**\n"
-        review += "Your resume needs significant improvements to be competitive for this position.\n\n"
-    else:
-        review += "❌ **Overall Assessment: Not Ready**\n"
-        review += "Your resume is not well-aligned with this job. Consider applying for positions that better match your current skills.\n\n"
-    
-    # Strengths
-    strengths = []
-    if not gaps['missing_skills']:
-        strengths.append("Strong skill match")
-    if not gaps['weak_experience']:
-        strengths.append("Good experience descriptions")
-    if not gaps['project_gaps']:
-        strengths.append("Relevant projects")
-    if resume_data['certifications']:
-        strengths.append("Professional certifications")
-    
-    if strengths:
-        review += "✅ **Strengths:**\n"
-        for strength in strengths:
-            review += f"• {strength}\n"
-        review += "\n"
-    
-    # Areas for improvement
-    improvements = []
-    if gaps['missing_skills']:
-        improvements.append(f"Missing key skills: {', '.join(gaps['missing_skills'][:3])}")
-    if gaps['weak_experience']:
-        improvements.append("Experience section needs strengthening")
-    if gaps['education_gaps']:
-        improvements.append("Education requirements not fully met")
-    if gaps['project_gaps']:
-        improvements.append("Need more relevant projects")
-    
-    if improvements:
-        review += "🔧 **Areas for Improvement:**\n"
-        for improvement in improvements:
-            review += f"• {improvement}\n"
-        review += "\n"
-    
-    # Selection probability
-    review += f"📊 **Selection Probability: {selection_probability:.1f}%**\n"
-    if selection_probability >= 80:
-        review += "🎉 High chance of being selected!"
-    elif selection_probability >= 60:
-        review += "👍 Good chance with some improvements"
-    elif selection_probability >= 40:
-        review += "⚠️ Moderate chance, needs work"
-    else:
-        review += "💡 Consider other opportunities or significant improvements"
-    
-    return review
-
-def analyze_resume_gaps(resume_data, job_description, job_requirements):
-    """Analyze gaps between resume and job requirements"""
-    gaps = {
-        'missing_skills': [],
-        'weak_experience': [],
-        'education_gaps': [],
-        'project_gaps': [],
-        'suggestions': []
-    }
-    
-    # Analyze skills
-    resume_skills = ' '.join(resume_data['skills']).lower()
-    for skill in job_requirements.get('skills', []):
-        if skill.lower() not in resume_skills:
-            gaps['missing_skills'].append(skill)
-    
-    # Analyze experience
-    if job_requirements.get('min_experience', 0) > 0:
-        experience_text = ' '.join(resume_data['experience']).lower()
-        experience_keywords = ['years', 'experience', 'worked', 'developed', 'managed']
-        experience_indicators = sum(1 for keyword in experience_keywords if keyword in experience_text)
-        
-        if experience_indicators < 3:
-            gaps['weak_experience'].append(f"Add more detailed work experience descriptions")
-    
-    # Analyze education
-    education_text = ' '.join(resume_data['education']).lower()
-    required_education = job_requirements.get('education_level', '').lower()
-    
-    if required_education == "bachelor's" and 'bachelor' not in education_text:
-        gaps['education_gaps'].append("Consider adding Bachelor's degree or equivalent")
-    elif required_education == "master's" and 'master' not in education_text:
-        gaps['education_gaps'].append("Consider adding Master's degree or equivalent")
-    
-    # Analyze projects
-    if len(resume_data['projects']) < 2:
-        gaps['project_gaps'].append("Add more relevant projects to showcase practical skills")
-    
-    return gaps
-
-def generate_improvement_suggestions(resume_data, job_description, gaps):
-    """Generate personalized improvement suggestions"""
-    suggestions = []
-    
-    # Skills suggestions
-    if gaps['missing_skills']:
-        suggestions.append({
-            'category': 'Skills',
-            'priority': 'High',
-            'suggestion': f"Add these missing skills: {', '.join(gaps['missing_skills'])}",
-            'action': "Consider taking online courses or adding relevant projects that demonstrate these skills"
-        })
-    
-    # Experience suggestions
-    if gaps['weak_experience']:
-        suggestions.append({
-            'category': 'Experience',
-            'priority': 'High',
-            'suggestion': "Strengthen your work experience section",
-            'action': "Add quantifiable achievements, use action verbs, and include specific technologies used"
-        })
-    
-    # Education suggestions
-    if gaps['education_gaps']:
-        suggestions.append({
-            'category': 'Education',
-            'priority': 'Medium',
-            'suggestion': gaps['education_gaps'][0],
-            'action': "Highlight relevant coursework or certifications that demonstrate required knowledge"
-        })
-    
-    # Project suggestions
-    if gaps['project_gaps']:
-        suggestions.append({
-            'category': 'Projects',
-            'priority': 'Medium',
-            'suggestion': "Add more relevant projects",
-            'action': "Create projects that showcase the required skills and technologies"
-        })
-    
-    # General suggestions
-    if not resume_data['certifications']:
-        suggestions.append({
-            'category': 'Certifications',
-            'priority': 'Low',
-            'suggestion': "Consider adding relevant certifications",
-            'action': "Look for industry-recognized certifications in your field"
-        })
-    
-    return suggestions
-
-def chatbot_response(user_message, resume_data, job_description, job_requirements):
-    """Generate enhanced chatbot response with AI features"""
-    
-    # Initialize AI analyzer
-    # if 'ai_analyzer' not in st.session_state:
-    #     st.session_state.ai_analyzer = FreeAIAnalyzer()  # Temporarily disabled
-    
-    # Analyze resume gaps
-    gaps = analyze_resume_gaps(resume_data, job_description, job_requirements)
-    suggestions = generate_improvement_suggestions(resume_data, job_description, gaps)
-    selection_probability = calculate_selection_probability(resume_data, job_requirements, gaps)
-    
-    # Get AI-powered analysis
-    # ai_analysis = st.session_state.ai_analyzer.advanced_resume_analysis(
-    #     ' '.join([str(v) for v in resume_data.values() if isinstance(v, (str, list))]),
-    #     job_description
-    # )
-    ai_analysis = {'similarity_score': 0, 'missing_keywords': [], 'strengths': [], 'improvements': []}
-    
-    # Try AI-powered response first (Temporarily disabled)
-    # try:
-    #     ai_response = st.session_state.ai_analyzer.enhanced_chatbot_response(
-    #         user_message, resume_data, job_requirements
-    #     )
-    #     
-    #     # Add AI insights
-    #     ai_insights = st.session_state.ai_analyzer.generate_ai_insights(resume_data, job_requirements)
-    #     
-    #     # Combine AI response with insights
-    #     enhanced_response = f"{ai_response}\n\n"
-    #     if ai_insights:
-    #         enhanced_response += "🎯 **AI Insights:**\n"
-    #         for insight in ai_insights[:3]:
-    #             enhanced_response += f"• {insight}\n"
-    #     
-    #     return enhanced_response
-    #     
-    # except Exception as e:
-    #     st.warning(f"AI response failed: {str(e)}")
-    #     # Fallback to original logic
-    
-    # Common user questions and responses (fallback)
-    if "improve" in user_message.lower() or "better" in user_message.lower():
-        response = "🔍 **Enhanced Resume Analysis:**\n\n"
-        
-        # Add AI analysis results
-        response += f"📊 **AI Similarity Score: {ai_analysis['similarity_score']:.1f}%**\n\n"
-        
-        if ai_analysis['missing_keywords']:
-            response += f"⚠️ **Missing Keywords:** {', '.join(ai_analysis['missing_keywords'][:5])}\n\n"
-        
-        if ai_analysis['strengths']:
-            response += "✅ **Strengths:**\n"
-            for strength in ai_analysis['strengths']:
-                response += f"• {strength}\n"
-            response += "\n"
-        
-        if ai_analysis['improvements']:
-            response += "🔧 **AI Suggestions:**\n"
-            for improvement in ai_analysis['improvements']:
-                response += f"• {improvement}\n"
-            response += "\n"
-        
-        if suggestions:
-            response += "**Priority Improvements:**\n"
-            for suggestion in suggestions[:3]:  # Top 3 suggestions
-                priority_emoji = "🔴" if suggestion['priority'] == 'High' else "🟡" if suggestion['priority'] == 'Medium' else "🟢"
-                response += f"{priority_emoji} **{suggestion['category']}**: {suggestion['suggestion']}\n"
-                response += f"   💡 *Action*: {suggestion['action']}\n\n"
-        else:
-            response += "✅ Your resume looks well-aligned with the job requirements!\n\n"
-        
-        return response
-    
-    elif "selected" in user_message.lower() or "chance" in user_message.lower() or "probability" in user_message.lower():
-        honest_review = generate_honest_review(resume_data, job_requirements, gaps, selection_probability)
-        return honest_review
-    
-    elif "honest" in user_message.lower() or "review" in user_message.lower():
-        honest_review = generate_honest_review(resume_data, job_requirements, gaps, selection_probability)
-        return honest_review
-    
-    elif "skills" in user_message.lower():
-        if gaps['missing_skills']:
-            response = "🎯 **Skills Analysis:**\n\n"
-            response += f"**Missing Skills**: {', '.join(gaps['missing_skills'])}\n\n"
-            response += "**Recommendations:**\n"
-            response += "• Take online courses (Coursera, Udemy, edX)\n"
-            response += "• Work on personal projects using these technologies\n"
-            response += "• Add relevant certifications to your resume\n"
-            response += "• Include these skills in your projects section\n"
-        else:
-            response = "✅ **Skills Analysis:** Your skills match well with the job requirements!"
-        return response
-    
-    elif "experience" in user_message.lower():
-        response = "💼 **Experience Analysis:**\n\n"
-        if gaps['weak_experience']:
-            response += "**Areas for Improvement:**\n"
-            response += "• Add quantifiable achievements (e.g., 'Increased efficiency by 25%')\n"
-            response += "• Use strong action verbs (Developed, Implemented, Managed)\n"
-            response += "• Include specific technologies and tools used\n"
-            response += "• Add metrics and results where possible\n"
-        else:
-            response += "✅ Your experience section looks strong!"
-        return response
-    
-    elif "projects" in user_message.lower():
-        response = "🚀 **Projects Analysis:**\n\n"
-        if gaps['project_gaps']:
-            response += "**Recommendations:**\n"
-            response += "• Add 2-3 relevant projects that showcase required skills\n"
-            response += "• Include GitHub links and live demos if available\n"
-            response += "• Describe the technologies used and your role\n"
-            response += "• Highlight problem-solving and technical skills\n"
-        else:
-            response += "✅ Your projects section looks good!"
-        return response
-    
-    elif "help" in user_message.lower() or "what" in user_message.lower():
-        response = "📊 **ResumePro Career Advisor**\n\n"
-        response += "I can help you improve your resume! Ask me about:\n\n"
-        response += "• **'How can I improve my resume?'** - Get overall suggestions\n"
-        response += "• **'Will I be selected?'** - Check selection probability\n"
-        response += "• **'Give me an honest review'** - Get detailed feedback\n"
-        response += "• **'Analyze my skills'** - Check skill gaps\n"
-        response += "• **'Review my experience'** - Experience section tips\n"
-        response += "• **'Check my projects'** - Project section advice\n\n"
-        response += "Just type your question and I'll provide personalized advice! 💡"
-        return response
-    
-    else:
-        # Default response with general tips
-        response = "💡 **General Resume Tips:**\n\n"
-        response += "• **Tailor your resume** to match the job description\n"
-        response += "• **Use keywords** from the job posting\n"
-        response += "• **Quantify achievements** with numbers and metrics\n"
-        response += "• **Keep it concise** (1-2 pages maximum)\n"
-        response += "• **Proofread carefully** for errors\n\n"
-        response += "Ask me specific questions like 'Will I be selected?' or 'Give me an honest review' for detailed feedback! 🎯"
-        return response
-#jo user upload krta vo memory me hoti h use computr me temp file banate hai wb->write binary (binary mode me file banata hai)
-def process_resume_file(uploaded_file):
-    """Process uploaded resume file"""
-    try:
-        # Create a temporary file
-        with open(f"temp_{uploaded_file.name}", "wb") as f:
-            f.write(uploaded_file.getbuffer())
-        
-        file_path = f"temp_{uploaded_file.name}"
-        
-        # Extract text based on file type
-        if uploaded_file.name.endswith(".pdf"):
-            raw_text = extract_text_from_pdf(file_path)
-        elif uploaded_file.name.endswith(".docx"):
-            raw_text = extract_text_from_docx(file_path)
-        else:
-            raise ValueError("Unsupported file format. Please upload PDF or DOCX files.")
-        
-        # Clean up temporary file
-        os.remove(file_path)
-        
-        return raw_text
-        
-    except Exception as e:
-        st.error(f"Error processing {uploaded_file.name}: {str(e)}")
-        return None
+from application_io import import_applications, export_applications, detect_format
+
+def session_analysis():
+    """Analysis of the session's resume against its job, memoized in the session across reruns"""
+    if st.session_state.get('analysis') is None:
+        st.session_state.analysis = get_resume_analysis(
+            st.session_state.resume_data,
+            st.session_state.job_description,
+            st.session_state.job_requirements
+        )
+    return st.session_state.analysis
+
+ANALYSIS_STAGE_LABELS = {
+    'extract': "Extracting resume text",
+    'save_resume': "Saving resume",
+    'reuse_analysis': "Checking earlier analyses",
+    'analyze': "Scoring against the job",
+    'save_analysis': "Saving analysis"
+}
+
+# Analyses shown per page of the resume history view
+HISTORY_PAGE_SIZE = 200
+
+# Job tracker paging and date filter (days back, None = no limit)
+APPLICATION_PAGE_SIZE = 25
+APPLICATION_PERIODS = {
+    "Any time": None,
+    "Last 30 days": 30,
+    "Last 90 days": 90,
+    "Last year": 365
+}
 
 # Streamlit UI
 st.set_page_config(page_title="ResumePro Analyzer", page_icon="📊", layout="wide")
 
+# Background analysis workers and the expired-session sweeper, started once per server process
+start_inline_workers()
+start_session_sweeper()
+
 # ============================================================================
 # AUTHENTICATION CHECK
 # ============================================================================
@@ -720,6 +152,8 @@ with st.sidebar:
     if st.button("📄 My Resumes", use_container_width=True):
         st.session_state.show_resumes = True
         st.session_state.show_jobs = False
+        # Start the analysis history from its newest page again
+        st.session_state.pop('analysis_history', None)
         st.rerun()
     
     if st.button("💼 Job Tracker", use_container_width=True):
@@ -786,6 +220,16 @@ if st.session_state.get('show_resumes', False):
     
     user_id = st.session_state['user']['user_id']
     resumes = get_user_resumes(user_id)
+    # History for every resume in one query per page; pages already loaded are kept in
+    # session_state and "Load older analyses" fetches only the next one from its cursor
+    if 'analysis_history' not in st.session_state:
+        history_by_resume, next_cursor = get_user_analysis_history(user_id, limit=HISTORY_PAGE_SIZE)
+        st.session_state.analysis_history = {'rows': history_by_resume, 'next_cursor': next_cursor}
+    history_by_resume = st.session_state.analysis_history['rows']
+    next_cursor = st.session_state.analysis_history['next_cursor']
+    versions_by_resume = {}
+    for version in get_resume_versions(user_id):
+        versions_by_resume.setdefault(version['resume_id'], []).append(version)
     
     if resumes:
         for resume in resumes:
@@ -795,9 +239,19 @@ if st.session_state.get('show_resumes', False):
                 col2.metric("Analyses", resume['analysis_count'])
                 col3.metric("Size", f"{resume['file_size'] / 1024:.1f} KB")
                 
+                # Re-uploading a resume under the same name adds a version; show what each one changed
+                versions = versions_by_resume.get(resume['resume_id'], [])
+                if len(versions) > 1:
+                    st.subheader("Versions")
+                    st.dataframe(pd.DataFrame([{
+                        'Version': v['version_number'],
+                        'Changes': v['changes_description'],
+                        'Date': v['created_at']
+                    } for v in versions]), use_container_width=True, hide_index=True)
+                
                 # Show analysis history
                 st.subheader("Analysis History")
-                history = get_analysis_history(resume['resume_id'])
+                history = history_by_resume.get(resume['resume_id'])
                 if history:
                     history_data = []
                     for h in history:
@@ -809,11 +263,18 @@ if st.session_state.get('show_resumes', False):
                     st.dataframe(pd.DataFrame(history_data), use_container_width=True, hide_index=True)
                 else:
                     st.info("No analysis history yet")
+        if next_cursor is not None and st.button("⏬ Load older analyses", use_container_width=True):
+            older, next_cursor = get_user_analysis_history(user_id, limit=HISTORY_PAGE_SIZE, cursor=next_cursor)
+            for resume_id, rows in older.items():
+                history_by_resume.setdefault(resume_id, []).extend(rows)
+            st.session_state.analysis_history['next_cursor'] = next_cursor
+            st.rerun()
     else:
         st.info("No resumes uploaded yet. Upload your first resume below!")
     
     if st.button("❌ Close Resume History", use_container_width=True):
         st.session_state.show_resumes = False
+        st.session_state.pop('analysis_history', None)
         st.rerun()
     
     st.stop()  # Stop rendering the rest of the page
@@ -859,6 +320,34 @@ if st.session_state.get('show_jobs', False):
                 else:
                     st.error("Company Name and Job Title are required")
     
+    # Bulk import from / export to CSV or JSON files
+    with st.expander("📦 Import / Export Applications", expanded=False):
+        import_file = st.file_uploader("Import applications", type=["csv", "json", "jsonl"], help="Columns: company_name, job_title, application_date (YYYY-MM-DD), status, location, job_url, notes")
+        if import_file and st.button("Import", use_container_width=True):
+            with st.spinner("Importing applications..."):
+                report = import_applications(user_id, import_file, detect_format(import_file.name))
+            if report['imported']:
+                st.success(f"✅ Imported {report['imported']} of {report['rows']} rows ({report['rows_per_second']:.0f} rows/s)")
+                st.session_state.app_cursors = [None]
+            if report['errors']:
+                st.warning(f"⚠️ {report['failed']} rows were not imported")
+                st.dataframe(pd.DataFrame(report['errors'], columns=["Line", "Problem"]), hide_index=True)
+        
+        export_format = st.radio("Export format", ["CSV", "JSON Lines"], horizontal=True)
+        if st.button("Prepare Export", use_container_width=True):
+            export_buffer = io.StringIO()
+            export_applications(user_id, export_buffer, 'csv' if export_format == "CSV" else 'json')
+            st.session_state.app_export = (export_format, export_buffer.getvalue())
+        if st.session_state.get('app_export'):
+            exported_format, exported_data = st.session_state.app_export
+            st.download_button(
+                "📥 Download Export",
+                exported_data,
+                file_name="applications.csv" if exported_format == "CSV" else "applications.jsonl",
+                mime="text/csv" if exported_format == "CSV" else "application/x-ndjson",
+                use_container_width=True
+            )
+    
     # Show statistics
     app_stats = get_application_statistics(user_id)
     if app_stats and app_stats['total_applications'] > 0:
@@ -867,10 +356,31 @@ if st.session_state.get('show_jobs', False):
         col2.metric("Active", app_stats['active_applications'])
         col3.metric("Success Rate", f"{app_stats['success_rate']:.1f}%")
         col4.metric("Avg Days to Offer", f"{app_stats['avg_days_to_offer']:.0f}")
+        if app_stats['avg_days_in_stage']:
+            st.caption("Average days in stage: " + " · ".join(f"{status} {days:.1f}" for status, days in app_stats['avg_days_in_stage'].items()))
     
-    # Show applications
+    # Show applications, one page at a time with the filters applied in the query
     st.subheader("All Applications")
-    applications = get_user_applications(user_id)
+    filter_col1, filter_col2, filter_col3 = st.columns(3)
+    status_filter = filter_col1.selectbox("Status", ["All", "Applied", "Interview", "Offer", "Rejected"], key="app_status_filter")
+    company_filter = filter_col2.text_input("Company", placeholder="Starts with...", key="app_company_filter")
+    period_filter = filter_col3.selectbox("Applied", list(APPLICATION_PERIODS), key="app_period_filter")
+    
+    # The stack of page cursors starts over whenever a filter changes
+    filters = (status_filter, company_filter.strip(), period_filter)
+    if st.session_state.get('app_filters') != filters:
+        st.session_state.app_filters = filters
+        st.session_state.app_cursors = [None]
+    
+    days = APPLICATION_PERIODS[period_filter]
+    applications, next_cursor = get_applications_page(
+        user_id,
+        limit=APPLICATION_PAGE_SIZE,
+        cursor=st.session_state.app_cursors[-1],
+        status=None if status_filter == "All" else status_filter,
+        company=company_filter.strip() or None,
+        date_from=date.today() - timedelta(days=days) if days else None
+    )
     
     if applications:
         for app in applications:
@@ -905,6 +415,21 @@ if st.session_state.get('show_jobs', False):
                             st.rerun()
                         else:
                             st.error(msg)
+        
+        page_col1, page_col2, page_col3 = st.columns([1, 2, 1])
+        if len(st.session_state.app_cursors) > 1 and page_col1.button("⬅️ Newer", use_container_width=True):
+            st.session_state.app_cursors.pop()
+            st.rerun()
+        page_col2.caption(f"Page {len(st.session_state.app_cursors)}")
+        if next_cursor and page_col3.button("Older ➡️", use_container_width=True):
+            st.session_state.app_cursors.append(next_cursor)
+            st.rerun()
+    elif len(st.session_state.app_cursors) > 1:
+        # Later page emptied by status changes; go back to the first page
+        st.session_state.app_cursors = [None]
+        st.rerun()
+    elif status_filter != "All" or company_filter.strip() or days:
+        st.info("No applications match these filters.")
     else:
         st.info("No job applications yet. Add your first application above!")
     
@@ -993,43 +518,64 @@ with col2:
             if not job_description.strip():
                 st.error("Please enter a job description")
             else:
-                with st.spinner("Analyzing your resume..."):
-                    raw_text = process_resume_file(uploaded_file)
-                    
-                    if raw_text:
-                        # Extract resume data
-                        resume_data = extract_resume_data(raw_text)
-                        
-                        # Parse job requirements
-                        skills = [skill.strip() for skill in re.split(r'[,\n]', skills_input) if skill.strip()]
-                        job_requirements = {
-                            'skills': skills,
-                            'min_experience': min_experience,
-                            'education_level': education_level
-                        }
-                        
-                        # Save resume to database
-                        user_id = st.session_state['user']['user_id']
-                        success, resume_id, msg = save_resume(
-                            user_id=user_id,
-                            resume_name=uploaded_file.name,
-                            file_path=f"uploads/{uploaded_file.name}",
-                            file_size=uploaded_file.size,
-                            file_type=uploaded_file.name.split('.')[-1],
-                            raw_text=raw_text,
-                            extracted_data=resume_data
-                        )
-                        
-                        if success:
-                            st.session_state.current_resume_id = resume_id
-                        
-                        # Store in session state
-                        st.session_state.resume_data = resume_data
-                        st.session_state.job_description = job_description
-                        st.session_state.job_requirements = job_requirements
-                        st.session_state.analyzed = True
-                        
-                        st.success("✅ Analysis complete! Resume saved to database.")
+                # Parse job requirements
+                skills = [skill.strip() for skill in re.split(r'[,\n]', skills_input) if skill.strip()]
+                job_requirements = {
+                    'skills': skills,
+                    'min_experience': min_experience,
+                    'education_level': education_level
+                }
+                
+                # Parsing, saving and scoring run on a background worker; this rerun only queues the job
+                success, job_id, msg = enqueue_resume_analysis(
+                    user_id=st.session_state['user']['user_id'],
+                    file_name=uploaded_file.name,
+                    data=uploaded_file.getvalue(),
+                    job_title=job_title,
+                    job_description=job_description,
+                    job_requirements=job_requirements
+                )
+                if success:
+                    st.session_state.analysis_job_id = job_id
+                    st.session_state.analysis_poll = {'stage': None, 'delay': JOB_QUEUE_CONFIG['poll_interval']}
+                else:
+                    st.error(msg)
+    
+    # Poll the queued analysis; its results move into session state once a worker finishes it
+    if st.session_state.get('analysis_job_id'):
+        job = get_job_status(st.session_state.analysis_job_id, st.session_state['user']['user_id'])
+        if job is None or job['status'] == 'failed':
+            st.error(f"❌ Analysis failed: {job['error'] if job else 'job not found'}")
+            st.session_state.analysis_job_id = None
+        elif job['status'] == 'succeeded':
+            result = job['result']
+            st.session_state.current_resume_id = result['resume_id']
+            # Embeddings and analyses are stored against this version
+            st.session_state.current_version_id = result['version_id']
+            
+            # Store in session state
+            st.session_state.resume_data = result['resume_data']
+            st.session_state.job_description = job['payload']['job_description']
+            st.session_state.job_requirements = job['payload']['job_requirements']
+            st.session_state.analysis = None
+            st.session_state.analyzed = True
+            st.session_state.analysis_job_id = None
+            
+            reuse_note = " Your analysed sections are unchanged, so the earlier analysis was reused." if result.get('analysis_reused') else ""
+            st.success(f"✅ Analysis complete! {result.get('message', 'Resume saved to database.')}{reuse_note}")
+        else:
+            stage = ANALYSIS_STAGE_LABELS.get(job['stage'], "Waiting for a worker")
+            retry_note = f" (attempt {job['attempts']} of {job['max_attempts']})" if job['attempts'] > 1 else ""
+            st.info(f"⏳ {stage}...{retry_note}")
+            # Back off while the stage stays the same; a new stage polls quickly again
+            poll = st.session_state.setdefault('analysis_poll', {'stage': None, 'delay': JOB_QUEUE_CONFIG['poll_interval']})
+            if job['stage'] != poll['stage']:
+                poll.update(stage=job['stage'], delay=JOB_QUEUE_CONFIG['poll_interval'])
+            else:
+                poll['delay'] = min(poll['delay'] * 2, JOB_QUEUE_CONFIG['ui_max_poll_interval'])
+            if st.button("🔄 Check now", key="check_analysis_job"):
+                poll['delay'] = JOB_QUEUE_CONFIG['poll_interval']
+                st.rerun()
     st.markdown('</div>', unsafe_allow_html=True)
 
 # Right column - Resume Summary
@@ -1050,27 +596,9 @@ with col3:
         
         # Quick analysis
         if 'job_requirements' in st.session_state:
-            gaps = analyze_resume_gaps(resume_data, st.session_state.job_description, st.session_state.job_requirements)
-            selection_probability = calculate_selection_probability(resume_data, st.session_state.job_requirements, gaps)
-            
-            # Save analysis to database
-            if 'current_resume_id' in st.session_state and 'analysis_saved' not in st.session_state:
-                analysis_results = {
-                    'selection_probability': selection_probability,
-                    'missing_skills': gaps.get('missing_skills', []),
-                    'strengths': gaps.get('matching_skills', []),
-                    'weaknesses': gaps.get('missing_skills', []),
-                    'suggestions': []
-                }
-                
-                save_analysis(
-                    resume_id=st.session_state.current_resume_id,
-                    version_id=None,
-                    job_title=st.session_state.get('job_title', 'Unknown'),
-                    job_description=st.session_state.job_description,
-                    analysis_results=analysis_results
-                )
-                st.session_state.analysis_saved = True
+            analysis = session_analysis()
+            gaps = analysis.gaps
+            selection_probability = analysis.selection_probability
             
             st.markdown("---")
             st.subheader("🔍 Quick Analysis")
@@ -1161,7 +689,10 @@ if 'analyzed' in st.session_state and st.session_state.analyzed:
                 prompt,
                 st.session_state.resume_data,
                 st.session_state.job_description,
-                st.session_state.job_requirements
+                st.session_state.job_requirements,
+                enable_ai=enable_ai,
+                analysis=session_analysis(),
+                version_id=st.session_state.get('current_version_id')
             )
             st.markdown(response)
         
@@ -1185,3 +716,8 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # Duplicate sections removed - they are now at the top of the page
+
+# Keep polling while an analysis is queued or running, less often the longer a stage takes
+if st.session_state.get('analysis_job_id'):
+    time.sleep(st.session_state.analysis_poll['delay'])
+    st.rerun()
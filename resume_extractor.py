@@ -0,0 +1,297 @@
+"""
+Single-pass structured data extractor for resume text
+Section headers, entry cues and contact fields are matched with precompiled
+patterns against one lowercased copy of each line. Output is identical to the
+original line-by-line implementation, kept below as extract_resume_data_reference.
+
+Run `python resume_extractor.py [resume.txt ...]` to check equivalence and time both.
+"""
+import re
+
+SECTION_HEADERS = frozenset(['EDUCATION', 'SKILLS', 'EXPERIENCE', 'PROJECTS', 'CERTIFICATIONS', 'WORK EXPERIENCE'])
+# str.upper() never shortens a line, so anything longer than the longest header can't be one
+MAX_HEADER_LENGTH = max(len(header) for header in SECTION_HEADERS)
+
+EMAIL_PATTERN = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+PHONE_PATTERN = re.compile(r'[\+]?[1-9][\d]{0,15}')
+
+# Cues that start a new entry, matched against the lowercased line
+EDUCATION_ENTRY_PATTERN = re.compile(r'bachelor|master|phd|degree|university|college|school|20[12]')
+EXPERIENCE_ENTRY_PATTERN = re.compile(
+    r'20[12]|jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec'
+    r'|engineer|developer|manager|analyst|specialist|coordinator|intern|associate'
+)
+BULLET_PREFIXES = ('•', '-', '*', '○')
+PROJECT_TITLE_SUFFIXES = ('|', ':')
+
+def extract_resume_data(raw_text):
+    """Extract structured data from resume text"""
+    data = {
+        'name': '',
+        'email': '',
+        'phone': '',
+        'education': [],
+        'skills': [],
+        'experience': [],
+        'projects': [],
+        'certifications': []
+    }
+    education = data['education']
+    skills = data['skills']
+    experience = data['experience']
+    projects = data['projects']
+    certifications = data['certifications']
+    
+    current_section = ""
+    current_entry = []  # Open education/experience/project entry for the current section
+    
+    for line in raw_text.split('\n'):
+        line = line.strip()
+        if not line:
+            continue
+        
+        # Detect sections
+        if len(line) <= MAX_HEADER_LENGTH:
+            header = line.upper()
+            if header in SECTION_HEADERS:
+                if current_entry:
+                    if current_section == "PROJECTS":
+                        projects.append(' '.join(current_entry))
+                    elif current_section == "EDUCATION":
+                        education.append(' '.join(current_entry))
+                    else:
+                        experience.append(' '.join(current_entry))
+                    current_entry = []
+                current_section = header
+                continue
+        
+        # Name is the first line before any section header
+        if not current_section and not data['name']:
+            data['name'] = line
+            continue
+        
+        # Contact fields; later matches overwrite earlier ones
+        if '@' in line and '.' in line:
+            email_match = EMAIL_PATTERN.search(line)
+            if email_match:
+                data['email'] = email_match.group()
+        
+        phone_match = PHONE_PATTERN.search(line)
+        if phone_match and phone_match.end() - phone_match.start() >= 10:
+            data['phone'] = phone_match.group()
+        
+        if not current_section:
+            continue
+        
+        if current_section == "SKILLS":
+            skills.append(line)
+        elif current_section == "CERTIFICATIONS":
+            certifications.append(line)
+        elif current_section == "PROJECTS":
+            if current_entry and not line.startswith(BULLET_PREFIXES) and (
+                    line.endswith(PROJECT_TITLE_SUFFIXES) or (len(line) < 80 and 'project' in line.lower())):
+                projects.append(' '.join(current_entry))
+                current_entry = []
+            current_entry.append(line)
+        elif current_section == "EDUCATION":
+            if current_entry and EDUCATION_ENTRY_PATTERN.search(line.lower()):
+                education.append(' '.join(current_entry))
+                current_entry = []
+            current_entry.append(line)
+        else:  # EXPERIENCE / WORK EXPERIENCE
+            if current_entry and EXPERIENCE_ENTRY_PATTERN.search(line.lower()):
+                experience.append(' '.join(current_entry))
+                current_entry = []
+            current_entry.append(line)
+    
+    # Save the entry still open at the end of the text
+    if current_entry:
+        if current_section == "PROJECTS":
+            projects.append(' '.join(current_entry))
+        elif current_section == "EDUCATION":
+            education.append(' '.join(current_entry))
+        else:
+            experience.append(' '.join(current_entry))
+    
+    return data
+
+def extract_resume_data_reference(raw_text):
+    """Original line-by-line extractor, kept as the golden reference for extract_resume_data"""
+    lines = raw_text.split('\n')
+    
+    data = {
+        'name': '',
+        'email': '',
+        'phone': '',
+        'education': [],
+        'skills': [],
+        'experience': [],
+        'projects': [],
+        'certifications': []
+    }
+    
+    current_section = ""
+    current_project = []
+    current_experience = []
+    current_education = []
+    
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+            
+        # Detect sections
+        if line.upper() in ['EDUCATION', 'SKILLS', 'EXPERIENCE', 'PROJECTS', 'CERTIFICATIONS', 'WORK EXPERIENCE']:
+            # Save current project/experience/education before switching sections
+            if current_section == "PROJECTS" and current_project:
+                data['projects'].append(' '.join(current_project))
+                current_project = []
+            elif current_section in ["EXPERIENCE", "WORK EXPERIENCE"] and current_experience:
+                data['experience'].append(' '.join(current_experience))
+                current_experience = []
+            elif current_section == "EDUCATION" and current_education:
+                data['education'].append(' '.join(current_education))
+                current_education = []
+            
+            current_section = line.upper()
+            continue
+            
+        # Extract name (first non-empty line that's not a section header)
+        if not data['name'] and current_section == "" and line and not line.upper() in ['EDUCATION', 'SKILLS', 'EXPERIENCE', 'PROJECTS', 'CERTIFICATIONS']:
+            data['name'] = line
+            continue
+            
+        # Extract email
+        if '@' in line and '.' in line:
+            email_match = re.search(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', line)
+            if email_match:
+                data['email'] = email_match.group()
+                
+        # Extract phone
+        phone_match = re.search(r'[\+]?[1-9][\d]{0,15}', line)
+        if phone_match and len(phone_match.group()) >= 10:
+            data['phone'] = phone_match.group()
+            
+        # Extract content based on current section
+        if current_section == "EDUCATION":
+            # Check if this looks like a new education entry (contains degree keywords or dates)
+            if any(keyword in line.lower() for keyword in ['bachelor', 'master', 'phd', 'degree', 'university', 'college', 'school', '202', '201', '2020', '2021', '2022', '2023', '2024']):
+                if current_education:  # Save previous education entry
+                    data['education'].append(' '.join(current_education))
+                    current_education = []
+            current_education.append(line)
+            
+        elif current_section == "SKILLS":
+            data['skills'].append(line)
+            
+        elif current_section in ["EXPERIENCE", "WORK EXPERIENCE"]:
+            # Check if this looks like a new job entry (contains job keywords or dates)
+            if any(keyword in line.lower() for keyword in ['202', '202', '201', 'jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec']) or \
+               any(keyword in line.lower() for keyword in ['engineer', 'developer', 'manager', 'analyst', 'specialist', 'coordinator', 'intern', 'associate']):
+                if current_experience:  # Save previous experience entry
+                    data['experience'].append(' '.join(current_experience))
+                    current_experience = []
+            current_experience.append(line)
+            
+        elif current_section == "PROJECTS":
+            # Detect new project: Look for project titles (short lines without bullet points)
+            # or lines that end with | or : which typically indicate project names
+            is_new_project = False
+            
+            # Check if it's a project title (not a bullet point)
+            if not (line.startswith('•') or line.startswith('-') or line.startswith('*') or line.startswith('○')):
+                # Check if it looks like a title (ends with | or :, or contains "Project" keyword)
+                if (line.endswith('|') or line.endswith(':') or 
+                    ('project' in line.lower() and len(line) < 80)):
+                    is_new_project = True
+            
+            if is_new_project and current_project:
+                # Save previous project
+                data['projects'].append(' '.join(current_project))
+                current_project = []
+            
+            current_project.append(line)
+            
+        elif current_section == "CERTIFICATIONS":
+            data['certifications'].append(line)
+    
+    # Save any remaining entries
+    if current_project:
+        data['projects'].append(' '.join(current_project))
+    if current_experience:
+        data['experience'].append(' '.join(current_experience))
+    if current_education:
+        data['education'].append(' '.join(current_education))
+    
+    return data
+
+SAMPLE_RESUME = """Jane Doe
+jane.doe@example.com | +14155550123
+San Francisco, CA
+
+EDUCATION
+Master of Science in Computer Science
+Stanford University, 2021 - 2023
+Bachelor of Engineering
+State College 2017 - 2021
+
+SKILLS
+Python, Java, SQL, Docker
+AWS, Kubernetes, React
+
+WORK EXPERIENCE
+Senior Software Engineer
+Acme Corp, Jan 2023 - Present
+• Developed microservices handling 10k requests per second
+• Managed a team of 4 engineers
+Data Analyst Intern
+Globex, Jun 2022 - Aug 2022
+• Built dashboards used by 200+ people
+
+PROJECTS
+Resume Screener |
+• Streamlit app that ranks resumes against job postings
+- Uses sentence embeddings for matching
+Chat Project
+• Chatbot answering career questions
+Portfolio Site:
+* Personal website with blog
+
+CERTIFICATIONS
+AWS Certified Solutions Architect
+Certified Kubernetes Administrator
+"""
+
+def _golden_corpus(extra_texts=()):
+    """Sample resume plus truncations and reorderings of it, and any user-supplied texts"""
+    lines = SAMPLE_RESUME.split('\n')
+    corpus = [SAMPLE_RESUME, '', '\n\n', SAMPLE_RESUME.lower(), SAMPLE_RESUME.upper()]
+    corpus += ['\n'.join(lines[:i]) for i in range(1, len(lines), 3)]
+    corpus += ['\n'.join(lines[i:]) for i in range(1, len(lines), 3)]
+    corpus.append('\n'.join(reversed(lines)))
+    corpus.extend(extra_texts)
+    return corpus
+
+def _benchmark(fn, text, repeat=5, number=200):
+    import timeit
+    return min(timeit.repeat(lambda: fn(text), repeat=repeat, number=number)) / number
+
+if __name__ == "__main__":
+    import sys
+    
+    extra = []
+    for path in sys.argv[1:]:
+        with open(path, encoding='utf-8', errors='replace') as f:
+            extra.append(f.read())
+    
+    corpus = _golden_corpus(extra)
+    mismatches = [i for i, text in enumerate(corpus) if extract_resume_data(text) != extract_resume_data_reference(text)]
+    if mismatches:
+        print(f"❌ Output differs from reference on {len(mismatches)} of {len(corpus)} texts: {mismatches}")
+        sys.exit(1)
+    print(f"✅ Output identical to reference on {len(corpus)} texts")
+    
+    for label, text in [('sample', SAMPLE_RESUME), ('sample x20', SAMPLE_RESUME * 20)] + [(path, t) for path, t in zip(sys.argv[1:], extra)]:
+        reference = _benchmark(extract_resume_data_reference, text)
+        compiled = _benchmark(extract_resume_data, text)
+        print(f"{label}: reference {reference * 1e6:.1f}µs, single-pass {compiled * 1e6:.1f}µs ({reference / compiled:.2f}x)")
@@ -1,50 +1,363 @@
 import json
+from collections import Counter
 from datetime import datetime
+import numpy as np
 from database import get_db_connection
+from skill_index import index_resume_versions
+from text_store import resolve_text_columns, store_texts
 
-def save_resume(user_id, resume_name, file_path, file_size, file_type, raw_text, extracted_data):
-    """Save a new resume for user"""
+# Sections of extracted_data compared between versions of a resume
+RESUME_TEXT_SECTIONS = ('name', 'email', 'phone')
+RESUME_LIST_SECTIONS = ('education', 'skills', 'experience', 'projects', 'certifications')
+
+def diff_resume_sections(old_data, new_data):
+    """
+    Section-level diff between two versions' extracted data, {section: change} for changed
+    sections only. List sections give {'added': [...], 'removed': [...]} (both empty when only
+    the order changed); text sections give {'old': ..., 'new': ...}.
+    """
+    diff = {}
+    for section in RESUME_TEXT_SECTIONS:
+        old, new = old_data.get(section) or '', new_data.get(section) or ''
+        if old != new:
+            diff[section] = {'old': old, 'new': new}
+    for section in RESUME_LIST_SECTIONS:
+        old, new = list(old_data.get(section) or []), list(new_data.get(section) or [])
+        if old != new:
+            old_counts, new_counts = Counter(old), Counter(new)
+            diff[section] = {'added': list((new_counts - old_counts).elements()), 'removed': list((old_counts - new_counts).elements())}
+    return diff
+
+def describe_section_diff(diff):
+    """One-line summary of a section diff, e.g. 'Changed skills +2 -1, phone'"""
+    if not diff:
+        return 'No content changes'
+    parts = []
+    for section, change in diff.items():
+        if 'added' in change:
+            counts = ' '.join(f"{sign}{len(change[key])}" for sign, key in (('+', 'added'), ('-', 'removed')) if change[key])
+            parts.append(f"{section} {counts or 'reordered'}")
+        else:
+            parts.append(section)
+    return 'Changed ' + ', '.join(parts)
+
+def unchanged_embedding_sections(diff):
+    """Stored embedding sections whose text a diff leaves unchanged ('full' covers the name and every list section)"""
+    sections = [section for section in RESUME_LIST_SECTIONS if section not in diff]
+    if not set(diff) & {'name', *RESUME_LIST_SECTIONS}:
+        sections.append('full')
+    return sections
+
+def save_resume(user_id, resume_name, file_path, file_size, file_type, raw_text, extracted_data, content_hash=None, resume_id=None):
+    """
+    Save an uploaded resume for user, reusing an identical earlier upload when content_hash matches.
+    An upload of a resume the user already has (resume_id, or else the same resume_name) becomes its
+    next version, see _save_resume_version.
+    """
     try:
         with get_db_connection() as conn:
             cursor = conn.cursor()
+            if content_hash:
+                # Only a latest version counts; re-uploading an older revision adds it back as a new version
+                cursor.execute('SELECT rv.resume_id FROM resume_versions rv JOIN resumes r ON rv.resume_id = r.resume_id WHERE r.user_id = %s AND rv.content_hash = %s AND rv.version_id = (SELECT MAX(version_id) FROM resume_versions WHERE resume_id = rv.resume_id) ORDER BY rv.version_id DESC LIMIT 1', (user_id, content_hash))
+                existing = cursor.fetchone()
+                if existing:
+                    cursor.execute('UPDATE resumes SET is_current = (resume_id = %s) WHERE user_id = %s', (existing['resume_id'], user_id))
+                    return True, existing['resume_id'], "Resume already saved, reusing existing copy."
+            # Locking the resume row serializes concurrent uploads of new versions of it
+            if resume_id is not None:
+                cursor.execute('SELECT resume_id FROM resumes WHERE resume_id = %s AND user_id = %s FOR UPDATE', (resume_id, user_id))
+            else:
+                cursor.execute('SELECT resume_id FROM resumes WHERE user_id = %s AND resume_name = %s ORDER BY resume_id DESC LIMIT 1 FOR UPDATE', (user_id, resume_name))
+            existing = cursor.fetchone()
+            if existing:
+                return _save_resume_version(cursor, user_id, existing['resume_id'], file_path, file_size, file_type, raw_text, extracted_data, content_hash)
+            if resume_id is not None:
+                return False, None, "Resume not found"
             cursor.execute('UPDATE resumes SET is_current = 0 WHERE user_id = %s', (user_id,))
             cursor.execute('INSERT INTO resumes (user_id, resume_name, file_path, file_size, file_type, is_current) VALUES (%s, %s, %s, %s, %s, 1)', (user_id, resume_name, file_path, file_size, file_type))
             resume_id = cursor.lastrowid
-            cursor.execute('INSERT INTO resume_versions (resume_id, version_number, raw_text, extracted_data, changes_description) VALUES (%s, 1, %s, %s, %s)', (resume_id, raw_text, json.dumps(extracted_data), 'Initial upload'))
+            cursor.execute('INSERT INTO resume_versions (resume_id, version_number, raw_text_blob_id, extracted_data, changes_description, content_hash) VALUES (%s, 1, %s, %s, %s, %s)', (resume_id, store_texts(cursor, [raw_text])[0], json.dumps(extracted_data), 'Initial upload', content_hash))
+            index_resume_versions(cursor, [(resume_id, cursor.lastrowid, extracted_data)])
             return True, resume_id, "Resume saved successfully!"
     except Exception as e:
         return False, None, f"Failed to save resume: {str(e)}"
 
+def _save_resume_version(cursor, user_id, resume_id, file_path, file_size, file_type, raw_text, extracted_data, content_hash):
+    """
+    Add the next version of a resume on the caller's cursor, storing its section diff against
+    the previous version. Stored embeddings of unchanged sections are copied to the new version
+    and the skill index is rebuilt only when skills changed. An upload that parses to the same
+    data as the previous version adds nothing.
+    """
+    cursor.execute('SELECT version_id, version_number, extracted_data FROM resume_versions WHERE resume_id = %s ORDER BY version_number DESC LIMIT 1', (resume_id,))
+    previous = cursor.fetchone()
+    diff = diff_resume_sections(json.loads(previous['extracted_data'] or '{}') if previous else {}, extracted_data)
+    cursor.execute('UPDATE resumes SET is_current = (resume_id = %s) WHERE user_id = %s', (resume_id, user_id))
+    if previous and not diff:
+        return True, resume_id, f"No changes since version {previous['version_number']}, keeping it."
+    
+    version_number = previous['version_number'] + 1 if previous else 1
+    description = describe_section_diff(diff)
+    cursor.execute('UPDATE resumes SET file_path = %s, file_size = %s, file_type = %s, uploaded_at = CURRENT_TIMESTAMP WHERE resume_id = %s', (file_path, file_size, file_type, resume_id))
+    cursor.execute('INSERT INTO resume_versions (resume_id, version_number, raw_text_blob_id, extracted_data, changes_description, content_hash, section_diff) VALUES (%s, %s, %s, %s, %s, %s, %s)', (resume_id, version_number, store_texts(cursor, [raw_text])[0], json.dumps(extracted_data), description, content_hash, json.dumps(diff)))
+    version_id = cursor.lastrowid
+    
+    reused_sections = unchanged_embedding_sections(diff) if previous else []
+    if reused_sections:
+        placeholders = ', '.join(['%s'] * len(reused_sections))
+        cursor.execute(f'INSERT INTO resume_embeddings (version_id, model_name, section, dimensions, embedding) SELECT %s, model_name, section, dimensions, embedding FROM resume_embeddings WHERE version_id = %s AND section IN ({placeholders})', (version_id, previous['version_id'], *reused_sections))
+    if previous and 'skills' not in diff:
+        cursor.execute('UPDATE resume_skill_index SET version_id = %s WHERE resume_id = %s', (version_id, resume_id))
+    else:
+        index_resume_versions(cursor, [(resume_id, version_id, extracted_data)])
+    return True, resume_id, f"Saved version {version_number}: {description}"
+
+def save_resumes_batch(user_id, resumes):
+    """
+    Save many resumes for a user in one transaction using multi-row inserts.
+    Each item is a dict with resume_name, file_path, file_size, file_type, raw_text,
+    extracted_data and content_hash. Files whose content_hash the user already has
+    are not inserted again. Returns (success, {content_hash: resume_id}, message).
+    Batch uploads leave the user's current resume unchanged.
+    """
+    if not resumes:
+        return True, {}, "Nothing to save"
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            hashes = list({r['content_hash'] for r in resumes})
+            placeholders = ', '.join(['%s'] * len(hashes))
+            cursor.execute(f'SELECT rv.content_hash, rv.resume_id FROM resume_versions rv JOIN resumes r ON rv.resume_id = r.resume_id WHERE r.user_id = %s AND rv.content_hash IN ({placeholders})', (user_id, *hashes))
+            saved = {row['content_hash']: row['resume_id'] for row in cursor.fetchall()}
+            
+            seen = set(saved)
+            new_resumes = []
+            for resume in resumes:
+                if resume['content_hash'] not in seen:
+                    seen.add(resume['content_hash'])
+                    new_resumes.append(resume)
+            if not new_resumes:
+                return True, saved, "All resumes were already saved"
+            
+            # executemany turns a single-table INSERT ... VALUES into one multi-row statement
+            cursor.executemany('INSERT INTO resumes (user_id, resume_name, file_path, file_size, file_type, is_current) VALUES (%s, %s, %s, %s, %s, 0)', [(user_id, r['resume_name'], r['file_path'], r['file_size'], r['file_type']) for r in new_resumes])
+            first_id = cursor.lastrowid
+            paths = [r['file_path'] for r in new_resumes]
+            placeholders = ', '.join(['%s'] * len(paths))
+            cursor.execute(f'SELECT resume_id, file_path FROM resumes WHERE user_id = %s AND resume_id >= %s AND file_path IN ({placeholders})', (user_id, first_id, *paths))
+            ids_by_path = {row['file_path']: row['resume_id'] for row in cursor.fetchall()}
+            
+            raw_text_blob_ids = store_texts(cursor, [r['raw_text'] for r in new_resumes])
+            cursor.executemany('INSERT INTO resume_versions (resume_id, version_number, raw_text_blob_id, extracted_data, changes_description, content_hash) VALUES (%s, 1, %s, %s, %s, %s)', [(ids_by_path[r['file_path']], blob_id, json.dumps(r['extracted_data']), 'Batch import', r['content_hash']) for r, blob_id in zip(new_resumes, raw_text_blob_ids)])
+            new_ids = [ids_by_path[r['file_path']] for r in new_resumes]
+            placeholders = ', '.join(['%s'] * len(new_ids))
+            cursor.execute(f'SELECT resume_id, version_id FROM resume_versions WHERE resume_id IN ({placeholders})', tuple(new_ids))
+            version_ids = {row['resume_id']: row['version_id'] for row in cursor.fetchall()}
+            index_resume_versions(cursor, [(resume_id, version_ids[resume_id], r['extracted_data']) for resume_id, r in zip(new_ids, new_resumes)])
+            for resume_id, resume in zip(new_ids, new_resumes):
+                saved[resume['content_hash']] = resume_id
+            return True, saved, f"Saved {len(new_resumes)} resumes"
+    except Exception as e:
+        return False, {}, f"Failed to save resumes: {str(e)}"
+
 def get_user_resumes(user_id):
     """Get all resumes for a user"""
     try:
         with get_db_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute('SELECT r.*, COUNT(DISTINCT rv.version_id) as version_count, COUNT(DISTINCT rah.analysis_id) as analysis_count FROM resumes r LEFT JOIN resume_versions rv ON r.resume_id = rv.resume_id LEFT JOIN resume_analysis_history rah ON r.resume_id = rah.resume_id WHERE r.user_id = %s GROUP BY r.resume_id ORDER BY r.uploaded_at DESC', (user_id,))
+            # Separate per-resume counts; joining both tables would build versions x analyses rows per resume
+            cursor.execute('SELECT r.*, (SELECT COUNT(*) FROM resume_versions rv WHERE rv.resume_id = r.resume_id) as version_count, (SELECT COUNT(*) FROM resume_analysis_history rah WHERE rah.resume_id = r.resume_id) as analysis_count FROM resumes r WHERE r.user_id = %s ORDER BY r.uploaded_at DESC', (user_id,))
             return cursor.fetchall()
     except Exception as e:
         return []
 
-def save_analysis(resume_id, version_id, job_title, job_description, analysis_results):
-    """Save resume analysis results"""
+def get_latest_resume_data(user_id=None, resume_ids=None):
+    """Get the extracted data of the latest version of each resume, by owner and/or resume ids"""
+    conditions, params = [], []
+    if user_id is not None:
+        conditions.append('r.user_id = %s')
+        params.append(user_id)
+    if resume_ids is not None:
+        if not resume_ids:
+            return []
+        conditions.append(f"r.resume_id IN ({', '.join(['%s'] * len(resume_ids))})")
+        params.extend(resume_ids)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'SELECT r.resume_id, r.user_id, r.resume_name, rv.version_id, rv.extracted_data FROM resumes r JOIN resume_versions rv ON rv.version_id = (SELECT MAX(version_id) FROM resume_versions WHERE resume_id = r.resume_id) {where} ORDER BY r.resume_id', tuple(params))
+            rows = cursor.fetchall()
+            for row in rows:
+                row['extracted_data'] = json.loads(row['extracted_data'])
+            return rows
+    except Exception as e:
+        return []
+
+def get_current_version_id(resume_id):
+    """Get the id of the latest version of a resume"""
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT MAX(version_id) AS version_id FROM resume_versions WHERE resume_id = %s', (resume_id,))
+            row = cursor.fetchone()
+            return row['version_id'] if row else None
+    except Exception as e:
+        return None
+
+def get_version_raw_text(version_id):
+    """Extracted text of a resume version, or None"""
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT raw_text, raw_text_blob_id FROM resume_versions WHERE version_id = %s', (version_id,))
+            row = cursor.fetchone()
+            if not row:
+                return None
+            return resolve_text_columns(cursor, [row], {'raw_text': 'raw_text_blob_id'})[0]['raw_text']
+    except Exception as e:
+        return None
+
+def get_resume_embeddings(version_id, model_name):
+    """Get stored section embeddings of a resume version as {section: float32 array}"""
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT section, embedding FROM resume_embeddings WHERE version_id = %s AND model_name = %s', (version_id, model_name))
+            return {row['section']: np.frombuffer(row['embedding'], dtype=np.float32) for row in cursor.fetchall()}
+    except Exception as e:
+        return {}
+
+def save_resume_embeddings(version_id, model_name, embeddings):
+    """Store section embeddings of a resume version so they are never recomputed"""
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.executemany('INSERT INTO resume_embeddings (version_id, model_name, section, dimensions, embedding) VALUES (%s, %s, %s, %s, %s) ON DUPLICATE KEY UPDATE dimensions = VALUES(dimensions), embedding = VALUES(embedding)', [(version_id, model_name, section, len(vector), np.asarray(vector, dtype=np.float32).tobytes()) for section, vector in embeddings.items()])
+            return True
+    except Exception as e:
+        return False
+
+def get_versions_missing_embeddings(model_name, after_version_id=0, limit=500):
+    """Latest resume versions with no stored 'full' embedding for model_name, by version id"""
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT rv.version_id, rv.extracted_data FROM resumes r JOIN resume_versions rv ON rv.version_id = (SELECT MAX(version_id) FROM resume_versions WHERE resume_id = r.resume_id) LEFT JOIN resume_embeddings re ON re.version_id = rv.version_id AND re.model_name = %s AND re.section = 'full' WHERE re.version_id IS NULL AND rv.version_id > %s ORDER BY rv.version_id LIMIT %s", (model_name, after_version_id, limit))
+            rows = cursor.fetchall()
+            for row in rows:
+                row['extracted_data'] = json.loads(row['extracted_data'] or '{}')
+            return rows
+    except Exception as e:
+        return []
+
+def get_resume_embedding_batch(model_name, after_version_id=0, limit=500):
+    """Whole-resume embeddings of versions after after_version_id: list of {version_id, embedding}"""
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT version_id, embedding FROM resume_embeddings WHERE model_name = %s AND section = 'full' AND version_id > %s ORDER BY version_id LIMIT %s", (model_name, after_version_id, limit))
+            return [{'version_id': row['version_id'], 'embedding': np.frombuffer(row['embedding'], dtype=np.float32)} for row in cursor.fetchall()]
+    except Exception as e:
+        return []
+
+def get_latest_version_ids():
+    """Ids of the latest version of every stored resume, or None if they could not be read"""
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT MAX(version_id) AS version_id FROM resume_versions GROUP BY resume_id')
+            return [row['version_id'] for row in cursor.fetchall()]
+    except Exception as e:
+        return None
+
+def save_analysis(resume_id, version_id, job_title, job_description, analysis_results, input_hash=None):
+    """Save resume analysis results; input_hash is the analysis fingerprint that lets later versions reuse them"""
     try:
         with get_db_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute('INSERT INTO resume_analysis_history (resume_id, version_id, job_title, job_description, selection_probability, missing_skills, strengths, weaknesses, suggestions) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)', (resume_id, version_id, job_title, job_description, analysis_results.get('selection_probability'), json.dumps(analysis_results.get('missing_skills', [])), json.dumps(analysis_results.get('strengths', [])), json.dumps(analysis_results.get('weaknesses', [])), json.dumps(analysis_results.get('suggestions', []))))
+            # Every analysis against the same job shares one stored copy of its description
+            cursor.execute('INSERT INTO resume_analysis_history (resume_id, version_id, job_title, job_description_blob_id, selection_probability, missing_skills, strengths, weaknesses, suggestions, input_hash) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)', (resume_id, version_id, job_title, store_texts(cursor, [job_description])[0], analysis_results.get('selection_probability'), json.dumps(analysis_results.get('missing_skills', [])), json.dumps(analysis_results.get('strengths', [])), json.dumps(analysis_results.get('weaknesses', [])), json.dumps(analysis_results.get('suggestions', [])), input_hash))
             return True, "Analysis saved!"
     except Exception as e:
         return False, f"Failed: {str(e)}"
 
+def reuse_analysis(resume_id, version_id, job_title, input_hash):
+    """
+    Record the latest saved analysis of any version of a resume with the same input_hash
+    (same analysed sections and job) again for version_id, instead of re-running it.
+    Returns (reused, message).
+    """
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('INSERT INTO resume_analysis_history (resume_id, version_id, job_title, job_description, job_description_blob_id, selection_probability, missing_skills, strengths, weaknesses, suggestions, input_hash) SELECT resume_id, %s, %s, job_description, job_description_blob_id, selection_probability, missing_skills, strengths, weaknesses, suggestions, input_hash FROM resume_analysis_history WHERE resume_id = %s AND input_hash = %s ORDER BY analysis_id DESC LIMIT 1', (version_id, job_title, resume_id, input_hash))
+            if cursor.rowcount:
+                return True, "Analysis reused from an earlier version"
+            return False, "No earlier analysis with the same inputs"
+    except Exception as e:
+        return False, f"Failed: {str(e)}"
+
+def get_resume_versions(user_id, resume_id=None):
+    """Versions of a user's resumes (or of one resume), newest first, with section_diff decoded"""
+    query = 'SELECT resume_id FROM resumes WHERE user_id = %s'
+    params = [user_id]
+    if resume_id is not None:
+        query += ' AND resume_id = %s'
+        params.append(resume_id)
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(query, tuple(params))
+            resume_ids = [row['resume_id'] for row in cursor.fetchall()]
+            if not resume_ids:
+                return []
+            # Read the versions alone so the order is a backward scan of (resume_id, version_number)
+            placeholders = ', '.join(['%s'] * len(resume_ids))
+            cursor.execute(f'SELECT resume_id, version_id, version_number, changes_description, section_diff, created_at FROM resume_versions WHERE resume_id IN ({placeholders}) ORDER BY resume_id DESC, version_number DESC', tuple(resume_ids))
+            rows = cursor.fetchall()
+            for row in rows:
+                row['section_diff'] = json.loads(row['section_diff']) if row['section_diff'] else {}
+            return rows
+    except Exception as e:
+        return []
+
 def get_analysis_history(resume_id):
     """Get analysis history for a resume"""
     try:
         with get_db_connection() as conn:
             cursor = conn.cursor()
             cursor.execute('SELECT * FROM resume_analysis_history WHERE resume_id = %s ORDER BY analyzed_at DESC', (resume_id,))
-            return cursor.fetchall()
+            return resolve_text_columns(cursor, cursor.fetchall(), {'job_description': 'job_description_blob_id'})
     except:
         return []
 
+def get_user_analysis_history(user_id, limit=200, cursor=None):
+    """
+    Analysis summaries for all of a user's resumes in one query, newest first.
+    Returns ({resume_id: [rows]}, next_cursor); pass next_cursor back for the next
+    page, None when there are no more. Job descriptions and result lists are left out.
+    """
+    try:
+        with get_db_connection() as conn:
+            db_cursor = conn.cursor()
+            query = 'SELECT rah.analysis_id, rah.resume_id, rah.version_id, rah.job_title, rah.selection_probability, rah.analyzed_at FROM resume_analysis_history rah JOIN resumes r ON r.resume_id = rah.resume_id WHERE r.user_id = %s'
+            params = [user_id]
+            if cursor is not None:
+                query += ' AND rah.analysis_id < %s'
+                params.append(cursor)
+            # One extra row tells whether another page exists
+            db_cursor.execute(query + ' ORDER BY rah.analysis_id DESC LIMIT %s', (*params, limit + 1))
+            rows = db_cursor.fetchall()
+    except Exception as e:
+        return {}, None
+    next_cursor = rows[limit - 1]['analysis_id'] if len(rows) > limit else None
+    history = {}
+    for row in rows[:limit]:
+        history.setdefault(row['resume_id'], []).append(row)
+    return history, next_cursor
+
 def get_resume_improvement_trends(user_id):
     """Get improvement trends"""
     return []
@@ -1,13 +1,49 @@
 import fitz  # PyMuPDF(other name) extract pdf text , uses less ram ,alternates->pdfplumber(good for tables,slower),pdfminer(complex but heavy)
 import docx
+from io import BytesIO
 
-def extract_text_from_pdf(file_path):
-    text = ""
-    pdf = fitz.open(file_path)
-    for page in pdf:
-        text += page.get_text()
-    return text
+# Sources can be a file path, raw bytes, or a file-like object (e.g. Streamlit's UploadedFile),
+# so uploads are parsed straight from memory without a temp file on disk
+def _read_bytes(source):
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return bytes(source)
+    if hasattr(source, 'getvalue'):
+        return source.getvalue()
+    return source.read()
 
-def extract_text_from_docx(file_path):
-    doc = docx.Document(file_path)
-    return "\n".join([para.text for para in doc.paragraphs])
+def _open_pdf(source):
+    if isinstance(source, str):
+        return fitz.open(source)
+    return fitz.open(stream=_read_bytes(source), filetype="pdf")
+
+def iter_text_from_pdf(source):
+    """Yield the text of a PDF page by page"""
+    pdf = _open_pdf(source)
+    try:
+        for page in pdf:
+            yield page.get_text()
+    finally:
+        pdf.close()
+
+def extract_text_from_pdf(source):
+    # join once instead of += per page, which is quadratic on long documents
+    return "".join(iter_text_from_pdf(source))
+
+def iter_text_from_docx(source):
+    """Yield the text of a DOCX paragraph by paragraph"""
+    if not isinstance(source, str):
+        source = BytesIO(_read_bytes(source))
+    doc = docx.Document(source)
+    for para in doc.paragraphs:
+        yield para.text
+
+def extract_text_from_docx(source):
+    return "\n".join(iter_text_from_docx(source))
+
+def extract_text(file_name, source):
+    """Extract text from a PDF or DOCX source, picking the parser from the file name"""
+    if file_name.endswith(".pdf"):
+        return extract_text_from_pdf(source)
+    elif file_name.endswith(".docx"):
+        return extract_text_from_docx(source)
+    raise ValueError("Unsupported file format. Please upload PDF or DOCX files.")
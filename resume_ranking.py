@@ -0,0 +1,140 @@
+"""
+Vectorized ranking of many resumes against one job
+Applies the same gap and selection-probability rules as resume_analysis, but for
+N resumes at once: per-resume features are extracted once into NumPy arrays and
+job skills are matched through an (N resumes x M skills) presence matrix, built by
+matching each distinct skill entry of the corpus once and scattering the hits to the
+resumes listing it.
+"""
+import numpy as np
+
+from resume_analysis import analyze_resume_gaps, calculate_selection_probability
+
+EXPERIENCE_KEYWORDS = ['years', 'experience', 'worked', 'developed', 'managed']
+
+class ResumeFeatures:
+    """Job-independent features for a set of resumes, reusable across many job rankings"""
+    def __init__(self, resume_ids, resumes_data):
+        self.resume_ids = list(resume_ids)
+        self.skills_text = [' '.join(data['skills']).lower() for data in resumes_data]
+        # Distinct skill entries and one (resume, entry) pair per listed skill; entries repeat
+        # across resumes, so a job skill is matched against far fewer strings than resumes
+        vocabulary, pair_resume, pair_entry = {}, [], []
+        for row, data in enumerate(resumes_data):
+            for entry in data['skills']:
+                pair_resume.append(row)
+                pair_entry.append(vocabulary.setdefault(entry.lower(), len(vocabulary)))
+        self.vocabulary = list(vocabulary)
+        self.pair_resume = np.array(pair_resume, dtype=np.int64)
+        self.pair_entry = np.array(pair_entry, dtype=np.int64)
+        
+        experience_text = [' '.join(data['experience']).lower() for data in resumes_data]
+        self.experience_indicators = np.array(
+            [sum(1 for keyword in EXPERIENCE_KEYWORDS if keyword in text) for text in experience_text], dtype=np.int64)
+        
+        education_text = [' '.join(data['education']).lower() for data in resumes_data]
+        self.has_bachelor = np.array(['bachelor' in text for text in education_text], dtype=bool)
+        self.has_master = np.array(['master' in text for text in education_text], dtype=bool)
+        
+        self.project_count = np.array([len(data['projects']) for data in resumes_data], dtype=np.int64)
+        self.has_certifications = np.array([bool(data['certifications']) for data in resumes_data], dtype=bool)
+    
+    def __len__(self):
+        return len(self.resume_ids)
+    
+    def skill_presence(self, skills):
+        """Boolean matrix [resume, skill]; same substring rule as analyze_resume_gaps"""
+        needles = [skill.lower() for skill in skills]
+        # Entries are joined with single spaces, so a match lies inside one entry unless the
+        # skill has a space; those are looked up by their longest space-free piece and confirmed below
+        keys = [max(needle.split(' '), key=len) for needle in needles]
+        entry_hits = np.array([[key in entry for key in keys] for entry in self.vocabulary], dtype=bool).reshape(len(self.vocabulary), len(keys))
+        presence = np.zeros((len(self), len(skills)), dtype=bool)
+        rows, columns = np.nonzero(entry_hits[self.pair_entry])
+        presence[self.pair_resume[rows], columns] = True
+        for column, (needle, key) in enumerate(zip(needles, keys)):
+            if key != needle or not key:
+                candidates = np.flatnonzero(presence[:, column]) if key else np.arange(len(self))
+                presence[candidates, column] = [needle in self.skills_text[row] for row in candidates]
+        return presence
+
+def score_resumes(features, job_requirements):
+    """
+    Selection probability and skill presence for every resume.
+    Returns (scores, presence) where scores[i] equals calculate_selection_probability
+    for resume i and presence[i, j] is True when resume i has job skill j.
+    """
+    skills = job_requirements.get('skills', [])
+    presence = features.skill_presence(skills)
+    missing_count = len(skills) - presence.sum(axis=1)
+    
+    if job_requirements.get('min_experience', 0) > 0:
+        weak_experience = features.experience_indicators < 3
+    else:
+        weak_experience = np.zeros(len(features), dtype=bool)
+    
+    required_education = job_requirements.get('education_level', '').lower()
+    if required_education == "bachelor's":
+        education_gaps = ~features.has_bachelor
+    elif required_education == "master's":
+        education_gaps = ~features.has_master
+    else:
+        education_gaps = np.zeros(len(features), dtype=bool)
+    
+    project_gaps = features.project_count < 2
+    
+    # Same operations in the same order as calculate_selection_probability, so results match exactly
+    score = np.full(len(features), 100.0)
+    skills_match_percentage = np.maximum(0, 100 - missing_count * 10)
+    score -= (100 - skills_match_percentage) * 0.4
+    score += np.where(weak_experience, -(20 * 0.3), 10 * 0.3)
+    score += np.where(education_gaps, -(15 * 0.15), 5 * 0.15)
+    score += np.where(project_gaps, -(15 * 0.15), 5 * 0.15)
+    score += np.where(features.has_certifications, 5, 0)
+    return np.clip(score, 0, 100), presence
+
+def rank_resumes(features, job_requirements, top_k=50):
+    """
+    Top-k resumes for a job, best first (ties keep input order).
+    Each result has resume_id, selection_probability and missing_skills.
+    """
+    if not len(features):
+        return []
+    scores, presence = score_resumes(features, job_requirements)
+    skills = job_requirements.get('skills', [])
+    
+    n = len(features)
+    if top_k < n:
+        # O(N) selection of the k-th best score; keep everything tied with it so ties stay in input order
+        cutoff = np.partition(scores, n - top_k)[n - top_k]
+        candidates = np.flatnonzero(scores >= cutoff)
+    else:
+        candidates = np.arange(n)
+    order = candidates[np.lexsort((candidates, -scores[candidates]))][:top_k]
+    
+    return [{
+        'resume_id': features.resume_ids[i],
+        'selection_probability': float(scores[i]),
+        'missing_skills': [skill for skill, present in zip(skills, presence[i]) if not present]
+    } for i in order]
+
+def rank_stored_resumes(job_requirements, user_id=None, resume_ids=None, top_k=50):
+    """Rank the latest version of stored resumes (by owner or explicit ids) against a job"""
+    from resume_manager import get_latest_resume_data
+    
+    rows = get_latest_resume_data(user_id=user_id, resume_ids=resume_ids)
+    features = ResumeFeatures([row['resume_id'] for row in rows], [row['extracted_data'] for row in rows])
+    return rank_resumes(features, job_requirements, top_k)
+
+def rank_resumes_reference(resume_ids, resumes_data, job_requirements, top_k=50):
+    """Per-resume ranking through analyze_resume_gaps, for checking rank_resumes"""
+    results = []
+    for resume_id, data in zip(resume_ids, resumes_data):
+        gaps = analyze_resume_gaps(data, '', job_requirements)
+        results.append({
+            'resume_id': resume_id,
+            'selection_probability': calculate_selection_probability(data, job_requirements, gaps),
+            'missing_skills': gaps['missing_skills']
+        })
+    results.sort(key=lambda result: -result['selection_probability'])
+    return results[:top_k]
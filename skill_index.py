@@ -0,0 +1,166 @@
+"""
+Inverted index from normalized skill token to the resumes that list it
+Rows live in resume_skill_index and always describe the latest version of each
+resume. save_resume keeps it up to date in the same transaction; this module also
+answers "which resumes have X AND Y" and missing-skill lookups as set operations.
+
+Usage:
+    python skill_index.py rebuild
+    python skill_index.py check
+"""
+import json
+import re
+import sys
+import unicodedata
+
+from database import get_db_connection
+
+# Separators between skills on one line of the SKILLS section
+SKILL_SEPARATOR_PATTERN = re.compile(r'[,;|•·]+')
+MAX_TOKEN_LENGTH = 191  # Fits a utf8mb4 index prefix
+
+def normalize_skill(skill):
+    """Lowercase, collapse whitespace and trim punctuation around a skill name"""
+    return ' '.join(skill.lower().split()).strip(' .-*○:')
+
+def skill_key(token):
+    """
+    Key under which skill_token's case- and accent-insensitive collation compares a token:
+    "café" and "Cafe" share one, so only one of them fits the (skill_token, resume_id) key
+    """
+    decomposed = unicodedata.normalize('NFKD', token.casefold())
+    return ''.join(char for char in decomposed if not unicodedata.combining(char))
+
+def skill_tokens(extracted_data):
+    """Set of normalized skill tokens from a resume's extracted data, one per skill_key"""
+    tokens = {}
+    for line in extracted_data.get('skills', []):
+        # "Languages: Python, Java" -> drop the category label
+        if ':' in line:
+            line = line.split(':', 1)[1]
+        for part in SKILL_SEPARATOR_PATTERN.split(line):
+            token = normalize_skill(part)
+            if token and len(token) <= MAX_TOKEN_LENGTH:
+                # Keep the smallest spelling so rebuilds and consistency checks agree
+                key = skill_key(token)
+                tokens[key] = min(token, tokens.get(key, token))
+    return set(tokens.values())
+
+def index_resume_versions(cursor, versions):
+    """
+    Replace the index rows of each resume with the tokens of its given version.
+    versions is a list of (resume_id, version_id, extracted_data); runs on the
+    caller's cursor so it commits together with the version insert.
+    """
+    if not versions:
+        return
+    resume_ids = [resume_id for resume_id, _, _ in versions]
+    placeholders = ', '.join(['%s'] * len(resume_ids))
+    cursor.execute(f'DELETE FROM resume_skill_index WHERE resume_id IN ({placeholders})', tuple(resume_ids))
+    rows = [(token, resume_id, version_id) for resume_id, version_id, data in versions for token in skill_tokens(data)]
+    if rows:
+        # IGNORE: skill_key approximates the collation; a variant it misses must not fail the upload
+        cursor.executemany('INSERT IGNORE INTO resume_skill_index (skill_token, resume_id, version_id) VALUES (%s, %s, %s)', rows)
+
+def find_resumes_with_skills(skills, user_id=None):
+    """Resume ids whose latest version lists every one of the given skills"""
+    # One token per skill_key, or HAVING COUNT(*) would expect a row per accent variant
+    tokens = sorted({skill_key(token): token for token in map(normalize_skill, skills) if token}.values())
+    if not tokens:
+        return set()
+    placeholders = ', '.join(['%s'] * len(tokens))
+    params = list(tokens)
+    user_join = ''
+    if user_id is not None:
+        user_join = 'JOIN resumes r ON r.resume_id = rsi.resume_id AND r.user_id = %s'
+        params.insert(0, user_id)
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'SELECT rsi.resume_id FROM resume_skill_index rsi {user_join} WHERE rsi.skill_token IN ({placeholders}) GROUP BY rsi.resume_id HAVING COUNT(*) = %s', (*params, len(tokens)))
+            return {row['resume_id'] for row in cursor.fetchall()}
+    except Exception as e:
+        return set()
+
+def _load_skill_tokens(cursor, resume_ids):
+    placeholders = ', '.join(['%s'] * len(resume_ids))
+    cursor.execute(f'SELECT resume_id, skill_token FROM resume_skill_index WHERE resume_id IN ({placeholders})', tuple(resume_ids))
+    tokens = {resume_id: set() for resume_id in resume_ids}
+    for row in cursor.fetchall():
+        tokens[row['resume_id']].add(row['skill_token'])
+    return tokens
+
+def get_resume_skill_tokens(resume_ids):
+    """Map of resume id to its indexed skill tokens"""
+    if not resume_ids:
+        return {}
+    try:
+        with get_db_connection() as conn:
+            return _load_skill_tokens(conn.cursor(), resume_ids)
+    except Exception as e:
+        return {}
+
+def get_missing_skills(resume_id, skills):
+    """Job skills that are not in a resume's indexed skill tokens, in job order"""
+    keys = {skill_key(token) for token in get_resume_skill_tokens([resume_id]).get(resume_id, set())}
+    return [skill for skill in skills if skill_key(normalize_skill(skill)) not in keys]
+
+def _iter_latest_versions(cursor, batch_size):
+    """Yield batches of (resume_id, version_id, extracted_data) for the latest version of every resume"""
+    last_resume_id = 0
+    while True:
+        cursor.execute('SELECT r.resume_id, rv.version_id, rv.extracted_data FROM resumes r JOIN resume_versions rv ON rv.version_id = (SELECT MAX(version_id) FROM resume_versions WHERE resume_id = r.resume_id) WHERE r.resume_id > %s ORDER BY r.resume_id LIMIT %s', (last_resume_id, batch_size))
+        rows = cursor.fetchall()
+        if not rows:
+            return
+        last_resume_id = rows[-1]['resume_id']
+        yield [(row['resume_id'], row['version_id'], json.loads(row['extracted_data'] or '{}')) for row in rows]
+
+def rebuild_index(batch_size=500):
+    """Rebuild the whole index from resume_versions.extracted_data; returns resumes indexed"""
+    indexed = 0
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        # Replaced resume by resume, so lookups keep working while this runs
+        for batch in _iter_latest_versions(cursor, batch_size):
+            index_resume_versions(cursor, batch)
+            conn.commit()
+            indexed += len(batch)
+    return indexed
+
+def check_index_consistency(batch_size=500):
+    """
+    List of (resume_id, missing_tokens, extra_tokens) where the index disagrees with the
+    extracted_data of the latest version; rows pointing at an older version count as extra
+    """
+    problems = []
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        for batch in _iter_latest_versions(cursor, batch_size):
+            placeholders = ', '.join(['%s'] * len(batch))
+            cursor.execute(f'SELECT resume_id, version_id, skill_token FROM resume_skill_index WHERE resume_id IN ({placeholders})', tuple(resume_id for resume_id, _, _ in batch))
+            indexed = {}
+            for row in cursor.fetchall():
+                indexed.setdefault(row['resume_id'], set()).add((row['version_id'], row['skill_token']))
+            for resume_id, version_id, data in batch:
+                expected = {(version_id, token) for token in skill_tokens(data)}
+                actual = indexed.get(resume_id, set())
+                if expected != actual:
+                    problems.append((resume_id, sorted(token for _, token in expected - actual), sorted(f"{token} (version {v})" for v, token in actual - expected)))
+    return problems
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else 'check'
+    if command == 'rebuild':
+        print(f"✅ Indexed skills for {rebuild_index()} resumes")
+    elif command == 'check':
+        problems = check_index_consistency()
+        if problems:
+            for resume_id, missing, extra in problems:
+                print(f"❌ Resume {resume_id}: missing {missing}, unexpected {extra}")
+            print(f"Run 'python skill_index.py rebuild' to fix {len(problems)} inconsistent resumes")
+            sys.exit(1)
+        print("✅ Skill index is consistent with resume_versions")
+    else:
+        print("Usage: python skill_index.py [rebuild|check]")
+        sys.exit(2)
@@ -0,0 +1,31 @@
+import pytest
+
+from job_templates import get_job_description_by_title, get_job_template_registry
+
+@pytest.mark.parametrize('job_title', [
+    "Civil Engineer",
+    "Mechanical Engineer",
+    "Sales Engineer",
+    "HR Manager",
+    "Marketing Manager",
+    "Project Manager",
+    "Business Analyst",
+    "Java Developer",
+    "Mobile Developer",
+])
+def test_generic_role_word_alone_gets_default_template(job_title):
+    registry = get_job_template_registry()
+    assert registry.match(job_title) is None
+    description, skills = get_job_description_by_title(job_title)
+    assert description == registry.default.description
+    assert skills == list(registry.default.skills)
+
+@pytest.mark.parametrize('job_title, expected', [
+    ("Software Engineer", "software engineer"),
+    ("Sr. Software Enginer", "software engineer"),
+    ("Python Backend Developer", "backend developer"),
+    ("Front End Dev", "frontend developer"),
+    ("ML Engineer", "machine learning engineer"),
+])
+def test_fuzzy_titles_still_match(job_title, expected):
+    assert get_job_template_registry().match(job_title).title == expected
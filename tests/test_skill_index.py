@@ -0,0 +1,26 @@
+from skill_index import index_resume_versions, skill_key, skill_tokens
+
+class RecordingCursor:
+    def __init__(self):
+        self.rows = []
+    
+    def execute(self, query, params=None):
+        pass
+    
+    def executemany(self, query, rows):
+        self.rows.extend(rows)
+
+def test_accent_and_case_variants_share_a_key():
+    assert skill_key('Café') == skill_key('cafe') == skill_key('CAFÉ')
+    assert skill_key('naïve') == 'naive'
+
+def test_skill_tokens_keep_one_variant_per_key():
+    tokens = skill_tokens({'skills': ['Café, cafe, CAFÉ', 'Languages: Python, Résumé parsing; resume parsing']})
+    assert tokens == {'cafe', 'python', 'resume parsing'}
+
+def test_index_rows_are_unique_under_the_collation():
+    cursor = RecordingCursor()
+    index_resume_versions(cursor, [(1, 10, {'skills': ['Café, cafe, Crème brûlée, creme brulee']}), (2, 20, {'skills': ['café']})])
+    keys = [(skill_key(token), resume_id) for token, resume_id, _ in cursor.rows]
+    assert len(keys) == len(set(keys))
+    assert sorted(keys) == [('cafe', 1), ('cafe', 2), ('creme brulee', 1)]
@@ -0,0 +1,226 @@
+"""
+Content-addressed, compressed storage for large text columns
+resume_versions.raw_text and the job_description columns of resume_analysis_history and
+job_applications are stored once per distinct text in text_blobs, keyed by the SHA-256 of
+the text and zlib-compressed, and the rows reference them by id. A job description that
+appears in every analysis against it is stored once.
+
+Rows written before text_blobs existed keep their text inline, and reads accept both, so
+the backfill can run while the app is serving; it moves texts batch by batch:
+    python text_store.py backfill --batch-size 500
+    python text_store.py status
+"""
+import argparse
+import hashlib
+import sys
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+from config import TEXT_BLOB_CONFIG
+from database import get_db_connection
+
+# (table, primary key, inline text column, blob id column) for every text moved into text_blobs
+BLOB_COLUMNS = [
+    ('resume_versions', 'version_id', 'raw_text', 'raw_text_blob_id'),
+    ('resume_analysis_history', 'analysis_id', 'job_description', 'job_description_blob_id'),
+    ('job_applications', 'application_id', 'job_description', 'job_description_blob_id'),
+]
+
+def text_hash(text):
+    """SHA-256 of a text's UTF-8 bytes, the key of its text_blobs row"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+def compress_text(text):
+    """(compression, data) for a text; texts that zlib doesn't shrink are stored as is"""
+    raw = text.encode('utf-8')
+    compressed = zlib.compress(raw, TEXT_BLOB_CONFIG['compression_level'])
+    if len(compressed) < len(raw):
+        return 'zlib', compressed
+    return 'none', raw
+
+def decompress_text(compression, data):
+    data = bytes(data)
+    if compression == 'zlib':
+        data = zlib.decompress(data)
+    return data.decode('utf-8')
+
+class TextBlobCache:
+    """Bounded LRU of blob_id -> decompressed text; blobs never change, so entries only need evicting for size"""
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0}
+    
+    def get_many(self, blob_ids):
+        """({blob_id: text} for cached ids, [ids not cached])"""
+        found, missing = {}, []
+        with self._lock:
+            for blob_id in blob_ids:
+                text = self._entries.get(blob_id)
+                if text is not None:
+                    self._entries.move_to_end(blob_id)
+                    found[blob_id] = text
+                else:
+                    missing.append(blob_id)
+            self._stats['hits'] += len(found)
+            self._stats['misses'] += len(missing)
+        return found, missing
+    
+    def put_many(self, texts):
+        with self._lock:
+            for blob_id, text in texts.items():
+                self._entries[blob_id] = text
+                self._entries.move_to_end(blob_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+    
+    def stats(self):
+        """Snapshot of hit/miss counters"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        return stats
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_text_blob_cache():
+    """Get the process-wide text blob cache, creating it on first use"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = TextBlobCache(TEXT_BLOB_CONFIG['cache_size'])
+    return _cache
+
+def _blob_ids(cursor, hashes, locking=False):
+    placeholders = ', '.join(['%s'] * len(hashes))
+    cursor.execute(f"SELECT blob_id, content_hash FROM text_blobs WHERE content_hash IN ({placeholders}){' FOR SHARE' if locking else ''}", tuple(hashes))
+    return {row['content_hash']: row['blob_id'] for row in cursor.fetchall()}
+
+def store_texts(cursor, texts):
+    """
+    text_blobs ids for texts in order (None for None), compressing and inserting only the
+    distinct texts not stored yet. Runs on the caller's cursor, so the blobs commit with
+    the rows that reference them.
+    """
+    hashes = [text_hash(text) if text is not None else None for text in texts]
+    distinct = {h: text for h, text in zip(hashes, texts) if h is not None}
+    if not distinct:
+        return [None] * len(texts)
+    # Plain read first: a locking read of a hash not stored yet would take a gap lock, and two
+    # writers inserting into the same gap would then deadlock
+    blob_ids = _blob_ids(cursor, list(distinct))
+    missing = [h for h in distinct if h not in blob_ids]
+    if missing:
+        rows = []
+        for h in missing:
+            compression, data = compress_text(distinct[h])
+            rows.append((h, compression, len(distinct[h].encode('utf-8')), data))
+        # IGNORE: a concurrent writer may store the same text first
+        cursor.executemany('INSERT IGNORE INTO text_blobs (content_hash, compression, original_size, data) VALUES (%s, %s, %s, %s)', rows)
+        # Every missing row exists now; a locking read also sees ones committed after this
+        # transaction's snapshot by a concurrent writer
+        blob_ids.update(_blob_ids(cursor, missing, locking=True))
+    return [blob_ids[h] if h is not None else None for h in hashes]
+
+def load_texts(cursor, blob_ids):
+    """{blob_id: text} for the given ids, from the cache or one query on the caller's cursor"""
+    cache = get_text_blob_cache()
+    texts, missing = cache.get_many(set(blob_ids))
+    if missing:
+        placeholders = ', '.join(['%s'] * len(missing))
+        cursor.execute(f'SELECT blob_id, compression, data FROM text_blobs WHERE blob_id IN ({placeholders})', tuple(missing))
+        loaded = {row['blob_id']: decompress_text(row['compression'], row['data']) for row in cursor.fetchall()}
+        cache.put_many(loaded)
+        texts.update(loaded)
+    return texts
+
+def resolve_text_columns(cursor, rows, columns):
+    """
+    Fill in texts stored in text_blobs and drop the blob id keys, so rows look as if the
+    text were inline. columns maps text column -> blob id column; rows still holding the
+    text inline (not backfilled yet) keep it.
+    """
+    blob_ids = {row[blob_column] for row in rows for blob_column in columns.values() if row.get(blob_column) is not None}
+    texts = load_texts(cursor, blob_ids) if blob_ids else {}
+    for row in rows:
+        for column, blob_column in columns.items():
+            blob_id = row.pop(blob_column, None)
+            if blob_id is not None and row.get(column) is None:
+                row[column] = texts.get(blob_id)
+    return rows
+
+def backfill(batch_size=500, pause_seconds=0.0, progress=None):
+    """
+    Move inline texts of every BLOB_COLUMNS table into text_blobs, batch_size rows per
+    transaction so row locks stay short; pause_seconds between batches eases the load on a
+    busy server. Safe to interrupt and re-run. Returns {table: rows moved}.
+    """
+    moved = {}
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        for table, key, column, blob_column in BLOB_COLUMNS:
+            moved[table], last_id = 0, 0
+            while True:
+                cursor.execute(f'SELECT {key} AS row_id, {column} AS text FROM {table} WHERE {key} > %s AND {column} IS NOT NULL AND {blob_column} IS NULL ORDER BY {key} LIMIT %s FOR UPDATE', (last_id, batch_size))
+                rows = cursor.fetchall()
+                if not rows:
+                    conn.commit()
+                    break
+                blob_ids = store_texts(cursor, [row['text'] for row in rows])
+                cursor.executemany(f'UPDATE {table} SET {blob_column} = %s, {column} = NULL WHERE {key} = %s', [(blob_id, row['row_id']) for blob_id, row in zip(blob_ids, rows)])
+                conn.commit()
+                moved[table] += len(rows)
+                last_id = rows[-1]['row_id']
+                if progress:
+                    progress(table, moved[table])
+                if pause_seconds:
+                    time.sleep(pause_seconds)
+    return moved
+
+def storage_status():
+    """Rows still inline per table, and the number, original and stored bytes of text_blobs"""
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        inline = {}
+        for table, _, column, blob_column in BLOB_COLUMNS:
+            cursor.execute(f'SELECT COUNT(*) AS rows_inline, COALESCE(SUM(LENGTH({column})), 0) AS bytes_inline FROM {table} WHERE {column} IS NOT NULL AND {blob_column} IS NULL')
+            inline[table] = cursor.fetchone()
+        cursor.execute('SELECT COUNT(*) AS blobs, COALESCE(SUM(original_size), 0) AS original_bytes, COALESCE(SUM(LENGTH(data)), 0) AS stored_bytes FROM text_blobs')
+        return inline, cursor.fetchone()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Move large text columns into compressed, deduplicated text_blobs")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    backfill_parser = subparsers.add_parser('backfill', help="Move inline texts into text_blobs")
+    backfill_parser.add_argument('--batch-size', type=int, default=500, help="Rows per transaction")
+    backfill_parser.add_argument('--pause', type=float, default=0.0, help="Seconds to sleep between batches")
+    subparsers.add_parser('status', help="Report rows still inline and the compression ratio")
+    args = parser.parse_args(argv)
+    
+    if args.command == 'backfill':
+        started = time.perf_counter()
+        moved = backfill(args.batch_size, args.pause, progress=lambda table, rows: print(f"  {table}: {rows} rows moved"))
+        print(f"✅ Moved {sum(moved.values())} texts into text_blobs in {time.perf_counter() - started:.1f}s")
+        print("Run OPTIMIZE TABLE on the backfilled tables to return the freed space")
+        return 0
+    
+    inline, blobs = storage_status()
+    for table, counts in inline.items():
+        print(f"{table}: {counts['rows_inline']} rows inline ({int(counts['bytes_inline']) / 1024 / 1024:.1f} MB)")
+    ratio = int(blobs['original_bytes']) / int(blobs['stored_bytes']) if blobs['stored_bytes'] else 0.0
+    print(f"text_blobs: {blobs['blobs']} texts, {int(blobs['original_bytes']) / 1024 / 1024:.1f} MB stored in {int(blobs['stored_bytes']) / 1024 / 1024:.1f} MB ({ratio:.1f}x)")
+    return 1 if any(counts['rows_inline'] for counts in inline.values()) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
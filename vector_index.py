@@ -0,0 +1,418 @@
+"""
+Local approximate nearest-neighbour index over resume and job embeddings
+Vectors live in .npy files that are memory-mapped for search. Small indexes are
+searched exhaustively with NumPy; once an index passes brute_force_threshold rows,
+compact() trains an IVF (inverted file) layout: k-means centroids plus rows stored
+contiguously per cluster, so a query only scans the nprobe closest clusters.
+
+Adds go to a small delta segment and deletes to a tombstone list until the next
+compact(). meta.json names the files of the current generation and is replaced
+atomically, so readers always see a consistent set.
+
+Usage:
+    python vector_index.py sync                  # add/delete resume versions, embed missing ones
+    python vector_index.py jobs-for-resume 42    # best job templates for resume_id 42
+    python vector_index.py resumes-for-job "Data Scientist"
+    python vector_index.py bench --rows 100000 --dim 384
+"""
+import json
+import os
+import threading
+import time
+import uuid
+
+import numpy as np
+
+from config import SEMANTIC_CONFIG, VECTOR_INDEX_CONFIG
+
+SEARCH_CHUNK_ROWS = 65536
+
+def _normalize(vectors):
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return vectors / norms
+
+def _top_k(scores, keys, k):
+    """Best k (keys, scores) from unsorted arrays, best first"""
+    if len(scores) > k:
+        best = np.argpartition(-scores, k - 1)[:k]
+        scores, keys = scores[best], keys[best]
+    order = np.argsort(-scores, kind='stable')
+    return keys[order], scores[order]
+
+def train_kmeans(vectors, n_lists, iterations=10, sample_size=50000, seed=0):
+    """Spherical k-means centroids on a sample of unit vectors"""
+    rng = np.random.default_rng(seed)
+    if len(vectors) > sample_size:
+        sample = np.asarray(vectors[np.sort(rng.choice(len(vectors), sample_size, replace=False))])
+    else:
+        sample = np.asarray(vectors)
+    centroids = sample[rng.choice(len(sample), n_lists, replace=False)].copy()
+    for _ in range(iterations):
+        assignment = np.argmax(sample @ centroids.T, axis=1)
+        order = np.argsort(assignment, kind='stable')
+        counts = np.bincount(assignment, minlength=n_lists)
+        present = np.flatnonzero(counts)
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]])[present]
+        # Empty clusters keep their old centroid rather than collapsing to zero
+        centroids[present] = _normalize(np.add.reduceat(sample[order], starts, axis=0))
+    return centroids
+
+class VectorIndex:
+    """Cosine-similarity index keyed by int64 ids, with brute-force and IVF search"""
+    def __init__(self, directory, brute_force_threshold=None, nprobe=None):
+        self.directory = directory
+        self.brute_force_threshold = brute_force_threshold or VECTOR_INDEX_CONFIG['brute_force_threshold']
+        self.nprobe = nprobe or VECTOR_INDEX_CONFIG['nprobe']
+        self._lock = threading.RLock()
+        self._meta_mtime = None
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+    
+    # ------------------------------------------------------------------ storage
+    
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+    
+    def _load(self):
+        meta_path = self._path('meta.json')
+        self.meta = {'dim': None, 'files': {}, 'watermark': 0}
+        if os.path.exists(meta_path):
+            with open(meta_path, encoding='utf-8') as f:
+                self.meta = json.load(f)
+            self._meta_mtime = os.stat(meta_path).st_mtime_ns
+        files = self.meta['files']
+        dim = self.meta['dim'] or 0
+        
+        def load(component, dtype, shape, mmap=False):
+            if component in files:
+                return np.load(self._path(files[component]), mmap_mode='r' if mmap else None)
+            return np.zeros(shape, dtype=dtype)
+        
+        self.vectors = load('vectors', np.float32, (0, dim), mmap=True)
+        self.keys = load('keys', np.int64, (0,))
+        self.centroids = load('centroids', np.float32, (0, dim)) if 'centroids' in files else None
+        self.list_offsets = load('list_offsets', np.int64, (0,)) if 'list_offsets' in files else None
+        self.delta_vectors = load('delta_vectors', np.float32, (0, dim))
+        self.delta_keys = load('delta_keys', np.int64, (0,))
+        self.deleted = load('deleted', np.int64, (0,))
+        self._deleted_mask = np.isin(self.keys, self.deleted)
+        self._main_keys = None
+    
+    def refresh(self):
+        """Reload if another process wrote a newer generation"""
+        meta_path = self._path('meta.json')
+        if os.path.exists(meta_path) and os.stat(meta_path).st_mtime_ns != self._meta_mtime:
+            with self._lock:
+                self._load()
+    
+    def _write(self, components, **meta_updates):
+        """Write changed components as new files, then atomically switch meta.json to them"""
+        old_files = dict(self.meta['files'])
+        files = dict(old_files)
+        generation = uuid.uuid4().hex[:12]
+        for component, array in components.items():
+            if array is None:
+                files.pop(component, None)
+                continue
+            name = f"{component}.{generation}.npy"
+            np.save(self._path(name), np.ascontiguousarray(array))
+            files[component] = name
+        
+        meta = dict(self.meta, files=files, **meta_updates)
+        tmp_path = self._path(f"meta.json.{generation}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, self._path('meta.json'))
+        
+        # Old files are unlinked; readers that still map them keep working on POSIX
+        for component, name in old_files.items():
+            if files.get(component) != name:
+                try:
+                    os.remove(self._path(name))
+                except OSError:
+                    pass
+        self._load()
+    
+    # ------------------------------------------------------------------ updates
+    
+    def __len__(self):
+        return int(len(self.keys) - self._deleted_mask.sum() + len(self.delta_keys))
+    
+    def _key_set(self):
+        if self._main_keys is None:
+            self._main_keys = set(self.keys.tolist())
+        return self._main_keys
+    
+    def add(self, keys, vectors, watermark=None):
+        """Insert or replace vectors by key; compacts automatically once the delta grows large"""
+        keys = np.asarray(keys, dtype=np.int64)
+        if not len(keys):
+            return
+        vectors = _normalize(vectors)
+        with self._lock:
+            if self.meta['dim'] is None:
+                self.meta['dim'] = int(vectors.shape[1])
+                self.delta_vectors = np.zeros((0, vectors.shape[1]), dtype=np.float32)
+            elif vectors.shape[1] != self.meta['dim']:
+                raise ValueError(f"Expected {self.meta['dim']}-dimensional vectors, got {vectors.shape[1]}")
+            
+            keep = ~np.isin(self.delta_keys, keys)
+            replaced = np.array([key for key in keys.tolist() if key in self._key_set()], dtype=np.int64)
+            updates = {
+                'delta_keys': np.concatenate([self.delta_keys[keep], keys]),
+                'delta_vectors': np.concatenate([self.delta_vectors[keep], vectors]),
+                'deleted': np.union1d(self.deleted, replaced),
+            }
+            meta = {'watermark': watermark} if watermark is not None else {}
+            self._write(updates, **meta)
+            if len(self.delta_keys) > max(1000, len(self.keys) // 10):
+                self.compact()
+    
+    def delete(self, keys):
+        """Remove vectors by key"""
+        keys = np.asarray(keys, dtype=np.int64)
+        if not len(keys):
+            return
+        with self._lock:
+            keep = ~np.isin(self.delta_keys, keys)
+            in_main = np.array([key for key in keys.tolist() if key in self._key_set()], dtype=np.int64)
+            self._write({
+                'delta_keys': self.delta_keys[keep],
+                'delta_vectors': self.delta_vectors[keep],
+                'deleted': np.union1d(self.deleted, in_main),
+            })
+    
+    def all_keys(self):
+        """Every live key"""
+        return np.concatenate([self.keys[~self._deleted_mask], self.delta_keys])
+    
+    def compact(self):
+        """Merge delta and tombstones into the main segment, training IVF lists when large enough"""
+        with self._lock:
+            live = ~self._deleted_mask
+            keys = np.concatenate([self.keys[live], self.delta_keys])
+            vectors = np.concatenate([np.asarray(self.vectors[live]), self.delta_vectors]) if len(keys) else np.zeros((0, self.meta['dim'] or 0), dtype=np.float32)
+            
+            centroids = list_offsets = None
+            if len(keys) >= self.brute_force_threshold:
+                n_lists = max(1, min(int(np.sqrt(len(keys))), len(keys) // 39))
+                centroids = train_kmeans(vectors, n_lists)
+                assignment = np.concatenate([
+                    np.argmax(vectors[start:start + SEARCH_CHUNK_ROWS] @ centroids.T, axis=1)
+                    for start in range(0, len(vectors), SEARCH_CHUNK_ROWS)
+                ])
+                order = np.argsort(assignment, kind='stable')
+                keys, vectors = keys[order], vectors[order]
+                list_offsets = np.concatenate([[0], np.cumsum(np.bincount(assignment, minlength=n_lists))]).astype(np.int64)
+            
+            dim = self.meta['dim'] or 0
+            self._write({
+                'keys': keys,
+                'vectors': vectors,
+                'centroids': centroids,
+                'list_offsets': list_offsets,
+                'delta_keys': np.zeros((0,), dtype=np.int64),
+                'delta_vectors': np.zeros((0, dim), dtype=np.float32),
+                'deleted': np.zeros((0,), dtype=np.int64),
+            })
+    
+    # ------------------------------------------------------------------ search
+    
+    def _search_rows(self, rows_slice_or_index, query, k):
+        vectors = self.vectors[rows_slice_or_index]
+        scores = vectors @ query
+        keys = self.keys[rows_slice_or_index]
+        deleted = self._deleted_mask[rows_slice_or_index]
+        if deleted.any():
+            scores = np.where(deleted, -np.inf, scores)
+        return _top_k(scores, keys, k)
+    
+    def search(self, query, k=50, exact=False):
+        """Top-k (keys, cosine scores) for one query vector, best first"""
+        query = _normalize(query)[0]
+        with self._lock:
+            candidates = []
+            if len(self.keys):
+                if self.centroids is None or exact:
+                    for start in range(0, len(self.keys), SEARCH_CHUNK_ROWS):
+                        candidates.append(self._search_rows(slice(start, start + SEARCH_CHUNK_ROWS), query, k))
+                else:
+                    nprobe = min(self.nprobe, len(self.centroids))
+                    probes = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+                    rows = np.concatenate([np.arange(self.list_offsets[p], self.list_offsets[p + 1]) for p in np.sort(probes)])
+                    if len(rows):
+                        candidates.append(self._search_rows(rows, query, k))
+            if len(self.delta_keys):
+                candidates.append(_top_k(self.delta_vectors @ query, self.delta_keys, k))
+        
+        if not candidates:
+            return np.zeros((0,), dtype=np.int64), np.zeros((0,), dtype=np.float32)
+        keys, scores = _top_k(np.concatenate([c[1] for c in candidates]), np.concatenate([c[0] for c in candidates]), k)
+        live = np.isfinite(scores)
+        return keys[live], scores[live]
+
+# ---------------------------------------------------------------------- resume/job indexes
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+def get_vector_index(name):
+    """Process-wide index stored under VECTOR_INDEX_DIR/<model>/<name>"""
+    with _indexes_lock:
+        if name not in _indexes:
+            model_dir = SEMANTIC_CONFIG['model_name'].replace('/', '__')
+            _indexes[name] = VectorIndex(os.path.join(VECTOR_INDEX_CONFIG['directory'], model_dir, name))
+        index = _indexes[name]
+    index.refresh()
+    return index
+
+def sync_resume_index(batch_size=500, embed_missing=True):
+    """
+    Bring the resume index in line with resume_versions: embed latest versions that have
+    no stored embedding, add versions newer than the watermark, and drop superseded or
+    deleted versions. Index keys are version ids. Returns (added, deleted).
+    """
+    from free_ai_analyzer import get_ai_analyzer
+    from resume_manager import get_versions_missing_embeddings, get_resume_embedding_batch, get_latest_version_ids
+    
+    analyzer = get_ai_analyzer()
+    model_name = analyzer.model_name
+    if embed_missing:
+        if not analyzer.wait_until_ready():
+            raise RuntimeError("Semantic model is not available")
+        last_version_id = 0
+        while True:
+            missing = get_versions_missing_embeddings(model_name, last_version_id, batch_size)
+            if not missing:
+                break
+            for row in missing:
+                analyzer.resume_embeddings(row['extracted_data'], row['version_id'])
+            last_version_id = missing[-1]['version_id']
+    
+    index = get_vector_index('resumes')
+    added = 0
+    while True:
+        rows = get_resume_embedding_batch(model_name, index.meta.get('watermark', 0), batch_size)
+        if not rows:
+            break
+        index.add([row['version_id'] for row in rows], np.stack([row['embedding'] for row in rows]), watermark=rows[-1]['version_id'])
+        added += len(rows)
+    
+    latest = get_latest_version_ids()
+    if latest is None:
+        # Never treat a failed read as "every resume was deleted"
+        return added, 0
+    stale = np.setdiff1d(index.all_keys(), np.asarray(latest, dtype=np.int64))
+    index.delete(stale)
+    return added, len(stale)
+
+def sync_job_index():
+    """Index every job template description; keys are positions in the registry's titles"""
+    from free_ai_analyzer import get_ai_analyzer
+    from job_templates import get_job_template_registry
+    
+    analyzer = get_ai_analyzer()
+    if not analyzer.wait_until_ready():
+        raise RuntimeError("Semantic model is not available")
+    registry = get_job_template_registry()
+    titles = list(registry.titles)
+    index = get_vector_index('jobs')
+    index.add(np.arange(len(titles)), analyzer.encode([registry.templates[title].description for title in titles]))
+    index.delete(np.setdiff1d(index.all_keys(), np.arange(len(titles))))
+    return titles
+
+def find_resumes_for_job(job_description, k=50):
+    """Best stored resumes for a job description: list of {version_id, score}"""
+    from free_ai_analyzer import get_ai_analyzer
+    
+    analyzer = get_ai_analyzer()
+    if not analyzer.wait_until_ready():
+        return []
+    keys, scores = get_vector_index('resumes').search(analyzer.encode([job_description])[0], k)
+    return [{'version_id': int(key), 'score': float(score)} for key, score in zip(keys, scores)]
+
+def find_jobs_for_resume(version_id, k=10):
+    """Best job templates for a resume version: list of {job_title, score}"""
+    from job_templates import get_job_template_registry
+    from resume_manager import get_resume_embeddings
+    
+    embedding = get_resume_embeddings(version_id, SEMANTIC_CONFIG['model_name']).get('full')
+    if embedding is None:
+        return []
+    index = get_vector_index('jobs')
+    if not len(index):
+        sync_job_index()
+    titles = get_job_template_registry().titles
+    keys, scores = index.search(embedding, k)
+    return [{'job_title': titles[key], 'score': float(score)} for key, score in zip(keys, scores) if key < len(titles)]
+
+# ---------------------------------------------------------------------- benchmark
+
+def benchmark(rows=100000, dim=384, queries=200, k=50, clusters=256, noise=1.5, seed=0):
+    """Recall@k and latency of IVF search against exact search on clustered synthetic data"""
+    import tempfile
+    
+    rng = np.random.default_rng(seed)
+    centers = _normalize(rng.standard_normal((clusters, dim)))
+    
+    def sample(n):
+        # Points around random cluster centres; noise is the expected noise norm relative to a centre
+        return _normalize(centers[rng.integers(clusters, size=n)] + noise * rng.standard_normal((n, dim)).astype(np.float32) / np.sqrt(dim))
+    
+    data = sample(rows)
+    query_vectors = sample(queries)
+    
+    with tempfile.TemporaryDirectory() as directory:
+        index = VectorIndex(directory, brute_force_threshold=min(rows, VECTOR_INDEX_CONFIG['brute_force_threshold']))
+        started = time.perf_counter()
+        index.add(np.arange(rows), data)
+        index.compact()
+        print(f"Build: {time.perf_counter() - started:.1f}s for {rows} x {dim} ({'IVF' if index.centroids is not None else 'brute force'})")
+        
+        for label, exact in [('exact', True), ('ivf', False)]:
+            started = time.perf_counter()
+            results = [index.search(q, k, exact=exact)[0] for q in query_vectors]
+            elapsed = (time.perf_counter() - started) / queries
+            if exact:
+                truth = results
+                print(f"{label}: {elapsed * 1000:.2f} ms/query")
+            else:
+                recall = np.mean([len(np.intersect1d(a, b)) / k for a, b in zip(results, truth)])
+                print(f"{label} (nprobe={index.nprobe}): {elapsed * 1000:.2f} ms/query, recall@{k} {recall:.3f}")
+
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Resume/job vector index")
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('sync', help="Sync the resume and job indexes with the database")
+    jobs_parser = sub.add_parser('jobs-for-resume', help="Best job templates for a resume")
+    jobs_parser.add_argument('resume_id', type=int)
+    resumes_parser = sub.add_parser('resumes-for-job', help="Best resumes for a job title")
+    resumes_parser.add_argument('job_title')
+    resumes_parser.add_argument('-k', type=int, default=50)
+    bench_parser = sub.add_parser('bench', help="Recall/latency benchmark on synthetic data")
+    bench_parser.add_argument('--rows', type=int, default=100000)
+    bench_parser.add_argument('--dim', type=int, default=384)
+    bench_parser.add_argument('--queries', type=int, default=200)
+    bench_parser.add_argument('-k', type=int, default=50)
+    bench_parser.add_argument('--noise', type=float, default=1.5, help="Noise relative to cluster separation; higher is harder")
+    args = parser.parse_args()
+    
+    if args.command == 'sync':
+        added, deleted = sync_resume_index()
+        titles = sync_job_index()
+        print(f"✅ Resume index: {added} added, {deleted} removed; job index: {len(titles)} templates")
+    elif args.command == 'jobs-for-resume':
+        from resume_manager import get_current_version_id
+        for match in find_jobs_for_resume(get_current_version_id(args.resume_id)):
+            print(f"{match['score']:.3f}  {match['job_title']}")
+    elif args.command == 'resumes-for-job':
+        from job_templates import get_job_description_by_title
+        description, _ = get_job_description_by_title(args.job_title)
+        for match in find_resumes_for_job(description, args.k):
+            print(f"{match['score']:.3f}  version {match['version_id']}")
+    else:
+        benchmark(args.rows, args.dim, args.queries, args.k, noise=args.noise)